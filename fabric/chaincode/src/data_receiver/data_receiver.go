@@ -3,7 +3,6 @@ package main
 import (
 	"encoding/json"
 	"fmt"
-	"strconv"
 
 	"github.com/hyperledger/fabric/core/chaincode/shim"
 	"github.com/hyperledger/fabric/protos/peer"
@@ -11,22 +10,30 @@ import (
 
 // Event for signalling that the recipient has accepted the data
 type InterledgerEventAccepted struct {
-	Nonce uint64
+	Nonce string
 }
 
 // Event for signalling that the recipient has rejected the data
 type InterledgerEventRejected struct {
-	Nonce uint64
+	Nonce string
 }
 
+// Outcome of a batch of data items, returned by interledgerReceiveBatch and emitted with the event InterledgerEventBatch
+type InterledgerBatchOutcome struct {
+	Accepted []string
+	Rejected []string
+}
+
+// The nonces are kept as decimal strings, since the Interledger nonces are 128-bit integers
 type DataItem struct {
-	Nonce uint64
+	Nonce string
 	Data  string // bytes not allowed in chaincode, see https://github.com/hyperledger/fabric-contract-api-go/blob/master/tutorials/getting-started.md
 }
 
 // Interledger for data receiver
 type InterledgerReceiver interface {
-	interledgerReceive() // Function to receive data from Interledger
+	interledgerReceive()      // Function to receive data from Interledger
+	interledgerReceiveBatch() // Function to receive several data items from Interledger in one transaction
 }
 
 // This is a sample contract as data sender used for develpment and testing
@@ -62,6 +69,12 @@ func (t *DataReceiver) Invoke(stub shim.ChaincodeStubInterface) peer.Response {
 	var err error
 	if fn == "interledgerReceive" {
 		err = interledgerReceive(stub, args)
+	} else if fn == "interledgerReceiveBatch" {
+		var outcome []byte
+		outcome, err = interledgerReceiveBatch(stub, args)
+		if err == nil {
+			return shim.Success(outcome)
+		}
 	}
 
 	if err != nil {
@@ -77,11 +90,11 @@ func (t *DataReceiver) Invoke(stub shim.ChaincodeStubInterface) peer.Response {
 // @param data The actual data content encoded in byte string
 func interledgerReceive(stub shim.ChaincodeStubInterface, args []string) error {
 	// Function to receive data from Interledger
-	var nonce uint64
+	var nonce string
 	var data string
 
 	// fetch nonce & data
-	nonce, _ = strconv.ParseUint(args[0], 10, 64)
+	nonce = args[0]
 	data = args[1]
 
 	var items []DataItem
@@ -104,6 +117,45 @@ func interledgerReceive(stub shim.ChaincodeStubInterface, args []string) error {
 	return nil
 }
 
+// This is the function to receive several data items from Interledger in one transaction, which assumes the
+// parameters of interledgerReceive for each item, one after the other.
+// @param nonce The unique identifier of data event, followed by
+// @param data The actual data content encoded in byte string, for each item
+// The outcome of each item is returned as JSON {"Accepted": [nonces], "Rejected": [nonces]}, and emitted
+// with the event InterledgerEventBatch, since a transaction can emit only one event
+func interledgerReceiveBatch(stub shim.ChaincodeStubInterface, args []string) ([]byte, error) {
+	if len(args)%2 != 0 {
+		return nil, fmt.Errorf("Incorrect arguments. Expecting pairs of nonce and data!")
+	}
+
+	var items []DataItem
+	outcome := InterledgerBatchOutcome{Accepted: []string{}, Rejected: []string{}}
+
+	// the items are read and written once for the whole batch
+	items_json, _ := stub.GetState("items")
+	_ = json.Unmarshal(items_json, &items)
+
+	for i := 0; i < len(args); i += 2 {
+		nonce := args[i]
+		if nonce == "" {
+			return nil, fmt.Errorf("Invalid nonce: %s", nonce)
+		}
+		items = append(items, DataItem{
+			Nonce: nonce,
+			Data:  args[i+1]})
+		outcome.Accepted = append(outcome.Accepted, nonce)
+	}
+
+	payload, _ := json.Marshal(items)
+	stub.PutState("items", payload)
+
+	// emit event
+	outcome_bytes, _ := json.Marshal(outcome)
+	_ = stub.SetEvent("InterledgerEventBatch", outcome_bytes)
+
+	return outcome_bytes, nil
+}
+
 // main function starts up the chaincode in the container during instantiate
 func main() {
 	if err := shim.Start(new(DataReceiver)); err != nil {
@@ -18,6 +18,8 @@ type InterledgerEventSending struct {
 type InterledgerSender interface {
 	interledgerCommit()
 	interledgerAbort()
+	interledgerCommitBatch()
+	interledgerAbortBatch()
 }
 
 // This is a sample contract as data sender used for develpment and testing
@@ -57,6 +59,10 @@ func (t *DataSender) Invoke(stub shim.ChaincodeStubInterface) peer.Response {
 		err = interledgerCommit(stub, args)
 	} else if fn == "interledgerAbort" {
 		err = interledgerAbort(stub, args)
+	} else if fn == "interledgerCommitBatch" {
+		err = interledgerCommitBatch(stub, args)
+	} else if fn == "interledgerAbortBatch" {
+		err = interledgerAbortBatch(stub, args)
 	}
 
 	if err != nil {
@@ -112,6 +118,34 @@ func interledgerAbort(stub shim.ChaincodeStubInterface, args []string) error {
 	return nil
 }
 
+// This is the function that will be called when the recipient has accepted several data items, in one transaction.
+// It assumes the parameter of interledgerCommit for each item, one after the other
+// @param id The identifier of data sending event, for each item
+func interledgerCommitBatch(stub shim.ChaincodeStubInterface, args []string) error {
+	for i := range args {
+		if err := interledgerCommit(stub, args[i:i+1]); err != nil {
+			return err
+		}
+	}
+	return nil
+}
+
+// This is the function that will be called when several data items have been rejected, in one transaction.
+// It assumes the parameters of interledgerAbort for each item, one after the other
+// @param id The identifier of data sending event, followed by
+// @param reason The error code indicating the reason for failure, for each item
+func interledgerAbortBatch(stub shim.ChaincodeStubInterface, args []string) error {
+	if len(args)%2 != 0 {
+		return fmt.Errorf("Incorrect arguments. Expecting pairs of id and reason!")
+	}
+	for i := 0; i < len(args); i += 2 {
+		if err := interledgerAbort(stub, args[i:i+2]); err != nil {
+			return err
+		}
+	}
+	return nil
+}
+
 // main function starts up the chaincode in the container during instantiate
 func main() {
 	err := shim.Start(new(DataSender))
@@ -15,6 +15,7 @@ setup(
     packages=find_packages(where='src'),
     install_requires=[
         'web3 == 5.12.0',
+        'aiohttp >= 3.5.2, < 4',
         'requests == 2.20.0',
         'protobuf >= 3.10.0, < 4',
         'fabric-sdk-py',
@@ -24,5 +25,9 @@ setup(
         'https://github.com/hyperledger/fabric-sdk-py/tarball/master#egg=fabric-sdk-py'
     ],
     tests_require=['pytest', 'pytest-asyncio', 'fabric-sdk-py'],
+    extras_require={
+        # optional, for tests/integration/test_ethereum_tester.py and tests/benchmark/bench_evm.py
+        'evm': ['eth-tester[py-evm]', 'py-solc-x'],
+    },
     zip_safe=False
 )
@@ -1,4 +1,5 @@
 pragma solidity ^0.5.0;
+pragma experimental ABIEncoderV2;
 
 import "./InterledgerReceiverInterface.sol";
 import "./InterledgerMultiReceiverInterface.sol";
@@ -15,7 +16,7 @@ contract DataMultiReceiver is InterledgerReceiverInterface, InterledgerMultiRece
     // sample storage of data for application logic
     DataItem[] public dataItems;
 
-    function interlegerInquire(uint256 nonce, bytes memory data) public {
+    function interledgerInquire(uint256 nonce, bytes memory data) public {
         emit InterledgerInquiryAccepted(nonce);
     }
 
@@ -24,6 +25,13 @@ contract DataMultiReceiver is InterledgerReceiverInterface, InterledgerMultiRece
         emit InterledgerEventAccepted(nonce);
     }
 
+    function interledgerReceiveBatch(uint256[] memory nonces, bytes[] memory payloads) public {
+        require(nonces.length == payloads.length, "DataMultiReceiver: nonces and payloads must have the same length");
+        for (uint256 i = 0; i < nonces.length; i++) {
+            interledgerReceive(nonces[i], payloads[i]);
+        }
+    }
+
     function interledgerReceiveAbort(uint256 nonce, uint256 reason) public {
         emit InterledgerEventRejected(nonce);
     }
@@ -1,4 +1,5 @@
 pragma solidity ^0.5.0;
+pragma experimental ABIEncoderV2;
 
 import "./InterledgerReceiverInterface.sol";
 
@@ -18,4 +19,11 @@ contract DataReceiver is InterledgerReceiverInterface {
         dataItems.push(DataItem(nonce, payload));
         emit InterledgerEventAccepted(nonce);
     }
+
+    function interledgerReceiveBatch(uint256[] memory nonces, bytes[] memory payloads) public {
+        require(nonces.length == payloads.length, "DataReceiver: nonces and payloads must have the same length");
+        for (uint256 i = 0; i < nonces.length; i++) {
+            interledgerReceive(nonces[i], payloads[i]);
+        }
+    }
 }
@@ -36,4 +36,17 @@ contract DataSender is InterledgerSenderInterface {
     function interledgerAbort(uint256 identity, uint256 reason) public {
 
     }
+
+    function interledgerCommitBatch(uint256[] memory ids) public {
+        for (uint256 i = 0; i < ids.length; i++) {
+            interledgerCommit(ids[i]);
+        }
+    }
+
+    function interledgerAbortBatch(uint256[] memory ids, uint256[] memory reasons) public {
+        require(ids.length == reasons.length, "DataSender: ids and reasons must have the same length");
+        for (uint256 i = 0; i < ids.length; i++) {
+            interledgerAbort(ids[i], reasons[i]);
+        }
+    }
 }
@@ -1,4 +1,5 @@
 pragma solidity ^0.5.0;
+pragma experimental ABIEncoderV2;
 
 import "./InterledgerReceiverInterface.sol";
 import "./InterledgerSenderInterface.sol";
@@ -47,9 +48,29 @@ contract DataTransceiver is InterledgerSenderInterface, InterledgerReceiverInter
 
     }
 
+    function interledgerCommitBatch(uint256[] memory ids) public {
+        for (uint256 i = 0; i < ids.length; i++) {
+            interledgerCommit(ids[i]);
+        }
+    }
+
+    function interledgerAbortBatch(uint256[] memory ids, uint256[] memory reasons) public {
+        require(ids.length == reasons.length, "DataTransceiver: ids and reasons must have the same length");
+        for (uint256 i = 0; i < ids.length; i++) {
+            interledgerAbort(ids[i], reasons[i]);
+        }
+    }
+
     function interledgerReceive(uint256 nonce, bytes memory payload) public {
         dataItems.push(DataItem(nonce, payload));
         emit InterledgerEventAccepted(nonce);
     }
+
+    function interledgerReceiveBatch(uint256[] memory nonces, bytes[] memory payloads) public {
+        require(nonces.length == payloads.length, "DataTransceiver: nonces and payloads must have the same length");
+        for (uint256 i = 0; i < nonces.length; i++) {
+            interledgerReceive(nonces[i], payloads[i]);
+        }
+    }
 }
 
@@ -1,4 +1,5 @@
 pragma solidity ^0.5.0;
+pragma experimental ABIEncoderV2;
 
 import "./InterledgerReceiverInterface.sol";
 import "./InterledgerSenderInterface.sol";
@@ -141,6 +142,34 @@ contract GameToken is ERC721, ERC721Metadata, MinterRole, ERC721Burnable, AssetT
         
         require(assetMap[tokenId].name != 0x0, "GameToken: The asset must be created");
         
+        _receiveAsset(nonce, tokenId);
+    }
+
+    /// @notice Set a batch of tokens to Here state
+    /// @dev Each asset changes state NotHere -> Here. Callable by the game authority.
+    /// Unlike interledgerReceive, an asset that was not created is rejected instead of reverting the whole batch
+    /// @param nonces The nonces
+    /// @param payloads The tokenIds, in the same order as nonces
+    function interledgerReceiveBatch(uint256[] memory nonces, bytes[] memory payloads) public onlyMinter {
+        require(nonces.length == payloads.length, "GameToken: nonces and payloads must have the same length");
+
+        for (uint256 i = 0; i < nonces.length; i++) {
+            uint256 tokenId = abi.decode(payloads[i], (uint256));
+
+            if(assetMap[tokenId].name == 0x0)
+            {
+                emit InterledgerEventRejected(nonces[i]);
+            }
+            else
+            {
+                _receiveAsset(nonces[i], tokenId);
+            }
+        }
+    }
+
+    /// @dev Accept the asset if it is in NotHere state, reject it otherwise
+    function _receiveAsset(uint256 nonce, uint256 tokenId) internal {
+
         if(assetMap[tokenId].state != State.NotHere)
         {
             emit InterledgerEventRejected(nonce);
@@ -174,6 +203,28 @@ contract GameToken is ERC721, ERC721Metadata, MinterRole, ERC721Burnable, AssetT
         emit Here(msg.sender, assetMap[tokenId].name, tokenId);
     }
 
+    /// @notice Set a batch of tokens to NotHere state
+    /// @dev Each asset changes state TransferOut -> NotHere. Callable by the game authority.
+    /// The whole batch is reverted if one of the assets is not in TransferOut state
+    /// @param tokenIds The token ids
+    function interledgerCommitBatch(uint256[] memory tokenIds) public onlyMinter {
+        for (uint256 i = 0; i < tokenIds.length; i++) {
+            interledgerCommit(tokenIds[i]);
+        }
+    }
+
+    /// @notice Set a batch of tokens to Here state, to use to handle errors
+    /// @dev Each asset changes state TransferOut -> Here. Callable by the game authority.
+    /// The whole batch is reverted if one of the assets is not in TransferOut state
+    /// @param tokenIds The token ids
+    /// @param reasons The reasons, in the same order as tokenIds
+    function interledgerAbortBatch(uint256[] memory tokenIds, uint256[] memory reasons) public onlyMinter {
+        require(tokenIds.length == reasons.length, "GameToken: tokenIds and reasons must have the same length");
+        for (uint256 i = 0; i < tokenIds.length; i++) {
+            interledgerAbort(tokenIds[i], reasons[i]);
+        }
+    }
+
     /// @notice Set the token to Here state
     /// @dev The asset changes state NotHere -> Here. Callable by the game authority
     /// @param tokenId The token id 
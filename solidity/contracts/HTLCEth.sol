@@ -1,4 +1,5 @@
 pragma solidity ^0.5.0;
+pragma experimental ABIEncoderV2;
 
 import "./InterledgerReceiverInterface.sol";
 import "./InterledgerSenderInterface.sol";
@@ -148,6 +149,14 @@ contract HTLCEth is InterledgerSenderInterface, InterledgerReceiverInterface {
         
         emit InterledgerEventAccepted(nonce);
     }
+
+    // A batch is reverted as a whole if the funds of one of its items cannot be withdrawn
+    function interledgerReceiveBatch(uint256[] memory nonces, bytes[] memory payloads) public {
+        require(nonces.length == payloads.length, "HTLCEth: nonces and payloads must have the same length");
+        for (uint256 i = 0; i < nonces.length; i++) {
+            interledgerReceive(nonces[i], payloads[i]);
+        }
+    }
     
     
     // For processing results of interledgerReceive on the other ledger
@@ -156,4 +165,8 @@ contract HTLCEth is InterledgerSenderInterface, InterledgerReceiverInterface {
     function interledgerCommit(uint256 id, bytes memory data) public { }
     
     function interledgerAbort(uint256 id, uint256 reason) public { }
+
+    function interledgerCommitBatch(uint256[] memory ids) public { }
+
+    function interledgerAbortBatch(uint256[] memory ids, uint256[] memory reasons) public { }
 }
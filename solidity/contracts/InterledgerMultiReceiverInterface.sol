@@ -15,7 +15,7 @@ contract InterledgerMultiReceiverInterface {
      * @param nonce The unique identifier of data event
      * @param data The actual data content encoded in bytes
      */
-    function interlegerInquire(uint256 nonce, bytes memory data) public;
+    function interledgerInquire(uint256 nonce, bytes memory data) public;
 
     /** 
      * @dev Function to abort the receiving of data involving a particular transaction
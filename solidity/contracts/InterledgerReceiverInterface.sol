@@ -1,4 +1,5 @@
 pragma solidity ^0.5.0;
+pragma experimental ABIEncoderV2;
 
 /**
  * This is the abstract interface to be implemented by potential data receiver
@@ -16,4 +17,12 @@ contract InterledgerReceiverInterface {
      * @param data The actual data content encoded in bytes
      */
     function interledgerReceive(uint256 nonce, bytes memory data) public;
+
+    /**
+     * @dev Function to receive a batch of data items from Interledger in a single transaction.
+     * One InterledgerEventAccepted or InterledgerEventRejected event is expected per nonce
+     * @param nonces The unique identifiers of the data events
+     * @param payloads The data contents encoded in bytes, in the same order as nonces
+     */
+    function interledgerReceiveBatch(uint256[] memory nonces, bytes[] memory payloads) public;
 }
@@ -32,4 +32,20 @@ contract InterledgerSenderInterface {
      * @param reason The error code indicating the reason for failure
      */
     function interledgerAbort(uint256 id, uint256 reason) public;
+
+
+    /**
+     * @dev Function that will be called when the recipient has accepted a batch of data items
+     * @param ids The identifiers of the data sending events
+     */
+    function interledgerCommitBatch(uint256[] memory ids) public;
+
+
+    /**
+     * @dev Function that will be called when the recipient has rejected a batch of data items,
+     *      or there have been errors.
+     * @param ids The identifiers of the data sending events
+     * @param reasons The error codes indicating the reason for failure, in the same order as ids
+     */
+    function interledgerAbortBatch(uint256[] memory ids, uint256[] memory reasons) public;
 }
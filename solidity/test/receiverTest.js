@@ -22,6 +22,20 @@ contract("DataReceiver", accounts => {
 	    assert.equal(first.data, web3.utils.fromUtf8(data), "data should be dummy");
             
         });
+
+        it("Should receive a batch of data", async() => {
+
+            let receiver = await Receiver.deployed();
+
+            let tx = await receiver.interledgerReceiveBatch([2, 3], [web3.utils.fromUtf8(data), web3.utils.fromUtf8(data)]);
+	    let second = await receiver.dataItems(1);
+	    let third = await receiver.dataItems(2);
+
+            assert.equal(second.nonce, 2, "id should be 2");
+            assert.equal(third.nonce, 3, "id should be 3");
+	    assert.equal(third.data, web3.utils.fromUtf8(data), "data should be dummy");
+            assert.equal(tx.logs.filter(log => log.event == "InterledgerEventAccepted").length, 2, "each item should be accepted");
+        });
             
     });
 
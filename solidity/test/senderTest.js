@@ -19,6 +19,17 @@ contract("DataSender", accounts => {
             assert.equal(await sender.id(), 1, "id should be 1");
             
         });
+
+        it("Should commit and abort batches", async() => {
+
+            let sender = await Sender.deployed();
+
+            let commit = await sender.interledgerCommitBatch([1, 2]);
+            assert.equal(commit.receipt.status, true, "commit batch should succeed");
+
+            let abort = await sender.interledgerAbortBatch([3, 4], [2, 2]);
+            assert.equal(abort.receipt.status, true, "abort batch should succeed");
+        });
             
     });
 
@@ -1,19 +1,29 @@
 import asyncio
+import threading
+from contextlib import nullcontext
 from typing import List
-import functools
 import web3
 Web3 = web3.Web3
 from web3.middleware import geth_poa_middleware
+from hexbytes import HexBytes
 
 from .interfaces import Initiator, Responder, MultiResponder, ErrorCode, LedgerType
+from .jsonrpc import AsyncJsonRpc
+from .log_cursor import LogCursor
+from .nonce_manager import NonceManager
+from .receipts import ReceiptTracker, ReceiptTimeout
 from ..transfer import Transfer
 
 
 # Web3 util
 class Web3Initializer:
     """This provides proper web3 wrapper for a component
+
+    Besides http(s):// and ws(s):// node endpoints, a tester://<name> url connects the component to an in-process
+    Ethereum chain (eth-tester with the py-evm backend, to be installed separately), one chain per name, shared by
+    all the components of the process using that name, e.g. tester://left and tester://right.
     """
-    def __init__(self, url: str, port=None, poa=None):
+    def __init__(self, url: str, port=None, poa=None, async_rpc: bool = False, metrics=None):
         protocol = url.split(":")[0].lower()
         path = url
         if port:
@@ -22,10 +32,27 @@ class Web3Initializer:
             self.web3 = Web3(Web3.HTTPProvider(path))
         elif protocol in ("ws", "wss"):
             self.web3 = Web3(Web3.WebsocketProvider(path))
+        elif protocol == "tester":
+            if async_rpc:
+                raise ValueError("The asynchronous transport is not supported by the in-process tester")
+            self.web3 = Web3(tester_provider(path))
         else:
             raise ValueError("Unsupported Web3 protocol")
         if poa:
             self.web3.middleware_onion.inject(geth_poa_middleware, layer=0)
+        # with the asynchronous transport, the ledger operations are sent through this client
+        # and web3 is only used to encode and decode the contract calls and events
+        self.rpc = AsyncJsonRpc(path, metrics=metrics) if async_rpc else None
+        # latency of the ledger requests, recorded by the asynchronous client when there is one
+        self.metrics = metrics
+        self.endpoint = path
+
+    def _timer(self, method: str):
+        """Context manager recording the latency of a blocking web3 call in the metrics, if any
+        """
+        if self.metrics is None or self.rpc is not None:
+            return nullcontext()
+        return self.metrics.timer('interledger_rpc_seconds', endpoint=self.endpoint, method=method)
 
     def isUnlocked(self, account):
         try:
@@ -35,31 +62,322 @@ class Web3Initializer:
         return True
 
 
+class TesterProvider(Web3.EthereumTesterProvider):
+    """In-process chain of a tester:// url. The requests are serialized, since the adapters also call web3
+    from the threads of the event loop executor.
+    """
+
+    def __init__(self, url: str):
+        super().__init__()
+        self.endpoint_uri = url
+        self.lock = threading.Lock()
+
+    def make_request(self, method, params):
+        with self.lock:
+            return super().make_request(method, params)
+
+
+# tester:// url -> TesterProvider
+_tester_providers = {}
+
+
+def tester_provider(url: str) -> TesterProvider:
+    """The provider of the in-process chain of a tester:// url, created on first use
+    """
+    if url not in _tester_providers:
+        _tester_providers[url] = TesterProvider(url)
+    return _tester_providers[url]
+
+
+class Web3Transactor(Web3Initializer):
+    """Sends the transactions of a component from its minter account, which is unlocked either
+    with a private key, with a password, or not at all.
+
+    Transactions signed with the private key take their nonce from the NonceManager shared by all
+    the components using the same minter, so that several of them can be pending at the same time.
+    The receipts are awaited through the ReceiptTracker shared by all the components of the endpoint.
+    """
+
+    def __init__(self, url: str, port=None, poa=None, minter: str = None, private_key: str = None,
+                 password: str = None, async_rpc: bool = False, metrics=None):
+        Web3Initializer.__init__(self, url, port, poa, async_rpc, metrics)
+        self.private_key = private_key
+        self.minter = minter
+        self.password = password
+        self.timeout = 120
+        self.nonces = NonceManager.shared(self.web3, minter) if private_key else None
+        self.receipts = ReceiptTracker.shared(self.web3, self.rpc)
+        self.chain_id = None
+        self.unlocking = None  # serializes unlock / transact / lock with the asynchronous transport
+
+    async def _execute(self, function, prefix: str = '', keys: list = None) -> tuple:
+        """Send a transaction calling a contract function and wait for its receipt.
+
+        :param object function: the contract function call to transact
+        :param str prefix: prefix of the keys of the failure result, 'commit' or 'abort' for the Initiator
+        :param list keys: the nonces or ids of the data items of the transaction, reported to on_submitted
+
+        :returns: (tx_hash, tx_receipt, failure), where failure is the result to return if the transaction failed,
+            None otherwise
+        :rtype: tuple
+        """
+        try:
+            if self.rpc:
+                tx_hash = await self._transact_async(function)
+            else:
+                with self._timer('transact'):
+                    tx_hash = self._transact(function)
+        except ValueError as e:
+            # Raised by a contract function
+            return None, None, _result(prefix, False, None, ErrorCode.TRANSACTION_FAILURE, _error_message(e), e)
+        if tx_hash is None:
+            return None, None, _result(prefix, False, None, ErrorCode.TRANSACTION_FAILURE, "Wrong password")
+        if self.on_submitted is not None and keys:
+            self.on_submitted(keys, tx_hash)
+        return await self._wait(tx_hash, prefix)
+
+    async def _wait(self, tx_hash, prefix: str = '') -> tuple:
+        """Wait for the receipt of a transaction, see _execute()
+        """
+        try:
+            with self._timer('receipt'):
+                tx_receipt = await self.receipts.wait(tx_hash, self.timeout)
+            if self.rpc:
+                tx_receipt = _format_receipt(tx_receipt)
+            if self.nonces:
+                self.nonces.mined(tx_hash)
+
+            if tx_receipt['status']:
+                return tx_hash, tx_receipt, None
+            else:
+                # TODO #tx_receipt there is not much documentation about transaction receipt
+                # and the values that 'status' can get
+                # if a transaction fails, I guess web3py just raises a ValueError exception
+                return tx_hash, tx_receipt, _result(prefix, False, tx_hash, ErrorCode.TRANSACTION_FAILURE,
+                                                    "Error in the transaction")
+        except ReceiptTimeout as e:
+            # Raised by the receipt tracker
+            return tx_hash, None, _result(prefix, False, tx_hash, ErrorCode.TIMEOUT,
+                                          "Timeout after sending the transaction", e)
+        except ValueError as e:
+            # Raised by a contract function
+            return tx_hash, None, _result(prefix, False, tx_hash, ErrorCode.TRANSACTION_FAILURE, _error_message(e), e)
+
+    def _transact(self, function):
+        """Send a transaction calling a contract function from the minter account.
+
+        :returns: the transaction hash, None if the account could not be unlocked with the password
+        """
+        # unlock using the private key
+        if self.private_key and not self.isUnlocked(self.minter): # needs to unlock with private key
+            return self._send_signed(function)
+        # unlock using password
+        elif self.password is not None:
+            unlock = self.web3.geth.personal.unlockAccount(self.minter, self.password, 0) # unlock indefinitely
+            if not unlock:
+                return None
+            tx_hash = function.transact({'from': self.minter})
+            # lock the account again
+            self.web3.geth.personal.lockAccount(self.minter)
+            return tx_hash
+        # no need to unlock
+        else:
+            return function.transact({'from': self.minter})
+
+    def _send_signed(self, function):
+        """Sign a transaction with the private key, using a nonce of the shared NonceManager.
+        If the node reports the nonce as already used, the nonce is read again from the ledger and
+        the transaction is sent once more.
+        """
+        transaction = function.buildTransaction({'from': self.minter})
+        retry = True
+        while True:
+            nonce = self.nonces.acquire()
+            transaction.update({'nonce': nonce})
+            signed_tx = self.web3.eth.account.signTransaction(transaction, self.private_key)
+            try:
+                tx_hash = self.web3.eth.sendRawTransaction(signed_tx.rawTransaction)
+            except ValueError as e:
+                if retry and NonceManager.is_nonce_error(e):
+                    self.nonces.resync()
+                    retry = False
+                    continue
+                self.nonces.release(nonce)
+                raise
+            self.nonces.sent(nonce, tx_hash)
+            return tx_hash
+
+    # Asynchronous transport
+
+    async def _transact_async(self, function):
+        """Same as _transact(), through the asynchronous JSON-RPC client
+        """
+        transaction = {'from': self.minter, 'to': function.address, 'data': function._encode_transaction_data()}
+        # unlock using the private key
+        if self.private_key and not await self._is_unlocked_async():
+            return await self._send_signed_async(transaction)
+        # unlock using password
+        elif self.password is not None:
+            if self.unlocking is None:
+                self.unlocking = asyncio.Lock()
+            async with self.unlocking:
+                unlock = await self.rpc.request('personal_unlockAccount', [self.minter, self.password, 0])
+                if not unlock:
+                    return None
+                tx_hash = await self.rpc.request('eth_sendTransaction', [transaction])
+                # lock the account again
+                await self.rpc.request('personal_lockAccount', [self.minter])
+            return HexBytes(tx_hash)
+        # no need to unlock
+        else:
+            return HexBytes(await self.rpc.request('eth_sendTransaction', [transaction]))
+
+    async def _is_unlocked_async(self) -> bool:
+        try:
+            await self.rpc.request('eth_sign', [self.minter, '0x01'])
+        except Exception as e:
+            return False
+        return True
+
+    async def _send_signed_async(self, transaction: dict):
+        """Same as _send_signed(), through the asynchronous JSON-RPC client
+        """
+        if self.chain_id is None:
+            self.chain_id = int(await self.rpc.request('eth_chainId'), 16)
+        gas, gas_price = await asyncio.gather(self.rpc.request('eth_estimateGas', [transaction]),
+                                              self.rpc.request('eth_gasPrice'))
+        transaction.update({'gas': int(gas, 16), 'gasPrice': int(gas_price, 16), 'chainId': self.chain_id,
+                            'value': 0})
+        retry = True
+        while True:
+            nonce = await self.nonces.acquire_async(self.rpc)
+            transaction.update({'nonce': nonce})
+            signed_tx = self.web3.eth.account.signTransaction(transaction, self.private_key)
+            try:
+                tx_hash = HexBytes(await self.rpc.request('eth_sendRawTransaction', [signed_tx.rawTransaction.hex()]))
+            except ValueError as e:
+                if retry and NonceManager.is_nonce_error(e):
+                    await self.nonces.resync_async(self.rpc)
+                    retry = False
+                    continue
+                self.nonces.release(nonce)
+                raise
+            self.nonces.sent(nonce, tx_hash)
+            return tx_hash
+
+
+def _format_log(log: dict) -> dict:
+    """Convert a log returned by the JSON-RPC API to the format of the logs returned by web3
+    """
+    log = dict(log)
+    for key in ('blockNumber', 'logIndex', 'transactionIndex'):
+        if log.get(key) is not None:
+            log[key] = int(log[key], 16)
+    for key in ('blockHash', 'transactionHash'):
+        if log.get(key) is not None:
+            log[key] = HexBytes(log[key])
+    log['topics'] = [HexBytes(topic) for topic in log['topics']]
+    log['address'] = Web3.toChecksumAddress(log['address'])
+    return log
+
+
+def _format_receipt(receipt: dict) -> dict:
+    """Convert a receipt returned by the JSON-RPC API to the format of the receipts returned by web3
+    """
+    receipt = dict(receipt)
+    for key in ('blockNumber', 'status', 'gasUsed', 'cumulativeGasUsed', 'transactionIndex'):
+        if receipt.get(key) is not None:
+            receipt[key] = int(receipt[key], 16)
+    for key in ('blockHash', 'transactionHash'):
+        if receipt.get(key) is not None:
+            receipt[key] = HexBytes(receipt[key])
+    receipt['logs'] = [_format_log(log) for log in receipt.get('logs', [])]
+    return receipt
+
+
+def _result(prefix: str, status: bool, tx_hash, error_code: ErrorCode = None, message: str = None,
+            exception: Exception = None) -> dict:
+    """Build the result of an operation, the keys of the Initiator results are prefixed with 'commit_' or 'abort_'
+    """
+    prefix = prefix + '_' if prefix else ''
+    result = {prefix + "status": status,
+              prefix + "tx_hash": tx_hash}
+    if error_code is not None:
+        result[prefix + "error_code"] = error_code
+        result[prefix + "message"] = message
+    if exception is not None:
+        result["exception"] = exception
+    return result
+
+
+def _error_message(error: ValueError) -> str:
+    """The message of an error returned by the node
+    """
+    if error.args and isinstance(error.args[0], dict):
+        return error.args[0].get('message')
+    return str(error)
+
+
 # Initiator implementation
-class EthereumInitiator(Web3Initializer, Initiator):
+class EthereumInitiator(Web3Transactor, Initiator):
     """Ethereum implementation of the Initiator.
     """
-    def __init__(self, minter: str, contract_address: str, contract_abi: object, 
-                 url: str, port: int = None, private_key: str = None, password: str = None, poa=None):
+    def __init__(self, minter: str, contract_address: str, contract_abi: object,
+                 url: str, port: int = None, private_key: str = None, password: str = None, poa=None,
+                 async_rpc: bool = False, log_chunk_size: int = 2000, log_parallel: int = 4,
+                 subscribe: bool = False, metrics=None):
         """
         :param str minter: The contract minter who is in charge of data emiting and committing the status of the data transfer
-        :param str contract_address: The address of data transfer contract implementing Interledger interface 
+        :param str contract_address: The address of data transfer contract implementing Interledger interface
         :param object contract_abi: Contract ABI
         :param str url: The web3 url
         :param int port: The web3 port, if any (default=None)
         :param str private_key: The private key to unlock the account if used
         :param str password: The password to unlock the account if used
         :param bool poa: The indicator for whether to inject the PoA middleware
+        :param bool async_rpc: Whether to use the asynchronous JSON-RPC transport instead of the blocking web3 calls
+        :param int log_chunk_size: Maximum number of blocks read by one eth_getLogs request
+        :param int log_parallel: Maximum number of eth_getLogs requests sent at the same time when catching up
+        :param bool subscribe: Whether the events are pushed by eth_subscribe instead of polled,
+            requires the asynchronous transport over WebSocket
+        :param object metrics: The Metrics recording the latency of the requests to the node, if any
         """
-        Web3Initializer.__init__(self, url, port, poa)
+        Web3Transactor.__init__(self, url, port, poa, minter, private_key, password, async_rpc, metrics)
         self.contract = self.web3.eth.contract(abi=contract_abi, address=contract_address)
-        self.last_block = self.web3.eth.blockNumber
-        self.private_key = private_key
-        self.minter = minter
-        self.password = password
-        self.timeout = 120
+        self.cursor = LogCursor(self.web3.eth.blockNumber, log_chunk_size, log_parallel)
+        self.event_topic = Web3.keccak(text="InterledgerEventSending(uint256,bytes)").hex()
         self.ledger_type = LedgerType.ETHEREUM
 
+        # subscription mode
+        if subscribe and (self.rpc is None or not self.rpc.websocket):
+            raise ValueError("The subscription mode requires the asynchronous transport over WebSocket")
+        self.subscribe = subscribe
+        self.pushed = None        # queue of the notifications of the current subscriptions
+        self.heads = None         # id of the newHeads subscription
+        self.catch_up_to = None   # block up to which the events are read by range after (re)subscribing
+        self.seen = {}            # (tx hash, log index) -> block number of the events above the cursor
+        self.subscribing = None
+
+    @property
+    def last_block(self) -> int:
+        """The last block whose events have been read
+        """
+        return self.cursor.last_block
+
+    @last_block.setter
+    def last_block(self, block: int):
+        self.cursor.last_block = block
+
+    def get_position(self) -> int:
+        """The last block whose events have been read
+        """
+        return self.cursor.last_block
+
+    def set_position(self, position: int) -> None:
+        """Resume reading the events from the block after position
+        """
+        self.cursor.last_block = position
+
     # Initiator functions
     async def listen_for_events(self) -> list:
         """Listen for events fired by the Initiator injected contract stored in the connected Ethereum network.
@@ -67,16 +385,13 @@ class EthereumInitiator(Web3Initializer, Initiator):
         :returns: The event transfer lists
         :rtype: list
         """
-        # Create event filter for the event to pay attention to
-        filt = self.contract \
-                .events.InterledgerEventSending() \
-                .createFilter(fromBlock=self.last_block+1) # +1 otherwise gets again older block
-        entries = filt.get_all_entries()
+        if self.subscribe:
+            return self._buffer_data(await self._pushed_events())
+
+        entries = await self._scan_events()
         if len(entries) == 0:
             await asyncio.sleep(0.5)
-            entries = filt.get_all_entries()
-        # update block number
-        self.last_block = self.web3.eth.blockNumber
+            entries = await self._scan_events()
         # Transform entries in Transfer object
         return self._buffer_data(entries)
 
@@ -95,77 +410,13 @@ class EthereumInitiator(Web3Initializer, Initiator):
             'commit_message': str      # only with errors
         }
         """
-        commit_tx_hash = None
-        try:
-            # unlock using private key
-            if self.private_key and not self.isUnlocked(self.minter): # needs to unlock with private key
-                if data: # pass data to interledgerCommit if it is available
-                    transaction = self.contract.functions \
-                        .interledgerCommit(Web3.toInt(text=id), data) \
-                        .buildTransaction({'from': self.minter})
-                else:
-                    transaction = self.contract.functions \
-                        .interledgerCommit(Web3.toInt(text=id)) \
-                        .buildTransaction({'from': self.minter})
-                transaction.update({'nonce': self.web3.eth.getTransactionCount(self.minter)})
-                signed_tx = self.web3.eth.account.signTransaction(transaction, self.private_key)
-                commit_tx_hash = self.web3.eth.sendRawTransaction(signed_tx.rawTransaction)
-            # unlock using password
-            elif self.password is not None:
-                unlock = self.web3.geth.personal.unlockAccount(self.minter, self.password, 0) # unlock indefinitely
-                if not unlock:
-                    return {"status": False, 
-                            "error_code": ErrorCode.TRANSACTION_FAILURE,
-                            "message": "Wrong password",
-                            "commit_tx_hash": None}
-                if data: # pass data to interledgerCommit if it is available
-                    commit_tx_hash = self.contract.functions \
-                        .interledgerCommit(Web3.toInt(text=id), data) \
-                        .transact({'from': self.minter}) # type uint256 required for id in the smart contract
-                else:
-                    commit_tx_hash = self.contract.functions \
-                        .interledgerCommit(Web3.toInt(text=id)) \
-                        .transact({'from': self.minter}) # type uint256 required for id in the smart contract
-                # lock the account again
-                self.web3.geth.personal.lockAccount(self.minter)
-            # no need to unlock
-            else:
-                if data: # pass data to interledgerCommit if it is available
-                    commit_tx_hash = self.contract.functions \
-                        .interledgerCommit(Web3.toInt(text=id), data) \
-                        .transact({'from': self.minter}) # type uint256 required for id in the smart contract
-                else:
-                    commit_tx_hash = self.contract.functions \
-                        .interledgerCommit(Web3.toInt(text=id)) \
-                        .transact({'from': self.minter}) # type uint256 required for id in the smart contract
-            # tx_receipt = self.web3.eth.waitForTransactionReceipt(commit_tx_hash, timeout=self.timeout)
-            tx_receipt = await asyncio.get_event_loop().run_in_executor(
-                None, functools.partial(self.web3.eth.waitForTransactionReceipt, commit_tx_hash, timeout=self.timeout))
-
-            if tx_receipt['status']:
-                return {"commit_status": True,
-                        "commit_tx_hash": commit_tx_hash}
-            else:
-                # TODO search: #tx_receipt
-                return {"commit_status": False, 
-                        "commit_error_code": ErrorCode.TRANSACTION_FAILURE,
-                        "commit_message": "Error in the transaction",
-                        "commit_tx_hash": commit_tx_hash}
-        except web3.exceptions.TimeExhausted as e:
-            # Raised by web3.eth.waitForTransactionReceipt
-            return {"commit_status": False, 
-                    "commit_error_code": ErrorCode.TIMEOUT,
-                    "commit_message": "Timeout after sending the transaction",
-                    "commit_tx_hash": commit_tx_hash,
-                    "exception": e}
-        except ValueError as e:
-            # Raised by a contract function 
-            d = eval(e.__str__())
-            return {"commit_status": False, 
-                    "commit_error_code": ErrorCode.TRANSACTION_FAILURE, 
-                    "commit_message": d['message'],
-                    "commit_tx_hash": commit_tx_hash,
-                    "exception": e}
+        # type uint256 required for id in the smart contract
+        if data: # pass data to interledgerCommit if it is available
+            function = self.contract.functions.interledgerCommit(Web3.toInt(text=id), data)
+        else:
+            function = self.contract.functions.interledgerCommit(Web3.toInt(text=id))
+        tx_hash, _, failure = await self._execute(function, 'commit', [id])
+        return failure or _result('commit', True, tx_hash)
 
     async def abort_sending(self, id: str, reason: int) -> dict:
         """Initiate the abort operation to the connected ledger.
@@ -181,62 +432,159 @@ class EthereumInitiator(Web3Initializer, Initiator):
             'abort_message': str      # only with errors
         }
         """
-        abort_tx_hash = None
+        # type uint256 required for id in the smart contract
+        function = self.contract.functions.interledgerAbort(Web3.toInt(text=id), reason)
+        tx_hash, _, failure = await self._execute(function, 'abort', [id])
+        return failure or _result('abort', True, tx_hash)
+
+    async def commit_sending_batch(self, ids: list) -> list:
+        """Initiate the commit operation of several data items with a single interledgerCommitBatch() transaction.
+        If the batch is reverted, its items are committed one by one so that only the failing ones are reported.
+
+        :param list ids: the identifiers in the originating ledger of the data items
+
+        :returns: the result of each data item, in the same order as ids, with the format of commit_sending()
+        :rtype: list
+        """
+        function = self.contract.functions.interledgerCommitBatch([Web3.toInt(text=id) for id in ids])
+        results = await self._confirm_batch('commit', function, ids)
+        if len(ids) > 1 and results[0].get('commit_error_code') == ErrorCode.TRANSACTION_FAILURE:
+            return await asyncio.gather(*[self.commit_sending(id) for id in ids])
+        return results
+
+    async def abort_sending_batch(self, ids: list, reasons: list) -> list:
+        """Initiate the abort operation of several data items with a single interledgerAbortBatch() transaction.
+        If the batch is reverted, its items are aborted one by one so that only the failing ones are reported.
+
+        :param list ids: the identifiers in the originating ledger of the data items
+        :param list reasons: the description on why each data transfer is aborted, in the same order as ids
+
+        :returns: the result of each data item, in the same order as ids, with the format of abort_sending()
+        :rtype: list
+        """
+        function = self.contract.functions.interledgerAbortBatch([Web3.toInt(text=id) for id in ids], reasons)
+        results = await self._confirm_batch('abort', function, ids)
+        if len(ids) > 1 and results[0].get('abort_error_code') == ErrorCode.TRANSACTION_FAILURE:
+            return await asyncio.gather(*[self.abort_sending(id, reason) for id, reason in zip(ids, reasons)])
+        return results
+
+    async def _confirm_batch(self, prefix: str, function, ids: list) -> list:
+        """Send a batch commit or abort transaction and wait for its receipt.
+
+        :param str prefix: 'commit' or 'abort', the prefix of the result keys
+        :param object function: the contract function call to transact
+        :param list ids: the identifiers of the items in the batch
+
+        :returns: the same result for each item of the batch
+        :rtype: list
+        """
+        tx_hash, _, failure = await self._execute(function, prefix, ids)
+        result = failure or _result(prefix, True, tx_hash)
+        return [dict(result) for _ in ids]
+
+    async def resume_confirm(self, id: str, tx_hash, commit: bool, reason: int = None) -> dict:
+        """Wait for the receipt of a commit or abort transaction sent before a restart
+
+        :returns: the result, with the format of commit_sending() or abort_sending()
+        :rtype: dict
+        """
+        prefix = 'commit' if commit else 'abort'
+        tx_hash, _, failure = await self._wait(HexBytes(tx_hash), prefix)
+        return failure or _result(prefix, True, tx_hash)
+
+    async def _scan_events(self) -> list:
+        """Read the InterledgerEventSending() events of the blocks mined since the last block read
+        """
+        logs = await self.cursor.scan(await self._block_number(), self._get_logs)
+        event = self.contract.events.InterledgerEventSending()
+        return [event.processLog(log) for log in logs]
+
+    async def _block_number(self) -> int:
+        if self.rpc:
+            return int(await self.rpc.request('eth_blockNumber'), 16)
+        return await asyncio.get_event_loop().run_in_executor(None, lambda: self.web3.eth.blockNumber)
+
+    async def _pushed_events(self) -> list:
+        """Wait for the InterledgerEventSending() events pushed by the node.
+        After (re)subscribing, the events of the blocks mined while not subscribed are read by range first.
+        The newHeads notifications move the cursor forward, so that the next catch-up starts from there.
+        """
+        if self.pushed is None or self.catch_up_to is not None:
+            if self.subscribing is None:
+                self.subscribing = asyncio.Lock()
+            async with self.subscribing:
+                if self.pushed is None:
+                    await self._subscribe_events()
+                    self.catch_up_to = await self._block_number()
+                if self.catch_up_to is not None:
+                    logs = await self.cursor.scan(self.catch_up_to, self._get_logs)
+                    if self.cursor.last_block >= self.catch_up_to:
+                        self.catch_up_to = None
+                    entries = self._unseen(logs)
+                    if entries:
+                        return entries
+
+        queue = self.pushed
         try:
-            # unlock using the private key
-            if self.private_key and not self.isUnlocked(self.minter): # needs to unlock with private key
-                transaction = self.contract.functions \
-                    .interledgerAbort(Web3.toInt(text=id), reason) \
-                    .buildTransaction({'from': self.minter})
-                transaction.update({'nonce': self.web3.eth.getTransactionCount(self.minter)})
-                signed_tx = self.web3.eth.account.signTransaction(transaction, self.private_key)
-                abort_tx_hash = self.web3.eth.sendRawTransaction(signed_tx.rawTransaction)
-            # unlock using password
-            elif self.password is not None:
-                unlock = self.web3.geth.personal.unlockAccount(self.minter, self.password, 0) # unlock indefinitely
-                if not unlock:
-                    return {"status": False, 
-                            "error_code": ErrorCode.TRANSACTION_FAILURE,
-                            "message": "Wrong password",
-                            "abort_tx_hash": None}
-                abort_tx_hash = self.contract.functions \
-                    .interledgerAbort(Web3.toInt(text=id), reason) \
-                    .transact({'from': self.minter}) # type uint256 required for id in the smart contract
-                # lock the account again
-                self.web3.geth.personal.lockAccount(self.minter)
-            # no need to unlock
-            else:
-                abort_tx_hash = self.contract.functions \
-                    .interledgerAbort(Web3.toInt(text=id), reason) \
-                    .transact({'from': self.minter}) # type uint256 required for id in the smart contract
-            # tx_receipt = self.web3.eth.waitForTransactionReceipt(abort_tx_hash, timeout=self.timeout)
-            tx_receipt = await asyncio.get_event_loop().run_in_executor(
-                None, functools.partial(self.web3.eth.waitForTransactionReceipt, abort_tx_hash, timeout=self.timeout))
-
-            if tx_receipt['status']:            
-                return {"abort_status": True,
-                        "abort_tx_hash": abort_tx_hash}
-            else:
-                # TODO search: #tx_receipt
-                return {"abort_status": False,
-                        "abort_error_code": ErrorCode.TRANSACTION_FAILURE,
-                        "abort_message": "Error in the transaction",
-                        "abort_tx_hash": abort_tx_hash}
-        except web3.exceptions.TimeExhausted as e:
-            # Raised by web3.eth.waitForTransactionReceipt
-            return {"abort_status": False, 
-                    "abort_error_code": ErrorCode.TIMEOUT,
-                    "abort_message": "Timeout after sending the transaction",
-                    "abort_tx_hash": abort_tx_hash,
-                    "exception": e}
-        except ValueError as e:
-            # Raised by a contract function 
-            d = eval(e.__str__())
-            return {"abort_status": False, 
-                    "abort_error_code": ErrorCode.TRANSACTION_FAILURE, 
-                    "abort_message": d['message'],
-                    "abort_tx_hash": abort_tx_hash,
-                    "exception": e}
+            items = [await asyncio.wait_for(queue.get(), 0.5)]
+        except asyncio.TimeoutError:
+            return []
+        while not queue.empty():
+            items.append(queue.get_nowait())
+
+        logs = []
+        for item in items:
+            if item is None:
+                # the connection was lost: subscribe again and read the missed blocks at the next call
+                if self.pushed is queue:
+                    self.pushed = None
+                continue
+            subscription, result = item
+            if subscription == self.heads:
+                if self.catch_up_to is None:
+                    # the events of the parent block have all been pushed
+                    self.cursor.last_block = max(self.cursor.last_block, int(result['number'], 16) - 1)
+                    self.seen = {key: block for key, block in self.seen.items() if block > self.cursor.last_block}
+            elif not result.get('removed'):
+                logs.append(_format_log(result))
+        return self._unseen(logs)
+
+    async def _subscribe_events(self):
+        """Subscribe to the InterledgerEventSending() logs of the contract and to the new blocks
+        """
+        queue = asyncio.Queue()
+        await self.rpc.subscribe(['logs', {'address': self.contract.address, 'topics': [self.event_topic]}], queue)
+        self.heads, _ = await self.rpc.subscribe(['newHeads'], queue)
+        self.pushed = queue
+
+    def _unseen(self, logs: list) -> list:
+        """Decode the logs which have not been received yet, either pushed or read by range
+        """
+        event = self.contract.events.InterledgerEventSending()
+        entries = []
+        for log in logs:
+            key = (log['transactionHash'], log['logIndex'])
+            if key in self.seen:
+                continue
+            self.seen[key] = log['blockNumber']
+            entries.append(event.processLog(log))
+        return entries
+
+    async def _get_logs(self, from_block: int, to_block: int) -> list:
+        """Read the InterledgerEventSending() logs of a range of blocks, both included
+        """
+        if self.rpc:
+            logs = await self.rpc.request('eth_getLogs', [{
+                'address': self.contract.address,
+                'topics': [self.event_topic],
+                'fromBlock': hex(from_block),
+                'toBlock': hex(to_block)}])
+            return [_format_log(log) for log in logs]
+        return await asyncio.get_event_loop().run_in_executor(None, self.web3.eth.getLogs, {
+            'address': self.contract.address,
+            'topics': [self.event_topic],
+            'fromBlock': from_block,
+            'toBlock': to_block})
 
     # Helper function
     def _buffer_data(self, entries: list):
@@ -248,37 +596,33 @@ class EthereumInitiator(Web3Initializer, Initiator):
             args = entry['args']
             transfer.payload = {'id': str(args['id']), 'data': args['data']} # id will be string inside interledger
             transfers.append(transfer)
-            print("*********** buffer data *************")
-            print(f"{transfer.payload}")
-            print("*************************************")
         return transfers
 
 
 # Responder implementation
-class EthereumResponder(Web3Initializer, Responder):
+class EthereumResponder(Web3Transactor, Responder):
     """
     Ethereum implementation of the Responder.
     """
 
-    def __init__(self, minter: str, contract_address: str, contract_abi: object, 
-                 url: str, port: int = None, private_key: str = None, password: str = None, poa=None):
+    def __init__(self, minter: str, contract_address: str, contract_abi: object,
+                 url: str, port: int = None, private_key: str = None, password: str = None, poa=None,
+                 async_rpc: bool = False, metrics=None):
         """
         :param str minter: The contract minter who is in charge of data collecting
-        :param str contract_address: The address of data transfer contract implementing Interledger interface 
-        :param object contract_abi: Contract ABI 
+        :param str contract_address: The address of data transfer contract implementing Interledger interface
+        :param object contract_abi: Contract ABI
         :param str url: The web3 url
-        :param int port: The web3 port, if any (default=None) 
+        :param int port: The web3 port, if any (default=None)
         :param str private_key: The private key to unlock the account if used
         :param str password: The password to unlock the account if used
         :param bool poa: The indicator for whether to inject the PoA middleware
+        :param bool async_rpc: Whether to use the asynchronous JSON-RPC transport instead of the blocking web3 calls
+        :param object metrics: The Metrics recording the latency of the requests to the node, if any
         """
-        Web3Initializer.__init__(self, url, port, poa)
+        Web3Transactor.__init__(self, url, port, poa, minter, private_key, password, async_rpc, metrics)
         self.contract = self.web3.eth.contract(abi=contract_abi, address=contract_address)
         self.last_block = self.web3.eth.blockNumber
-        self.private_key = private_key
-        self.minter = minter
-        self.password = password
-        self.timeout=120
         self.ledger_type = LedgerType.ETHEREUM
 
 
@@ -297,85 +641,73 @@ class EthereumResponder(Web3Initializer, Responder):
             'message': str      # only with errors
         }
         """
-        # Return transaction hash, need to wait for receipt
-        tx_hash = None
-        tx_receipt = None
-        try:
-            # unlock using private_key
-            if self.private_key and not self.isUnlocked(self.minter): # needs to unlock with private key
-                print("unlock with priv_key")
-                transaction = self.contract.functions \
-                    .interledgerReceive(Web3.toInt(text=nonce), data) \
-                    .buildTransaction({'from': self.minter})
-                transaction.update({'nonce': self.web3.eth.getTransactionCount(self.minter)})
-                signed_tx = self.web3.eth.account.signTransaction(transaction, self.private_key)
-                tx_hash = self.web3.eth.sendRawTransaction(signed_tx.rawTransaction)
-            # unlock using password
-            elif self.password is not None:
-                print("unlock with password")
-                unlock = self.web3.geth.personal.unlockAccount(self.minter, self.password, 0) # unlock indefinitely
-                if not unlock:
-                    return {"status": False, 
-                            "error_code": ErrorCode.TRANSACTION_FAILURE,
-                            "message": "Wrong password",
-                            "tx_hash": None}
-                tx_hash = self.contract.functions \
-                    .interledgerReceive(Web3.toInt(text=nonce), data) \
-                    .transact({'from': self.minter})
-                # lock the account again
-                self.web3.geth.personal.lockAccount(self.minter)
-            # no need to unlock
-            else:
-                print("default")
-                tx_hash = self.contract.functions \
-                    .interledgerReceive(Web3.toInt(text=nonce), data) \
-                    .transact({'from': self.minter})
-            # tx_receipt = self.web3.eth.waitForTransactionReceipt(tx_hash, timeout=self.timeout)
-            tx_receipt = await asyncio.get_event_loop().run_in_executor(
-                None, functools.partial(self.web3.eth.waitForTransactionReceipt, tx_hash, timeout=self.timeout))
-
-            if tx_receipt['status']:    
-                logs_accept = self.contract.events.InterledgerEventAccepted().processReceipt(tx_receipt)
-                logs_reject = self.contract.events.InterledgerEventRejected().processReceipt(tx_receipt)
-                if len(logs_reject) != 0 and logs_reject[0]['args']['nonce'] == int(nonce):
-                    return {"status": False, 
-                            "error_code": ErrorCode.APPLICATION_REJECT,
-                            "message": "InterledgerEventRejected() event received",
-                            "tx_hash": tx_hash}
-                if len(logs_accept) != 0 and logs_accept[0]['args']['nonce'] == int(nonce):
-                    return {"status": True,
-                            "tx_hash": tx_hash}
-                else:
-                    return {"status": False, 
-                            "error_code": ErrorCode.TRANSACTION_FAILURE,
-                            "message": "No InterledgerEventAccepted() or InterledgerEventRejected() event received",
-                            "tx_hash": tx_hash}
+        function = self.contract.functions.interledgerReceive(Web3.toInt(text=nonce), data)
+        tx_hash, tx_receipt, failure = await self._execute(function, keys=[nonce])
+        if failure:
+            return failure
+        return self._receive_results(tx_receipt, tx_hash, [int(nonce)])[0]
+
+    async def resume_send(self, nonce: str, data: bytes, tx_hash) -> dict:
+        """Wait for the receipt of an interledgerReceive() or interledgerReceiveBatch() transaction
+        sent before a restart
+
+        :returns: the result, with the format of send_data()
+        :rtype: dict
+        """
+        tx_hash, tx_receipt, failure = await self._wait(HexBytes(tx_hash))
+        if failure:
+            return failure
+        return self._receive_results(tx_receipt, tx_hash, [int(nonce)])[0]
+
+    async def send_data_batch(self, nonces: list, data: list) -> list:
+        """Initiate the interledger receive operation of several data items with a single
+        interledgerReceiveBatch() transaction.
+
+        :param list nonces: the identifiers to be unique inside interledger, one per data item
+        :param list data: the actual contents of data in bytes string, in the same order as nonces
+
+        :returns: the result of each data item, in the same order as nonces, with the format of send_data()
+        :rtype: list
+        """
+        int_nonces = [Web3.toInt(text=nonce) for nonce in nonces]
+        function = self.contract.functions.interledgerReceiveBatch(int_nonces, data)
+        tx_hash, tx_receipt, failure = await self._execute(function, keys=nonces)
+        if failure:
+            return [dict(failure) for _ in nonces]
+        return self._receive_results(tx_receipt, tx_hash, int_nonces)
+
+    def _receive_results(self, tx_receipt, tx_hash, nonces: list, inquiry: bool = False) -> list:
+        """Map the accepted / rejected events of a transaction receipt back to each data item
+
+        :param list nonces: the nonces of the data items, as integers
+        :param bool inquiry: whether to look for the inquiry events instead of the receive events
+
+        :returns: the result of each data item, in the same order as nonces
+        :rtype: list
+        """
+        if inquiry:
+            events = self.contract.events.InterledgerInquiryAccepted, self.contract.events.InterledgerInquiryRejected
+            names, reject_code = ("InterledgerInquiryAccepted()", "InterledgerInquiryRejected()"), \
+                ErrorCode.INQUIRY_REJECT
+        else:
+            events = self.contract.events.InterledgerEventAccepted, self.contract.events.InterledgerEventRejected
+            names, reject_code = ("InterledgerEventAccepted()", "InterledgerEventRejected()"), \
+                ErrorCode.APPLICATION_REJECT
+        accepted = {log['args']['nonce'] for log in events[0]().processReceipt(tx_receipt)}
+        rejected = {log['args']['nonce'] for log in events[1]().processReceipt(tx_receipt)}
+
+        results = []
+        for nonce in nonces:
+            if nonce in rejected:
+                results.append(_result('', False, tx_hash, reject_code, f"{names[1]} event received"))
+            elif nonce in accepted:
+                results.append(_result('', True, tx_hash))
             else:
-                # TODO #tx_receipt there is not much documentation about transaction receipt
-                # and the values that 'status' can get
-                # if a transaction fails, I guess web3py just raises a ValueError exception
-                # This return below cannot be clear, but I think it will never be executed
-                return {"status": False, 
-                        "error_code": ErrorCode.TRANSACTION_FAILURE,
-                        "message": "Error in the transaction",
-                        "tx_hash": tx_hash}
-        except web3.exceptions.TimeExhausted as e :
-            # Raised by web3.eth.waitForTransactionReceipt
-            return {"status": False, 
-                    "error_code": ErrorCode.TIMEOUT,
-                    "message": "Timeout after sending the transaction",
-                    "tx_hash": tx_hash,
-                    "exception": e}
-        except ValueError as e:
-            # Raised by a contract function 
-            d = eval(e.__str__())
-            return {"status": False, 
-                    "error_code": ErrorCode.TRANSACTION_FAILURE, 
-                    "message": d['message'],
-                    "tx_hash": tx_hash,
-                    "exception": e}
-
-    
+                results.append(_result('', False, tx_hash, ErrorCode.TRANSACTION_FAILURE,
+                                       f"No {names[0]} or {names[1]} event received"))
+        return results
+
+
 class EthereumMultiResponder(EthereumResponder, MultiResponder):
     """Similar working unit as EthereumResponder, but should be used under multi-ledger mode only.
     """
@@ -394,86 +726,17 @@ class EthereumMultiResponder(EthereumResponder, MultiResponder):
             'message': str      # only with errors
         }
         """
-        # Return transaction hash, need to wait for receipt
-        tx_hash = None
-        tx_receipt = None
-        try:
-            # unlock using private_key
-            if self.private_key and not self.isUnlocked(self.minter): # needs to unlock with private key
-                print("unlock with priv_key")
-                transaction = self.contract.functions \
-                    .interledgerInquire(Web3.toInt(text=nonce), data) \
-                    .buildTransaction({'from': self.minter})
-                transaction.update({'nonce': self.web3.eth.getTransactionCount(self.minter)})
-                signed_tx = self.web3.eth.account.signTransaction(transaction, self.private_key)
-                tx_hash = self.web3.eth.sendRawTransaction(signed_tx.rawTransaction)
-            # unlock using password
-            elif self.password is not None:
-                print("unlock with password")
-                unlock = self.web3.geth.personal.unlockAccount(self.minter, self.password, 0) # unlock indefinitely
-                if not unlock:
-                    return {"status": False, 
-                            "error_code": ErrorCode.TRANSACTION_FAILURE,
-                            "message": "Wrong password",
-                            "tx_hash": None}
-                tx_hash = self.contract.functions \
-                    .interledgerInquire(Web3.toInt(text=nonce), data) \
-                    .transact({'from': self.minter})
-                # lock the account again
-                self.web3.geth.personal.lockAccount(self.minter)
-            # no need to unlock
-            else:
-                print("default")
-                tx_hash = self.contract.functions \
-                    .interledgerInquire(Web3.toInt(text=nonce), data) \
-                    .transact({'from': self.minter})
-            # tx_receipt = self.web3.eth.waitForTransactionReceipt(tx_hash, timeout=self.timeout)
-            tx_receipt = await asyncio.get_event_loop().run_in_executor(
-                None, functools.partial(self.web3.eth.waitForTransactionReceipt, tx_hash, timeout=self.timeout))
-
-            if tx_receipt['status']:    
-                logs_accept = self.contract.events.InterledgerInquiryAccepted().processReceipt(tx_receipt)
-                logs_reject = self.contract.events.InterledgerInquiryRejected().processReceipt(tx_receipt)
-                if len(logs_reject) != 0 and logs_reject[0]['args']['nonce'] == int(nonce):
-                    return {"status": False, 
-                            "error_code": ErrorCode.INQUIRY_REJECT,
-                            "message": "InterledgerInquiryRejected() event received",
-                            "tx_hash": tx_hash}
-                if len(logs_accept) != 0 and logs_accept[0]['args']['nonce'] == int(nonce):
-                    return {"status": True,
-                            "tx_hash": tx_hash}
-                else:
-                    return {"status": False, 
-                            "error_code": ErrorCode.TRANSACTION_FAILURE,
-                            "message": "No InterledgerInquiryAccepted() or InterledgerInquiryRejected() event received",
-                            "tx_hash": tx_hash}
-            else:
-                return {"status": False, 
-                        "error_code": ErrorCode.TRANSACTION_FAILURE,
-                        "message": "Error in the transaction",
-                        "tx_hash": tx_hash}
-        except web3.exceptions.TimeExhausted as e :
-            # Raised by web3.eth.waitForTransactionReceipt
-            return {"status": False, 
-                    "error_code": ErrorCode.TIMEOUT,
-                    "message": "Timeout after sending the transaction",
-                    "tx_hash": tx_hash,
-                    "exception": e}
-        except ValueError as e:
-            # Raised by a contract function 
-            d = eval(e.__str__())
-            return {"status": False, 
-                    "error_code": ErrorCode.TRANSACTION_FAILURE, 
-                    "message": d['message'],
-                    "tx_hash": tx_hash,
-                    "exception": e}
-                    
+        function = self.contract.functions.interledgerInquire(Web3.toInt(text=nonce), data)
+        tx_hash, tx_receipt, failure = await self._execute(function)
+        if failure:
+            return failure
+        return self._receive_results(tx_receipt, tx_hash, [int(nonce)], inquiry=True)[0]
 
     async def abort_send_data(self, nonce: str, reason: int) -> dict:
         """Invoke the abort sending operation to the connected ledger
         :param string nonce: the identifier to be unique inside interledger for a data item
         :param int reason: the description on why the data transfer is aborted
-        
+
         :returns: True if the operation goes well; False otherwise
         :rtype: dict {
             'status': bool,
@@ -483,76 +746,8 @@ class EthereumMultiResponder(EthereumResponder, MultiResponder):
             'message': str      # only with errors
         }
         """
-        # Return transaction hash, need to wait for receipt
-        tx_hash = None
-        tx_receipt = None
-        try:
-            # unlock using private_key
-            if self.private_key and not self.isUnlocked(self.minter): # needs to unlock with private key
-                print("unlock with priv_key")
-                transaction = self.contract.functions \
-                    .interledgerReceiveAbort(Web3.toInt(text=nonce), reason) \
-                    .buildTransaction({'from': self.minter})
-                transaction.update({'nonce': self.web3.eth.getTransactionCount(self.minter)})
-                signed_tx = self.web3.eth.account.signTransaction(transaction, self.private_key)
-                tx_hash = self.web3.eth.sendRawTransaction(signed_tx.rawTransaction)
-            # unlock using password
-            elif self.password is not None:
-                print("unlock with password")
-                unlock = self.web3.geth.personal.unlockAccount(self.minter, self.password, 0) # unlock indefinitely
-                if not unlock:
-                    return {"status": False, 
-                            "error_code": ErrorCode.TRANSACTION_FAILURE,
-                            "message": "Wrong password",
-                            "tx_hash": None}
-                tx_hash = self.contract.functions \
-                    .interledgerReceiveAbort(Web3.toInt(text=nonce), reason) \
-                    .transact({'from': self.minter})
-                # lock the account again
-                self.web3.geth.personal.lockAccount(self.minter)
-            # no need to unlock
-            else:
-                print("default")
-                tx_hash = self.contract.functions \
-                    .interledgerReceiveAbort(Web3.toInt(text=nonce), reason) \
-                    .transact({'from': self.minter})
-            # tx_receipt = self.web3.eth.waitForTransactionReceipt(tx_hash, timeout=self.timeout)
-            tx_receipt = await asyncio.get_event_loop().run_in_executor(
-                None, functools.partial(self.web3.eth.waitForTransactionReceipt, tx_hash, timeout=self.timeout))
-
-            if tx_receipt['status']:    
-                logs_accept = self.contract.events.InterledgerEventAccepted().processReceipt(tx_receipt)
-                logs_reject = self.contract.events.InterledgerEventRejected().processReceipt(tx_receipt)
-                if len(logs_reject) != 0 and logs_reject[0]['args']['nonce'] == int(nonce):
-                    return {"status": False, 
-                            "error_code": ErrorCode.APPLICATION_REJECT,
-                            "message": "InterledgerEventRejected() event received",
-                            "tx_hash": tx_hash}
-                if len(logs_accept) != 0 and logs_accept[0]['args']['nonce'] == int(nonce):
-                    return {"status": True,
-                            "tx_hash": tx_hash}
-                else:
-                    return {"status": False, 
-                            "error_code": ErrorCode.TRANSACTION_FAILURE,
-                            "message": "No InterledgerEventAccepted() or InterledgerEventRejected() event received",
-                            "tx_hash": tx_hash}
-            else:
-                return {"status": False, 
-                        "error_code": ErrorCode.TRANSACTION_FAILURE,
-                        "message": "Error in the transaction",
-                        "tx_hash": tx_hash}
-        except web3.exceptions.TimeExhausted as e :
-            # Raised by web3.eth.waitForTransactionReceipt
-            return {"status": False, 
-                    "error_code": ErrorCode.TIMEOUT,
-                    "message": "Timeout after sending the transaction",
-                    "tx_hash": tx_hash,
-                    "exception": e}
-        except ValueError as e:
-            # Raised by a contract function 
-            d = eval(e.__str__())
-            return {"status": False, 
-                    "error_code": ErrorCode.TRANSACTION_FAILURE, 
-                    "message": d['message'],
-                    "tx_hash": tx_hash,
-                    "exception": e}
\ No newline at end of file
+        function = self.contract.functions.interledgerReceiveAbort(Web3.toInt(text=nonce), reason)
+        tx_hash, tx_receipt, failure = await self._execute(function)
+        if failure:
+            return failure
+        return self._receive_results(tx_receipt, tx_hash, [int(nonce)])[0]
@@ -1,31 +1,33 @@
 import asyncio
-import ast
 from hfc.fabric import Client
+from hfc.fabric.transaction.tx_context import create_tx_context
+from hfc.fabric.transaction.tx_proposal_request import create_tx_prop_req, TXProposalRequest, CC_INVOKE
+from hfc.util.utils import build_tx_req, send_transaction
 
 from .interfaces import Initiator, Responder, ErrorCode
+from .fabric_events import ChannelEventStream, block_number, chaincode_events, transaction_events, decode_payload, \
+    batch_outcome
+from .fabric_commits import CommitTracker, CommitTimeout
+from .fabric_peers import PeerSelector
 from ..transfer import Transfer
 
 
 class FabricInitializer:
     """This provides the proper fabric client wrapper
+
+    The transactions are sent to the ordering service without waiting for their commit, which is then awaited through
+    the CommitTracker of the event stream of the channel.
+
+    peer_name can list several peers of the organization, separated by commas. The endorsements are then requested
+    from the best peers in parallel, and the queries and the event stream go to the best peer, see PeerSelector.
     """
-    def __init__(self, net_profile=None, channel_name=None, cc_name=None, cc_version=None, org_name=None, user_name=None, peer_name=None):
+    def __init__(self, net_profile=None, channel_name=None, cc_name=None, cc_version=None, org_name=None, user_name=None, peer_name=None,
+                 endorsements: int = 1, metrics=None):
         self.client = Client(net_profile=net_profile)
         assert self.client
-        print("---client---")
-        print(self.client.orderers)
-        print(self.client.peers)
-        print("---client---")
 
         self.channel_name = channel_name
         self.channel = self.client.new_channel(channel_name)
-        print("---channel---")
-        print("client channels: ", self.client._channels)
-        print("channel: ", self.client.get_channel(channel_name))
-        print("channel name: ", self.client.get_channel(channel_name).name)
-        print("channel peers: ", self.client.get_channel(channel_name).peers)
-        print("channel orderers: ", self.client.get_channel(channel_name).orderers)
-        print("---channel---")
         assert self.channel
 
         self.cc_name = cc_name
@@ -34,26 +36,134 @@ class FabricInitializer:
         self.user = self.client.get_user(org_name, user_name)
         assert self.user
 
-        self.peers = [self.client.get_peer(peer_name)]
-        assert self.peers
-        print("---parameters---")
-        print("User: ", self.user)
-        print("Peers: ", self.peers)
-        print("cc name:", self.cc_name)
-        print("---parameters---")
+        self.peers = [self.client.get_peer(name.strip()) for name in peer_name.split(',')]
+        assert all(self.peers)
+        self.selector = PeerSelector(self.peers)
+        assert 1 <= endorsements <= len(self.peers), "endorsements must be between 1 and the number of peers"
+        self.endorsements = endorsements
 
-        self.hub = None
-        self.reg_nub = None
+        self.timeout = 120
+        self.filtered = False  # whether the event stream delivers filtered blocks
+        # latency of the chaincode invocations, by function and peers
+        self.metrics = metrics
+        self.peer_name = peer_name
 
     async def get_height(self):
-        info = await self.client.query_info(self.user, self.channel_name, self.peers)
-        return info.height
+        async def query(peer):
+            info = await self.client.query_info(self.user, self.channel_name, [peer])
+            self.selector.observe_height(peer, info.height)
+            return info.height
+        return await self.selector.query(query)
+
+    def event_stream(self, filtered: bool = False) -> ChannelEventStream:
+        """The long-lived event stream of the channel, shared by the components connected to the same peer
+
+        :param bool filtered: whether the stream delivers filtered blocks instead of full blocks
+        """
+        return ChannelEventStream.shared(self.channel, self.selector, self.user, filtered)
+
+    def commit_tracker(self) -> CommitTracker:
+        """The tracker of the commits of the transactions, on the event stream of the component
+        """
+        return CommitTracker.shared(self.event_stream(self.filtered))
+
+    async def _invoke(self, fcn: str, args: list, prefix: str = '', keys: list = None) -> tuple:
+        """Invoke a chaincode function: have the transaction endorsed by the peers, send it to the ordering service,
+        then wait for its commit through the commit tracker.
+
+        The proposal is sent in parallel to the best endorsements peers, a peer failing or refusing it being replaced
+        by the next best one.
+
+        :param str fcn: the chaincode function
+        :param list args: the arguments of the function, as strings or bytes
+        :param str prefix: prefix of the keys of the failure result, 'commit' or 'abort' for the Initiator
+        :param list keys: the nonces or ids of the data items of the transaction, reported to on_submitted
+
+        :returns: (tx_id, payload, failure), where payload is the response of the chaincode and failure is the result
+            to return if the transaction failed, None otherwise
+        :rtype: tuple
+        """
+        if self.metrics is None:
+            return await self._send_invoke(fcn, args, prefix, keys)
+        with self.metrics.timer('interledger_rpc_seconds', endpoint=self.peer_name, method=fcn):
+            return await self._send_invoke(fcn, args, prefix, keys)
+
+    async def _send_invoke(self, fcn: str, args: list, prefix: str = '', keys: list = None) -> tuple:
+        """Same as _invoke(), without recording its latency
+        """
+        tracker = self.commit_tracker()
+        start = None if tracker.listening else await self.get_height()
+        request = create_tx_prop_req(prop_type=CC_INVOKE, cc_name=self.cc_name, cc_version=str(self.cc_version),
+                                     fcn=fcn, args=args)
+        tx_context = create_tx_context(self.user, self.user.cryptoSuite, request)
+        tx_id = tx_context.tx_id
+        tracker.watch(tx_id, start)
+
+        try:
+            # endorsement
+            async def propose(peer):
+                responses, proposal, header = self.channel.send_tx_proposal(tx_context, [peer])
+                return (await asyncio.gather(*responses))[0], proposal, header
+            endorsed, refused = await self.selector.gather(propose, self.endorsements,
+                                                           lambda result: result[0].response.status == 200)
+            if len(endorsed) < self.endorsements:
+                tracker.forget(tx_id)
+                messages = {str(e) if isinstance(e, Exception) else e[0].response.message for e in refused}
+                return tx_id, None, _result(prefix, False, tx_id, ErrorCode.TRANSACTION_FAILURE, "; ".join(messages))
+
+            # ordering
+            _, proposal, header = endorsed[0]
+            envelope = build_tx_req(([response for response, _, _ in endorsed], proposal, header))
+            tx_context_tx = create_tx_context(self.user, self.user.cryptoSuite, TXProposalRequest())
+            async for response in send_transaction(self.client.orderers, envelope, tx_context_tx):
+                if response.status != 200:
+                    tracker.forget(tx_id)
+                    return tx_id, None, _result(prefix, False, tx_id, ErrorCode.TRANSACTION_FAILURE, response.info)
+        except Exception as e:
+            tracker.forget(tx_id)
+            return tx_id, None, _result(prefix, False, tx_id, ErrorCode.TRANSACTION_FAILURE, "Error in the transaction", e)
+
+        if self.on_submitted is not None and keys:
+            self.on_submitted(keys, tx_id)
+
+        # commit
+        try:
+            code = await tracker.wait(tx_id, self.timeout)
+        except CommitTimeout as e:
+            return tx_id, None, _result(prefix, False, tx_id, ErrorCode.TIMEOUT, "Timeout after sending the transaction", e)
+        if code != 'VALID':
+            return tx_id, None, _result(prefix, False, tx_id, ErrorCode.TRANSACTION_FAILURE,
+                                  f"Transaction invalidated with code {code}")
+        return tx_id, endorsed[0][0].response.payload, None
+
+
+def _result(prefix: str, status: bool, tx_hash, error_code: ErrorCode = None, message: str = None,
+            exception: Exception = None) -> dict:
+    """Build the result of an operation, the keys of the Initiator results are prefixed with 'commit_' or 'abort_'
+    """
+    prefix = prefix + '_' if prefix else ''
+    result = {prefix + "status": status,
+              prefix + "tx_hash": tx_hash}
+    if error_code is not None:
+        result[prefix + "error_code"] = error_code
+        result[prefix + "message"] = message
+    if exception is not None:
+        result["exception"] = exception
+    return result
 
 
 class FabricInitiator(FabricInitializer, Initiator):
     """Fabric implementation of the Initiator.
     """
-    def __init__(self, net_profile=None, channel_name=None, cc_name=None, cc_version=None, org_name=None, user_name=None, peer_name=None):
+    def __init__(self, net_profile=None, channel_name=None, cc_name=None, cc_version=None, org_name=None, user_name=None, peer_name=None,
+                 poll_timeout: float = 1.0, filtered: bool = False, endorsements: int = 1, metrics=None):
+        """
+        :param int endorsements: number of peers endorsing each transaction, among the peers of peer_name
+        :param float poll_timeout: maximum number of seconds listen_for_events() waits for a new block
+        :param bool filtered: receive filtered blocks, carrying only the transaction identifiers and chaincode
+            event names, and read the payload of the InterledgerEventSending events from their transaction
+        :param object metrics: the Metrics recording the latency of the chaincode invocations, if any
+        """
         FabricInitializer.__init__(
             self,
             net_profile=net_profile, 
@@ -62,11 +172,16 @@ class FabricInitiator(FabricInitializer, Initiator):
             cc_version=cc_version, 
             org_name=org_name, 
             user_name=user_name, 
-            peer_name=peer_name
+            peer_name=peer_name,
+            endorsements=endorsements,
+            metrics=metrics
         )
 
         self.height = None
         self.entries = []
+        self.poll_timeout = poll_timeout
+        self.filtered = filtered
+        self.blocks = None  # queue of the blocks delivered by the event stream
 
     async def listen_for_events(self) -> list:
         """Listen for events fired by the Initiator injected chaincode stored in the connected HyperLedger Fabric network.
@@ -76,47 +191,52 @@ class FabricInitiator(FabricInitializer, Initiator):
         """
         transfers = [] # initialize transfer list
 
-        self.hub = self.channel.newChannelEventHub(self.peers[0], self.user)
-        self.reg_num = self.hub.registerBlockEvent(
-            onEvent=self.event_handler)
-        # print(f"reg_num: {self.reg_num}")
-
-        # wait for some time
-        # print("Start listening...")
-        if not self.height:
-            self.height = await self.get_height()
-        # start = await self.get_height()
-        # await asyncio.sleep(12)
-        # stop = await self.get_height()
-
-        # start listening and store the events
-        # print(f"Start listening from : {self.height}")
-        # print(f"Debug@Hub peer: {self.hub._peer} \nof type {type(self.peers[0])}")
-        stream = self.hub.connect(filtered=False, start=self.height)
+        # the blocks are streamed from the block after the last one read
+        if self.blocks is None:
+            if not self.height:
+                self.height = await self.get_height()
+            self.blocks = self.event_stream(self.filtered).subscribe(self.height)
+
+        # return as soon as a block arrives, or after poll_timeout without any
         try:
-            await asyncio.wait_for(stream, timeout=1)
+            blocks = [await asyncio.wait_for(self.blocks.get(), timeout=self.poll_timeout)]
         except asyncio.TimeoutError:
-            # print('timeout!')
-            pass
+            blocks = []
+        while not self.blocks.empty():
+            blocks.append(self.blocks.get_nowait())
 
-        self.height = await self.get_height()
+        for block in blocks:
+            self.event_handler(block)
+            self.height = block_number(block) + 1
 
         # check the events
         if self.entries:
+            try:
+                await self._fetch_payloads(self.entries)
+            except Exception:
+                # the events are kept, their payload is read again at the next poll
+                return transfers
             transfers = self._buffer_data(self.entries)
-            print("cached transfers:", len(transfers))
-            
+
         # clean up
-        # print(self.hub._reg_nums)
-        self.hub.disconnect()
-        # print(self.hub._reg_nums)
-        # self.hub.unregisterBlockEvent(self.reg_num)
-        # print(self.hub._reg_nums)
         self.entries.clear()
-        
+
         return transfers
             
 
+    def get_position(self) -> int:
+        """The last block whose events have been read, None before the first listen_for_events()
+        """
+        return self.height - 1 if self.height else None
+
+    def set_position(self, position: int) -> None:
+        """Resume reading the events from the block after position
+        """
+        self.height = position + 1
+        if self.blocks is not None:
+            self.event_stream(self.filtered).unsubscribe(self.blocks)
+            self.blocks = None
+
     async def commit_sending(self, id: str) -> dict:
         """Initiate the commit operation to the connected HyperLedger Fabric network.
 
@@ -130,24 +250,8 @@ class FabricInitiator(FabricInitializer, Initiator):
         }
         """
         # invoke interledgerCommit
-        try:
-            result = await self.client.chaincode_invoke(
-                requestor=self.user,
-                peers=self.peers,
-                channel_name=self.channel_name,
-                cc_name=self.cc_name,
-                fcn="InterledgerCommit",
-                args=[id],
-                wait_for_event=True)
-            # print("commit result:", result)
-            return {"commit_status": True,
-                    "commit_tx_hash": "0xfake_tx_hash"} 
-        except Exception as err:
-            # print(err)
-            return {"commit_status": False, 
-                    "commit_error_code": ErrorCode.TRANSACTION_FAILURE,
-                    "commit_message": "Error in the transaction",
-                    "commit_tx_hash": "0xfake_tx_hash"}
+        tx_id, _, failure = await self._invoke("interledgerCommit", [str(id)], 'commit', [id])
+        return failure or _result('commit', True, tx_id)
 
     async def abort_sending(self, id: str, reason: int):
         """Initiate the abort operation to the connected HyperLedger Fabric.
@@ -164,58 +268,86 @@ class FabricInitiator(FabricInitializer, Initiator):
         """
 
         # invoke interledgerAbort
-        try:
-            result = await self.client.chaincode_invoke(
-                requestor=self.user,
-                peers=self.peers,
-                channel_name=self.channel_name,
-                cc_name=self.cc_name,
-                fcn="interledgerAbort",
-                args=[int(id), int(reason)],
-                wait_for_event=True)
-            # print("abort result:", result)
-            return {"abort_status": True,
-                    "abort_tx_hash": "0xfake_tx_hash"}
-        except:
-            return {"abort_status": False, 
-                    "abort_error_code": ErrorCode.TRANSACTION_FAILURE,
-                    "abort_message": "Error in the transaction",
-                    "abort_tx_hash": "0xfake_tx_hash"}
+        tx_id, _, failure = await self._invoke("interledgerAbort", [str(id), str(int(reason))], 'abort', [id])
+        return failure or _result('abort', True, tx_id)
 
-    def event_handler(self, event_obj):
-        print(f"block event handler triggered....")
+    async def commit_sending_batch(self, ids: list) -> list:
+        """Initiate the commit operation of several data items with a single interledgerCommitBatch transaction.
+        If the batch fails, its items are committed one by one so that only the failing ones are reported.
+
+        :param list ids: the identifiers in the originating ledger of the data items
+
+        :returns: the result of each data item, in the same order as ids, with the format of commit_sending()
+        :rtype: list
+        """
+        tx_id, _, failure = await self._invoke("interledgerCommitBatch", [str(id) for id in ids], 'commit', ids)
+        if failure is None:
+            return [_result('commit', True, tx_id) for _ in ids]
+        if len(ids) > 1 and failure['commit_error_code'] == ErrorCode.TRANSACTION_FAILURE:
+            return await asyncio.gather(*[self.commit_sending(id) for id in ids])
+        return [dict(failure) for _ in ids]
+
+    async def abort_sending_batch(self, ids: list, reasons: list) -> list:
+        """Initiate the abort operation of several data items with a single interledgerAbortBatch transaction.
+        If the batch fails, its items are aborted one by one so that only the failing ones are reported.
+
+        :param list ids: the identifiers in the originating ledger of the data items
+        :param list reasons: the description on why each data transfer is aborted, in the same order as ids
+
+        :returns: the result of each data item, in the same order as ids, with the format of abort_sending()
+        :rtype: list
+        """
+        args = [str(arg) for id, reason in zip(ids, reasons) for arg in (id, int(reason))]
+        tx_id, _, failure = await self._invoke("interledgerAbortBatch", args, 'abort', ids)
+        if failure is None:
+            return [_result('abort', True, tx_id) for _ in ids]
+        if len(ids) > 1 and failure['abort_error_code'] == ErrorCode.TRANSACTION_FAILURE:
+            return await asyncio.gather(*[self.abort_sending(id, reason) for id, reason in zip(ids, reasons)])
+        return [dict(failure) for _ in ids]
 
-        d = event_obj['data']['data']
-        actions = d[0]['payload']['data']['actions']
-        action = actions[0]
-        print(f"action payload: {action['payload']}")
-        event = action['payload']['action']['proposal_response_payload']['extension']['events']
-        event_name = event['event_name']
-        print(f"Event name: {event_name}")
+    def event_handler(self, event_obj):
+        # every InterledgerEventSending event of the chaincode, in all the transactions of the block
+        self.entries.extend(chaincode_events(event_obj, self.cc_name, "InterledgerEventSending"))
 
-        if event_name == "InterledgerEventSending":
-            self.entries.append(event)
+    async def _fetch_payloads(self, events):
+        # the events of filtered blocks have no payload, it is read from their transactions
+        missing = [event for event in events if 'payload' not in event]
+        def query(tx_id):
+            return lambda peer: self.client.query_transaction(
+                requestor=self.user,
+                channel_name=self.channel_name,
+                peers=[peer],
+                tx_id=tx_id,
+                decode=True)
+        transactions = await asyncio.gather(*(self.selector.query(query(event['tx_id'])) for event in missing))
+        for event, transaction in zip(missing, transactions):
+            for found in transaction_events(transaction['transaction_envelope']):
+                if found.get('event_name') == event['event_name']:
+                    event['payload'] = found['payload']
 
     def _buffer_data(self, events):
         res = []
         for event in events:
-            print(f"event to be cached: {event}")
+            # the chaincode emits the event as JSON {"Id": uint64, "Data": string}
+            try:
+                parsed = decode_payload(event['payload'])
+                payload = {'id': parsed['Id'], 'data': parsed['Data']}
+            except (KeyError, TypeError, ValueError) as e:
+                # no payload found in its transaction, or not a transfer: reading it again would fail again
+                print("dropped event of transaction", event.get('tx_id'), "without a valid payload:", repr(e))
+                continue
             transfer = Transfer()
-            byte_str = event['payload']
-
-            # encode the byte string and decode into a dict
-            dict_str = byte_str.decode("UTF-8")
-            parsed = ast.literal_eval(dict_str)
-            transfer.payload = {'id': parsed['Id'], 'data': parsed['Data']}
-            print("*********** buffer data *************")
-            print(f"{transfer.payload}")
-            print("*************************************")
-            
+            transfer.payload = payload
             res.append(transfer)
         return res
 
 class FabricResponder(FabricInitializer, Responder):
-    def __init__(self, net_profile=None, channel_name=None, cc_name=None, cc_version=None, org_name=None, user_name=None, peer_name=None):
+    def __init__(self, net_profile=None, channel_name=None, cc_name=None, cc_version=None, org_name=None, user_name=None, peer_name=None,
+                 endorsements: int = 1, metrics=None):
+        """
+        :param int endorsements: number of peers endorsing each transaction, among the peers of peer_name
+        :param object metrics: the Metrics recording the latency of the chaincode invocations, if any
+        """
         FabricInitializer.__init__(
             self,
             net_profile=net_profile, 
@@ -224,27 +356,40 @@ class FabricResponder(FabricInitializer, Responder):
             cc_version=cc_version, 
             org_name=org_name, 
             user_name=user_name, 
-            peer_name=peer_name
+            peer_name=peer_name,
+            endorsements=endorsements,
+            metrics=metrics
         )
+        # only the commit status of the transactions is read from the blocks
+        self.filtered = True
 
     async def send_data(self, nonce: str, data: bytes):
         # invoke interledgerReceive
-        try: 
-            result = await self.client.chaincode_invoke(
-                requestor=self.user,
-                peers=self.peers,
-                channel_name=self.channel_name,
-                cc_name=self.cc_name,
-                cc_version=str(self.cc_version),
-                fcn="interledgerReceive",
-                args=[nonce, data],
-                wait_for_event=True)
-            # print("send data result:", result)
-            return {"status": True,
-                    "tx_hash": "0xfake_tx_hash"}
-        except Exception as e:
-            return {"status": False, 
-                    "error_code": ErrorCode.TRANSACTION_FAILURE,
-                    "message": "Error in the transaction",
-                    "tx_hash": "0xfake_tx_hash",
-                    "exception": e}
\ No newline at end of file
+        tx_id, _, failure = await self._invoke("interledgerReceive", [nonce, data], keys=[nonce])
+        return failure or _result('', True, tx_id)
+
+    async def send_data_batch(self, nonces: list, data: list) -> list:
+        """Initiate the interledger receive operation of several data items with a single
+        interledgerReceiveBatch transaction.
+
+        :param list nonces: the identifiers to be unique inside interledger, one per data item
+        :param list data: the actual contents of data in bytes string, in the same order as nonces
+
+        :returns: the result of each data item, in the same order as nonces, with the format of send_data()
+        :rtype: list
+        """
+        args = [arg for nonce, item in zip(nonces, data) for arg in (nonce, item)]
+        tx_id, payload, failure = await self._invoke("interledgerReceiveBatch", args, keys=nonces)
+        if failure:
+            return [dict(failure) for _ in nonces]
+
+        results = []
+        for accepted in batch_outcome(payload, nonces):
+            if accepted is None:
+                results.append(_result('', False, tx_id, ErrorCode.TRANSACTION_FAILURE,
+                                       "No outcome of the item in the InterledgerEventBatch result"))
+            elif accepted:
+                results.append(_result('', True, tx_id))
+            else:
+                results.append(_result('', False, tx_id, ErrorCode.APPLICATION_REJECT, "Rejected in the batch"))
+        return results
\ No newline at end of file
@@ -0,0 +1,81 @@
+import asyncio
+
+from .fabric_events import ChannelEventStream, transaction_statuses
+
+
+class CommitTimeout(asyncio.TimeoutError):
+    """Raised when a transaction is not committed before the end of its timeout
+    """
+
+
+class CommitTracker(object):
+    """Waits for the commit of all the pending transactions submitted to a Fabric channel at once, instead of
+    connecting an event hub per transaction until its commit.
+
+    The tracker listens to the blocks of the event stream of the channel. The future of each pending transaction
+    is resolved with its validation code when its block is delivered, so that a transaction is only waited for
+    after it has been accepted by the ordering service, and many of them can be ordered at the same time.
+
+    A single tracker is shared by all the components using the same event stream, use CommitTracker.shared() to get it.
+    """
+
+    # ChannelEventStream -> CommitTracker
+    _trackers = {}
+
+    @classmethod
+    def shared(cls, stream: ChannelEventStream) -> 'CommitTracker':
+        """The tracker of an event stream, created on first use
+        """
+        if stream not in cls._trackers:
+            cls._trackers[stream] = cls(stream)
+        return cls._trackers[stream]
+
+    def __init__(self, stream: ChannelEventStream):
+        """
+        :param object stream: the ChannelEventStream of the channel
+        """
+        self.stream = stream
+        self.pending = {}       # tx id -> future of the validation code
+        self.listening = False  # whether the blocks of the stream are read
+
+    def watch(self, tx_id: str, start: int = None) -> None:
+        """Track a transaction, to be called before submitting it so that its block cannot be missed
+
+        :param str tx_id: the identifier of the transaction
+        :param int start: the first block to read if the tracker is not listening yet, e.g. the height of the channel
+        """
+        if tx_id not in self.pending:
+            self.pending[tx_id] = asyncio.get_event_loop().create_future()
+        if not self.listening:
+            self.stream.listen(self._on_block, start)
+            self.listening = True
+
+    def forget(self, tx_id: str) -> None:
+        """Stop tracking a transaction that could not be submitted
+        """
+        self.pending.pop(tx_id, None)
+
+    async def wait(self, tx_id: str, timeout: float) -> str:
+        """Wait for the commit of a transaction passed to watch()
+
+        :param str tx_id: the identifier of the transaction
+        :param float timeout: number of seconds before giving up
+
+        :returns: 'VALID' if the transaction is committed, the code of its invalidation otherwise
+        :rtype: str
+
+        :raises CommitTimeout: if the transaction is not in a block in time
+        """
+        self.watch(tx_id)
+        try:
+            return await asyncio.wait_for(asyncio.shield(self.pending[tx_id]), timeout)
+        except asyncio.TimeoutError:
+            raise CommitTimeout(f"Transaction {tx_id} is not in the chain after its timeout")
+        finally:
+            self.forget(tx_id)
+
+    def _on_block(self, block):
+        for tx_id, code in transaction_statuses(block).items():
+            future = self.pending.get(tx_id)
+            if future is not None and not future.done():
+                future.set_result(code)
@@ -0,0 +1,285 @@
+import asyncio
+import json
+
+from .fabric_peers import PeerSelector
+
+
+class ChannelEventStream(object):
+    """Long-lived event-hub session of a Fabric channel, delivering every block to its listeners.
+
+    A single delivery stream is kept open to a peer of the channel instead of connecting and disconnecting
+    the event hub at each poll. When the stream breaks, or the peer closes it, the session connects again
+    after a growing delay and resumes from the block after the last one delivered, so that no block is lost
+    or delivered twice.
+
+    With a PeerSelector instead of a single peer, each connection goes to the best peer of the selector, and a peer
+    whose stream breaks is left aside, so that the session fails over to the other peers.
+
+    A single session is shared by all the components of the process connected to the same channel and peer,
+    use ChannelEventStream.shared() to get it.
+    """
+
+    # (channel name, peer endpoint, filtered) -> ChannelEventStream
+    _streams = {}
+
+    @classmethod
+    def shared(cls, channel, peer, user, filtered: bool = False) -> 'ChannelEventStream':
+        """The session of the channel and peer, created on first use
+
+        :param object channel: the hfc Channel
+        :param object peer: the hfc Peer delivering the blocks, or the PeerSelector choosing it
+        :param object user: the hfc User signing the delivery requests
+        :param bool filtered: whether filtered blocks are delivered instead of full blocks
+        """
+        if isinstance(peer, PeerSelector):
+            endpoint = peer.key
+        else:
+            endpoint = getattr(peer, 'endpoint', None) or id(peer)
+        key = (channel.name, str(endpoint), filtered)
+        if key not in cls._streams:
+            cls._streams[key] = cls(channel, peer, user, filtered)
+        return cls._streams[key]
+
+    @classmethod
+    async def close_all(cls) -> None:
+        """Close all the shared sessions
+        """
+        for stream in list(cls._streams.values()):
+            await stream.close()
+
+    def __init__(self, channel, peer, user, filtered: bool = False,
+                 reconnect_delay: float = 0.5, max_reconnect_delay: float = 10.0):
+        """
+        :param object channel: the hfc Channel
+        :param object peer: the hfc Peer delivering the blocks, or the PeerSelector choosing it
+        :param object user: the hfc User signing the delivery requests
+        :param bool filtered: whether filtered blocks are delivered instead of full blocks
+        :param float reconnect_delay: seconds before the first reconnection, doubled at each failed attempt
+        :param float max_reconnect_delay: maximum number of seconds between two reconnections
+        """
+        self.channel = channel
+        self.peer = peer
+        self.user = user
+        self.filtered = filtered
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.listeners = {}     # callback passed to listen() -> function called with each block
+        self.next_block = None  # the number of the next block to deliver, the newest block if None
+        self.connections = 0    # number of times the stream was opened
+        self.hub = None
+        self.connected = None   # the peer of the current connection
+        self.runner = None
+
+    def listen(self, callback, start: int = None) -> None:
+        """Call callback with each block delivered from now on, the session is started on first use.
+
+        :param function callback: called with each decoded block, in the order of the chain
+        :param int start: the number of the first block of interest, the blocks before it are not passed to
+            callback; the session starts from this block if it is not running yet
+        """
+        self.listeners[callback] = callback if start is None else _from_block(callback, start)
+        if self.runner is None or self.runner.done():
+            if self.next_block is None:
+                self.next_block = start
+            self.runner = asyncio.ensure_future(self._run())
+
+    def subscribe(self, start: int = None) -> asyncio.Queue:
+        """Queue receiving each block delivered from now on, see listen()
+
+        :param int start: the number of the first block put into the queue
+        """
+        queue = asyncio.Queue()
+        self.listen(queue.put_nowait, start)
+        return queue
+
+    def unlisten(self, callback) -> None:
+        """Stop calling a callback passed to listen()
+        """
+        self.listeners.pop(callback, None)
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Stop filling a queue returned by subscribe()
+        """
+        self.unlisten(queue.put_nowait)
+
+    async def close(self) -> None:
+        """Close the stream and forget the session
+        """
+        self.listeners = {}
+        if self.runner is not None:
+            self.runner.cancel()
+            try:
+                await self.runner
+            except asyncio.CancelledError:
+                pass
+            self.runner = None
+        for key, stream in list(self._streams.items()):
+            if stream is self:
+                del self._streams[key]
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        while self.listeners:
+            delivered = self.next_block
+            selector = self.peer if isinstance(self.peer, PeerSelector) else None
+            self.connected = selector.best() if selector else self.peer
+            self.hub = self.channel.newChannelEventHub(self.connected, self.user)
+            self.hub.registerBlockEvent(unregister=False, onEvent=self._deliver)
+            try:
+                self.connections += 1
+                await self.hub.connect(filtered=self.filtered, start=self.next_block)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # the stream broke, it is opened again below, on another peer if possible
+                if selector:
+                    selector.failed(self.connected)
+            finally:
+                self.hub.disconnect()
+                self.hub = None
+            if self.next_block != delivered:
+                delay = self.reconnect_delay
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _deliver(self, block):
+        number = block_number(block)
+        # the blocks delivered again after a reconnection are skipped
+        if self.next_block is not None and number < self.next_block:
+            return
+        self.next_block = number + 1
+        if isinstance(self.peer, PeerSelector):
+            self.peer.observe_height(self.connected, self.next_block)
+        for listener in list(self.listeners.values()):
+            listener(block)
+
+
+def block_number(block) -> int:
+    """The number of a block delivered by the event hub, full or filtered
+    """
+    if 'header' in block:
+        return int(block['header']['number'])
+    return int(block['number'])
+
+
+# index of the validation codes of the transactions in the metadata of a full block
+TRANSACTIONS_FILTER = 2
+VALID = 0
+
+
+def chaincode_events(block, cc_name: str = None, event_name: str = None) -> list:
+    """The chaincode events of all the valid transactions of a block, full or filtered, in the order of the block
+
+    The events of a filtered block have no payload, the peer strips it from the filtered delivery.
+
+    :param dict block: the block delivered by the event hub
+    :param str cc_name: only the events of this chaincode, all the chaincodes if None
+    :param str event_name: only the events with this name, all the events if None
+    :returns: the events, dicts with chaincode_id, tx_id, event_name and payload (full blocks only)
+    :rtype: list
+    """
+    if 'header' in block:
+        codes = _validation_codes(block)
+        events = []
+        for index, envelope in enumerate(block['data']['data']):
+            if codes and codes[index] != VALID:
+                continue
+            events.extend(transaction_events(envelope))
+    else:
+        events = _filtered_events(block)
+
+    return [event for event in events
+            if (cc_name is None or event.get('chaincode_id') == cc_name)
+            and (event_name is None or event.get('event_name') == event_name)]
+
+
+def transaction_statuses(block) -> dict:
+    """The validation code of each transaction of a block, full or filtered
+
+    :param dict block: the block delivered by the event hub
+    :returns: transaction id -> 'VALID' if the transaction is committed, the code of its invalidation otherwise
+    :rtype: dict
+    """
+    if 'header' not in block:
+        return {transaction.get('txid'): transaction.get('tx_validation_code', 'VALID')
+                for transaction in block.get('filtered_transactions', [])}
+    codes = _validation_codes(block)
+    statuses = {}
+    for index, envelope in enumerate(block['data']['data']):
+        tx_id = envelope['payload']['header']['channel_header'].get('tx_id')
+        code = codes[index] if codes else VALID
+        statuses[tx_id] = 'VALID' if code == VALID else code
+    return statuses
+
+
+def transaction_events(envelope) -> list:
+    """The chaincode events of all the actions of a decoded transaction envelope
+
+    :param dict envelope: the transaction envelope, from a full block or from a query of the transaction
+    :rtype: list
+    """
+    data = envelope.get('payload', {}).get('data')
+    if not isinstance(data, dict):
+        return []
+    events = []
+    # configuration transactions have no actions
+    for action in data.get('actions', []):
+        extension = action['payload']['action']['proposal_response_payload']['extension']
+        event = extension.get('events')
+        if event and event.get('event_name'):
+            events.append(event)
+    return events
+
+
+def decode_payload(payload) -> dict:
+    """Decode the JSON payload of a chaincode event
+    """
+    if isinstance(payload, (bytes, bytearray)):
+        payload = payload.decode("UTF-8")
+    return json.loads(payload)
+
+
+def batch_outcome(payload, nonces: list) -> list:
+    """The outcome of each data item of an interledgerReceiveBatch transaction, from the JSON
+    {"Accepted": [nonces], "Rejected": [nonces]} returned by the chaincode, the nonces being decimal strings
+
+    :param bytes payload: the response of the chaincode
+    :param list nonces: the nonces of the data items of the batch
+
+    :returns: for each nonce, True if it is accepted, False if it is rejected, None if the chaincode did not report it
+    :rtype: list
+    """
+    try:
+        outcome = decode_payload(payload)
+        accepted, rejected = set(outcome.get('Accepted') or []), set(outcome.get('Rejected') or [])
+    except (ValueError, AttributeError):
+        # not a batch outcome, e.g. a chaincode without interledgerReceiveBatch
+        return [None] * len(nonces)
+    # the nonces are compared as strings, they are 128-bit integers
+    accepted, rejected = {str(nonce) for nonce in accepted}, {str(nonce) for nonce in rejected}
+    return [False if str(nonce) in rejected else True if str(nonce) in accepted else None for nonce in nonces]
+
+
+def _validation_codes(block):
+    codes = block.get('metadata', {}).get('metadata', [])
+    return codes[TRANSACTIONS_FILTER] if len(codes) > TRANSACTIONS_FILTER else None
+
+
+def _filtered_events(block) -> list:
+    # default values, e.g. the VALID code, are left out of the decoded filtered blocks
+    events = []
+    for transaction in block.get('filtered_transactions', []):
+        if transaction.get('tx_validation_code', 'VALID') != 'VALID':
+            continue
+        for action in transaction.get('transaction_actions', {}).get('chaincode_actions', []):
+            event = action.get('chaincode_event')
+            if event and event.get('event_name'):
+                events.append(dict(event, tx_id=event.get('tx_id') or transaction.get('txid')))
+    return events
+
+
+def _from_block(callback, start: int):
+    def listener(block):
+        if block_number(block) >= start:
+            callback(block)
+    return listener
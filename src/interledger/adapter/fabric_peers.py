@@ -0,0 +1,204 @@
+import asyncio
+
+
+class PeerSelector(object):
+    """Chooses the peers of a Fabric organization to send the requests to, from their observed latency,
+    load and block height.
+
+    The peers are ranked by the expected time to answer a new request, i.e. their average time per request
+    multiplied by the number of requests they are processing, after putting last the peers lagging behind the highest
+    block height seen. A peer failing a request is left aside for retry_delay seconds, so that the traffic fails over
+    to the other peers, unless all of them failed.
+
+    A request sent to several peers in parallel with gather() does not wait for a slow peer either: when a peer has
+    not answered in hedge_factor times the expected time of the next best peer, the request is also sent to it.
+    """
+
+    def __init__(self, peers: list, retry_delay: float = 5.0, smoothing: float = 0.2, hedge_factor: float = 3.0,
+                 default_latency: float = 0.1):
+        """
+        :param list peers: the hfc Peers of the organization
+        :param float retry_delay: seconds a failing peer is left aside
+        :param float smoothing: weight of the last observation in the average time per request of a peer
+        :param float hedge_factor: multiple of the expected time of the next best peer after which a request
+            is also sent to it
+        :param float default_latency: seconds a peer is expected to take before any request is measured
+        """
+        assert peers, "At least one peer is needed"
+        self.peers = list(peers)
+        self.retry_delay = retry_delay
+        self.smoothing = smoothing
+        self.hedge_factor = hedge_factor
+        self.default_latency = default_latency
+        self.latency = {}       # peer index -> average seconds per request, without the requests queued before it
+        self.height = {}        # peer index -> last block height seen
+        self.in_flight = [0] * len(self.peers)
+        self.failed_until = [0.0] * len(self.peers)
+
+    @property
+    def key(self) -> str:
+        """Identify the set of peers, e.g. to share an event stream
+        """
+        return ",".join(str(getattr(peer, 'endpoint', None) or id(peer)) for peer in self.peers)
+
+    def ranked(self) -> list:
+        """The peers from the best to the worst, the failing peers are left out unless all of them failed
+        """
+        now = asyncio.get_event_loop().time()
+        healthy = [i for i in range(len(self.peers)) if self.failed_until[i] <= now]
+        if not healthy:
+            return [self.peers[i] for i in sorted(range(len(self.peers)), key=lambda i: self.failed_until[i])]
+        top = max(self.height.values(), default=None)
+
+        def cost(i):
+            lagging = top is not None and self.height.get(i, top) < top
+            return lagging, self._expected(i)
+
+        return [self.peers[i] for i in sorted(healthy, key=cost)]
+
+    def best(self):
+        """The peer to send the next request to
+        """
+        return self.ranked()[0]
+
+    def started(self, peer) -> None:
+        """A request is sent to peer
+        """
+        self.in_flight[self.peers.index(peer)] += 1
+
+    def finished(self, peer, latency: float = None, failed: bool = False, load: int = 0) -> None:
+        """A request sent to peer is over
+
+        :param float latency: the number of seconds the peer took to answer
+        :param bool failed: whether the peer could not answer
+        :param int load: the number of requests the peer was processing when this one was sent
+        """
+        i = self.peers.index(peer)
+        self.in_flight[i] = max(0, self.in_flight[i] - 1)
+        if failed:
+            self.failed(peer)
+        elif latency is not None:
+            latency = latency / (load + 1)
+            average = self.latency.get(i)
+            self.latency[i] = latency if average is None else \
+                (1 - self.smoothing) * average + self.smoothing * latency
+
+    def failed(self, peer) -> None:
+        """Leave a failing peer aside for retry_delay seconds
+        """
+        self.failed_until[self.peers.index(peer)] = asyncio.get_event_loop().time() + self.retry_delay
+
+    def observe_height(self, peer, height: int) -> None:
+        """Record the block height of a peer, e.g. from a block it delivered
+        """
+        i = self.peers.index(peer)
+        self.height[i] = max(height, self.height.get(i, 0))
+
+    async def query(self, request):
+        """Send a request to the best peer, failing over to the next ones
+
+        :param function request: coroutine function called with a peer, raising if the peer could not answer
+
+        :returns: the result of the first peer answering
+        :raises Exception: the error of the last peer if none of them could answer
+        """
+        error = None
+        for peer in self.ranked():
+            try:
+                return await self._send(request, peer)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = e
+        raise error
+
+    async def gather(self, request, count: int, accept=None) -> tuple:
+        """Send a request to the count best peers in parallel, each peer failing or not accepting it being replaced
+        by the next best peer, and one more peer being added each time none answers in time, so that a slow or
+        failing peer does not hold the request up
+
+        :param function request: coroutine function called with a peer, raising if the peer could not answer
+        :param int count: the number of accepted results needed
+        :param function accept: whether a result counts, all the results are accepted if None
+
+        :returns: (accepted, rejected), the accepted results, count of them if enough peers accepted, and the
+            rejected results and errors
+        :rtype: tuple
+        """
+        loop = asyncio.get_event_loop()
+        candidates = self.ranked()
+        accepted, rejected = [], []
+        pending = set()
+        sent = {}  # task -> time it was sent, while it may still be hedged
+
+        def hedge_deadline():
+            # a request is late once the next best peer would have answered it hedge_factor times over
+            if not candidates or not sent:
+                return None
+            return min(sent.values()) + self.hedge_factor * self._expected(self.peers.index(candidates[0]))
+
+        while len(accepted) < count:
+            while candidates and len(pending) < count - len(accepted):
+                task = self._send(request, candidates.pop(0))
+                sent[task] = loop.time()
+                pending.add(task)
+            if not pending:
+                break
+            deadline = hedge_deadline()
+            timeout = None
+            if deadline is not None:
+                # checked again at least every request time of the next best peer, as the estimates get better
+                timeout = min(max(0.0, deadline - loop.time()),
+                              self.hedge_factor * self._latency(self.peers.index(candidates[0])))
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                sent.pop(task, None)
+            deadline = hedge_deadline()
+            if not done and deadline is not None and deadline <= loop.time():
+                # each late request is hedged once
+                sent.pop(min(sent, key=sent.get))
+                task = self._send(request, candidates.pop(0))
+                pending.add(task)
+            for task in done:
+                if task.exception() is not None:
+                    rejected.append(task.exception())
+                elif accept is None or accept(task.result()):
+                    accepted.append(task.result())
+                else:
+                    rejected.append(task.result())
+        # the requests still running are not needed anymore
+        for task in pending:
+            task.cancel()
+        return accepted[:count], rejected
+
+    def _expected(self, i: int) -> float:
+        return self._latency(i) * (self.in_flight[i] + 1)
+
+    def _latency(self, i: int) -> float:
+        # the peers not measured yet are expected to answer as fast as the others on average
+        if i in self.latency:
+            return self.latency[i]
+        if self.latency:
+            return sum(self.latency.values()) / len(self.latency)
+        return self.default_latency
+
+    def _send(self, request, peer) -> asyncio.Future:
+        # the load is counted right away, for the requests sent before this one starts running
+        load = self.in_flight[self.peers.index(peer)]
+        self.started(peer)
+        return asyncio.ensure_future(self._timed(request, peer, load))
+
+    async def _timed(self, request, peer, load: int):
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        try:
+            result = await request(peer)
+        except asyncio.CancelledError:
+            # given up as too slow, the time spent is a lower bound of its latency
+            self.finished(peer, loop.time() - start, load=load)
+            raise
+        except Exception:
+            self.finished(peer, failed=True)
+            raise
+        self.finished(peer, loop.time() - start, load=load)
+        return result
@@ -1,3 +1,4 @@
+import asyncio
 from enum import Enum
 
 from ..transfer import TransferStatus, Transfer
@@ -25,6 +26,10 @@ class Initiator(object):
     An Initiator is in charge to catch events coming from the ledger it listens to, and commit or abort the data sending into the same originating ledger. 
     """
 
+    # optional function called with (ids, tx_hash) as soon as a commit or abort transaction is sent,
+    # before waiting for it to be mined, so that it can be resumed with resume_confirm()
+    on_submitted = None
+
     async def listen_for_events(self) -> list:
         """Listen for events and, for each caught event, transfer the its payload information. 
 
@@ -69,12 +74,77 @@ class Initiator(object):
         # return True/False for success/failure
         assert False, "must be implemented in child class"
 
+    async def commit_sending_batch(self, ids: list) -> list:
+        """Initiate the commit operation of several data items to the connected ledger.
+        The default implementation calls commit_sending() for each item, ledgers supporting batches should
+        submit them in a single transaction.
+
+        :param list ids: the identifiers in the originating ledger of the data items
+
+        :returns: the result of each data item, in the same order as ids, with the format of commit_sending()
+        :rtype: list
+        """
+        return await asyncio.gather(*[self.commit_sending(id) for id in ids], return_exceptions=True)
+
+    async def abort_sending_batch(self, ids: list, reasons: list) -> list:
+        """Initiate the abort operation of several data items to the connected ledger.
+        The default implementation calls abort_sending() for each item, ledgers supporting batches should
+        submit them in a single transaction.
+
+        :param list ids: the identifiers in the originating ledger of the data items
+        :param list reasons: the description on why each data transfer is aborted, in the same order as ids
+
+        :returns: the result of each data item, in the same order as ids, with the format of abort_sending()
+        :rtype: list
+        """
+        return await asyncio.gather(*[self.abort_sending(id, reason) for id, reason in zip(ids, reasons)],
+                                    return_exceptions=True)
+
+    async def resume_confirm(self, id: str, tx_hash, commit: bool, reason: int = None) -> dict:
+        """Wait for the result of a commit or abort transaction sent before a restart, reported by on_submitted.
+        The default implementation sends the operation again.
+
+        :param str id: the identifier in the originating ledger for a data item
+        :param tx_hash: the hash of the transaction
+        :param bool commit: whether the transaction is a commit or an abort
+        :param int reason: the reason of the abort
+
+        :returns: the result, with the format of commit_sending() or abort_sending()
+        :rtype: dict
+        """
+        if commit:
+            return await self.commit_sending(id)
+        return await self.abort_sending(id, reason)
+
+    def get_position(self) -> int:
+        """The position in the connected ledger up to which the events have been read, e.g. a block number.
+        Used to checkpoint the Initiator, which is optional: the events read while it returns None are
+        not checkpointed.
+
+        :returns: the position, None if it is not known
+        :rtype: int
+        """
+        return None
+
+    def set_position(self, position: int) -> None:
+        """Resume reading the events right after a position returned by get_position(),
+        before the first call to listen_for_events(). Only the Initiators implementing it
+        can be used with a CheckpointStore.
+
+        :param int position: the position to resume from
+        """
+        assert False, "must be implemented in child class"
+
 
 class Responder(object):
     """
     Start the data transfer protocol after receiving the transfer's payload information.
     """
 
+    # optional function called with (nonces, tx_hash) as soon as a transaction receiving data is sent,
+    # before waiting for it to be mined, so that it can be resumed with resume_send()
+    on_submitted = None
+
     async def send_data(self, nonce: str, data: bytes) -> dict:
         """Initiate the interledger receive operation to the connected ledger.
 
@@ -94,6 +164,33 @@ class Responder(object):
         # but for now: True = accept, False = reject
         assert False, "must be implemented in child class"
 
+    async def send_data_batch(self, nonces: list, data: list) -> list:
+        """Initiate the interledger receive operation of several data items to the connected ledger.
+        The default implementation calls send_data() for each item, ledgers supporting batches should
+        submit them in a single transaction.
+
+        :param list nonces: the identifiers to be unique inside interledger, one per data item
+        :param list data: the actual contents of data, in the same order as nonces
+
+        :returns: the result of each data item, in the same order as nonces, with the format of send_data()
+        :rtype: list
+        """
+        return await asyncio.gather(*[self.send_data(nonce, item) for nonce, item in zip(nonces, data)],
+                                    return_exceptions=True)
+
+    async def resume_send(self, nonce: str, data: bytes, tx_hash) -> dict:
+        """Wait for the result of a transaction receiving data sent before a restart, reported by on_submitted.
+        The default implementation sends the data again.
+
+        :param string nonce: the identifier to be unique inside interledger for a data item
+        :param bytes data: the actual content of data
+        :param tx_hash: the hash of the transaction
+
+        :returns: the result, with the format of send_data()
+        :rtype: dict
+        """
+        return await self.send_data(nonce, data)
+
 
 class MultiResponder(Responder):
     """
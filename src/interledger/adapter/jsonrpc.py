@@ -0,0 +1,206 @@
+import asyncio
+import itertools
+import json
+
+import aiohttp
+
+
+class JsonRpcError(ValueError):
+    """Error returned by the node for a JSON-RPC request.
+    It is a ValueError carrying the error object, like the errors raised by web3.
+    """
+
+    def __init__(self, error: dict):
+        super().__init__(error)
+        self.error = error
+
+
+class AsyncJsonRpc(object):
+    """Asynchronous JSON-RPC client over HTTP(S) or WebSocket, so that the requests to a ledger node
+    do not block the event loop and can run concurrently.
+
+    Over WebSocket, the notifications of eth_subscribe subscriptions are pushed into asyncio queues.
+    """
+
+    def __init__(self, url: str, timeout: float = 30, metrics=None):
+        """
+        :param str url: the node endpoint, http(s):// or ws(s)://
+        :param float timeout: number of seconds before a request is given up
+        :param object metrics: the Metrics recording the latency of the requests by method and endpoint, if any
+        """
+        protocol = url.split(":")[0].lower()
+        if protocol not in ("http", "https", "ws", "wss"):
+            raise ValueError("Unsupported JSON-RPC protocol")
+        self.url = url
+        self.websocket = protocol in ("ws", "wss")
+        self.timeout = timeout
+        self.metrics = metrics
+        self.ids = itertools.count(1)
+        # created on first use, so that they belong to the running loop
+        self.session = None
+        self.ws = None
+        self.reader = None
+        self.responses = {}  # request id -> future of the response, WebSocket only
+        self.subscriptions = {}  # subscription id -> queue of its notifications, WebSocket only
+        self.unclaimed = {}  # subscription id -> notifications received before the subscription is registered
+        self.connecting = None
+
+    async def request(self, method: str, params: list = ()):
+        """Send a request and return its result.
+
+        :param str method: the JSON-RPC method, e.g. 'eth_blockNumber'
+        :param list params: the positional parameters of the method
+
+        :raises JsonRpcError: if the node returned an error
+        """
+        if self.metrics is None:
+            response = await self._send(self._message(method, params))
+        else:
+            with self.metrics.timer('interledger_rpc_seconds', endpoint=self.url, method=method):
+                response = await self._send(self._message(method, params))
+        return self._result(response)
+
+    async def batch(self, calls: list) -> list:
+        """Send several requests at once.
+
+        :param list calls: (method, params) pairs
+
+        :returns: the result of each call, in the same order; a call that failed is replaced by its JsonRpcError
+        :rtype: list
+        """
+        if not calls:
+            return []
+        messages = [self._message(method, params) for method, params in calls]
+        if self.metrics is None:
+            responses = await self._send(messages)
+        else:
+            with self.metrics.timer('interledger_rpc_seconds', endpoint=self.url, method='batch'):
+                responses = await self._send(messages)
+        by_id = {response.get('id'): response for response in responses}
+        results = []
+        for message in messages:
+            try:
+                results.append(self._result(by_id.get(message['id'], {})))
+            except JsonRpcError as e:
+                results.append(e)
+        return results
+
+    async def subscribe(self, params: list, queue: asyncio.Queue = None) -> tuple:
+        """Subscribe to notifications with eth_subscribe, WebSocket only.
+        Each notification is put into the queue as a (subscription id, result) pair. When the connection
+        is closed the subscription is lost, and None is put into the queue.
+
+        :param list params: the parameters of eth_subscribe, e.g. ['newHeads']
+        :param object queue: the queue receiving the notifications, a new one if None;
+            several subscriptions can share the same queue
+
+        :returns: (subscription id, queue)
+        :rtype: tuple
+        """
+        if not self.websocket:
+            raise ValueError("Subscriptions require a WebSocket connection")
+        if queue is None:
+            queue = asyncio.Queue()
+        subscription = await self.request('eth_subscribe', params)
+        if self.reader is None or self.reader.done():
+            # the connection was closed meanwhile
+            queue.put_nowait(None)
+            return subscription, queue
+        self.subscriptions[subscription] = queue
+        for result in self.unclaimed.pop(subscription, []):
+            queue.put_nowait((subscription, result))
+        return subscription, queue
+
+    async def close(self):
+        """Close the connection to the node
+        """
+        if self.reader:
+            self.reader.cancel()
+            self.reader = None
+        if self.ws is not None:
+            await self.ws.close()
+            self.ws = None
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    # Helpers
+
+    def _message(self, method: str, params) -> dict:
+        return {"jsonrpc": "2.0", "id": next(self.ids), "method": method, "params": list(params)}
+
+    @staticmethod
+    def _result(response: dict):
+        if 'error' in response:
+            raise JsonRpcError(response['error'])
+        if 'result' not in response:
+            raise JsonRpcError({'code': -32603, 'message': "No response received"})
+        return response['result']
+
+    async def _send(self, message):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        if not self.websocket:
+            async with self.session.post(self.url, json=message) as response:
+                return await response.json(content_type=None)
+
+        await self._connect()
+        messages = message if isinstance(message, list) else [message]
+        futures = []
+        for m in messages:
+            future = asyncio.get_event_loop().create_future()
+            self.responses[m['id']] = future
+            futures.append(future)
+        try:
+            await self.ws.send_str(json.dumps(message))
+            responses = await asyncio.wait_for(asyncio.gather(*futures), self.timeout)
+        finally:
+            for m in messages:
+                self.responses.pop(m['id'], None)
+        return responses if isinstance(message, list) else responses[0]
+
+    async def _connect(self):
+        if self.ws is not None and not self.ws.closed:
+            return
+        # a single connection is shared by the concurrent requests
+        if self.connecting is None:
+            self.connecting = asyncio.ensure_future(self.session.ws_connect(self.url))
+        try:
+            ws = await asyncio.shield(self.connecting)
+        finally:
+            self.connecting = None
+        if self.ws is not ws:
+            self.ws = ws
+            self.reader = asyncio.ensure_future(self._read(ws))
+
+    async def _read(self, ws):
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                for response in data if isinstance(data, list) else [data]:
+                    self._dispatch(response)
+        finally:
+            # fail the requests waiting on a closed connection
+            for future in self.responses.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("JSON-RPC connection closed"))
+            # and end its subscriptions
+            for queue in self.subscriptions.values():
+                queue.put_nowait(None)
+            self.subscriptions = {}
+            self.unclaimed = {}
+
+    def _dispatch(self, response: dict):
+        if response.get('method') == 'eth_subscription':
+            subscription, result = response['params']['subscription'], response['params']['result']
+            if subscription in self.subscriptions:
+                self.subscriptions[subscription].put_nowait((subscription, result))
+            else:
+                # the response of eth_subscribe has not been processed yet
+                self.unclaimed.setdefault(subscription, []).append(result)
+            return
+        future = self.responses.get(response.get('id'))
+        if future is not None and not future.done():
+            future.set_result(response)
@@ -0,0 +1,75 @@
+import asyncio
+
+
+class LogCursor(object):
+    """Reads the logs of a ledger over explicit block ranges, starting right after the last block read,
+    so that no block is skipped or read twice between two polls.
+
+    A range is split into chunks of chunk_size blocks, and up to parallel chunks are fetched at the same time,
+    which lets a long backlog be caught up after a downtime. The logs are returned in block order whatever
+    the order in which the chunks complete. Concurrent scans run one after the other, so that the same
+    blocks are never handed out twice.
+    """
+
+    def __init__(self, last_block: int, chunk_size: int = 2000, parallel: int = 4):
+        """
+        :param int last_block: the last block already read, the scan starts at the next one
+        :param int chunk_size: maximum number of blocks per log request
+        :param int parallel: maximum number of log requests sent at the same time
+        """
+        if chunk_size <= 0:
+            raise ValueError("Invalid chunk size")
+        if parallel <= 0:
+            raise ValueError("Invalid parallel requests number")
+        self.last_block = last_block
+        self.chunk_size = chunk_size
+        self.parallel = parallel
+        self.scanning = None  # lock serializing the scans, created on first use
+
+    async def scan(self, head: int, fetch) -> list:
+        """Fetch the logs of the blocks after last_block, up to head.
+        The scan stops after the first round of chunks containing logs, the next scan resumes from there.
+        If a chunk fails, the cursor advances over the chunks before it only.
+
+        :param int head: the last block to read, usually the current block number
+        :param function fetch: coroutine function taking (from_block, to_block), both included,
+            and returning the logs of these blocks in order
+
+        :returns: the logs, in block order
+        :rtype: list
+
+        :raises Exception: the error of the first chunk, if it failed
+        """
+        if self.scanning is None:
+            self.scanning = asyncio.Lock()
+        async with self.scanning:
+            return await self._scan(head, fetch)
+
+    async def _scan(self, head: int, fetch) -> list:
+        while self.last_block < head:
+            ranges = self._ranges(head)
+            results = await asyncio.gather(*[fetch(start, end) for start, end in ranges], return_exceptions=True)
+
+            logs = []
+            for i, ((_, end), result) in enumerate(zip(ranges, results)):
+                if isinstance(result, Exception):
+                    if i == 0:
+                        raise result
+                    # the logs read so far are returned, the failed chunk is read again by the next scan
+                    return logs
+                logs.extend(result)
+                self.last_block = end
+            if logs:
+                return logs
+        return []
+
+    def _ranges(self, head: int) -> list:
+        """The next chunks to fetch, as (from_block, to_block) pairs
+        """
+        ranges = []
+        start = self.last_block + 1
+        while start <= head and len(ranges) < self.parallel:
+            end = min(start + self.chunk_size - 1, head)
+            ranges.append((start, end))
+            start = end + 1
+        return ranges
@@ -0,0 +1,126 @@
+import asyncio
+
+
+class NonceManager(object):
+    """Hands out the transaction nonces of an account locally, so that several signed transactions
+    can be pending at the same time instead of all reading the same getTransactionCount().
+
+    A single manager is shared by all the adapters signing for the same account on the same endpoint,
+    use NonceManager.shared() to get it.
+    """
+
+    # (endpoint, account) -> NonceManager
+    _managers = {}
+
+    @classmethod
+    def shared(cls, web3, account: str) -> 'NonceManager':
+        """The manager of the account on the endpoint of web3, created on first use
+
+        :param object web3: the Web3 instance used to resync the nonce
+        :param str account: the address of the account
+        """
+        endpoint = getattr(web3.provider, 'endpoint_uri', None) or id(web3.provider)
+        key = (str(endpoint), account.lower())
+        if key not in cls._managers:
+            cls._managers[key] = cls(web3, account)
+        return cls._managers[key]
+
+    def __init__(self, web3, account: str):
+        """
+        :param object web3: the Web3 instance used to resync the nonce
+        :param str account: the address of the account
+        """
+        self.web3 = web3
+        self.account = account
+        self.next_nonce = None  # fetched from the ledger on first use and after a resync
+        self.pending = {}       # tx hash -> nonce of the sent transactions waiting for a receipt
+        self.acquired = set()   # nonces handed out whose transaction was not sent yet
+        self.gaps = []          # unused nonces below next_nonce found by a resync, handed out first
+        self.resyncing = None   # resync in progress with the asynchronous JSON-RPC client
+
+    def acquire(self) -> int:
+        """Reserve the next nonce of the account.
+
+        :returns: the nonce to put in the transaction
+        :rtype: int
+        """
+        if self.next_nonce is None:
+            self.resync()
+        if self.gaps:
+            nonce = self.gaps.pop(0)
+        else:
+            nonce = self.next_nonce
+            self.next_nonce += 1
+        self.acquired.add(nonce)
+        return nonce
+
+    def release(self, nonce: int) -> None:
+        """Give back a nonce whose transaction could not be sent.
+        Any later nonce already handed out would leave a gap, so the manager resyncs in that case.
+        """
+        self.acquired.discard(nonce)
+        if self.next_nonce is not None and nonce == self.next_nonce - 1:
+            self.next_nonce = nonce
+        else:
+            self.next_nonce = None
+
+    def sent(self, nonce: int, tx_hash) -> None:
+        """Track a transaction sent with a nonce of the account
+        """
+        self.acquired.discard(nonce)
+        self.pending[bytes(tx_hash)] = nonce
+
+    def mined(self, tx_hash) -> None:
+        """Stop tracking a transaction whose receipt was received
+        """
+        self.pending.pop(bytes(tx_hash), None)
+
+    def resync(self) -> None:
+        """Read the nonce again from the ledger, including the transactions still in its pool.
+        """
+        self._update(self.web3.eth.getTransactionCount(self.account, 'pending'),
+                     self.web3.eth.getTransactionCount(self.account))
+
+    async def acquire_async(self, rpc) -> int:
+        """Same as acquire(), reading the nonce from the ledger with an AsyncJsonRpc client if needed
+        """
+        while self.next_nonce is None:
+            await self.resync_async(rpc)
+        return self.acquire()
+
+    async def resync_async(self, rpc) -> None:
+        """Same as resync(), with an AsyncJsonRpc client. Concurrent callers share the same resync.
+        """
+        if self.resyncing is None:
+            self.resyncing = asyncio.ensure_future(asyncio.gather(
+                rpc.request('eth_getTransactionCount', [self.account, 'pending']),
+                rpc.request('eth_getTransactionCount', [self.account, 'latest'])))
+        resyncing = self.resyncing
+        try:
+            pending, mined = await asyncio.shield(resyncing)
+        except Exception:
+            if self.resyncing is resyncing:
+                self.resyncing = None
+            raise
+        # the first caller to resume applies the result
+        if self.resyncing is resyncing:
+            self.resyncing = None
+            self._update(int(pending, 16), int(mined, 16))
+
+    def _update(self, pending: int, mined: int) -> None:
+        # transactions below the mined nonce can no longer be pending
+        self.pending = {tx_hash: nonce for tx_hash, nonce in self.pending.items() if nonce >= mined}
+        self.acquired = {nonce for nonce in self.acquired if nonce >= mined}
+        # the node may not have seen the transactions still in flight yet: never hand out their nonces again
+        outstanding = set(self.pending.values()) | self.acquired
+        self.next_nonce = max(pending, max(outstanding, default=-1) + 1)
+        # nonces above the pool of the node that no transaction of ours uses would block the later ones
+        self.gaps = [nonce for nonce in range(pending, self.next_nonce) if nonce not in outstanding]
+
+    @staticmethod
+    def is_nonce_error(error: Exception) -> bool:
+        """Whether the node refused a transaction because its nonce was already used
+        """
+        message = str(error).lower()
+        return any(text in message for text in
+                   ('nonce too low', 'nonce is too low', 'correct nonce', 'replacement transaction'))
@@ -0,0 +1,137 @@
+import asyncio
+
+
+class ReceiptTimeout(asyncio.TimeoutError):
+    """Raised when a transaction is not mined before the end of its timeout
+    """
+
+
+class ReceiptTracker(object):
+    """Waits for the receipts of all the pending transactions of a ledger connection at once, instead of
+    parking one thread per transaction in waitForTransactionReceipt.
+
+    A single task watches the block number. When a new block arrives, the receipts of all the pending
+    transactions are fetched in one pass, as one batch of the asynchronous JSON-RPC client if it is used,
+    in a single executor call of the web3 client otherwise, and the future of each mined transaction is resolved.
+
+    A single tracker is shared by all the adapters connected to the same endpoint, use ReceiptTracker.shared() to get it.
+    """
+
+    # (endpoint, asynchronous transport) -> ReceiptTracker
+    _trackers = {}
+
+    @classmethod
+    def shared(cls, web3, rpc=None) -> 'ReceiptTracker':
+        """The tracker of the endpoint of web3, created on first use
+
+        :param object web3: the Web3 instance of the connection
+        :param object rpc: the AsyncJsonRpc client of the connection, if the asynchronous transport is used
+        """
+        endpoint = getattr(web3.provider, 'endpoint_uri', None) or id(web3.provider)
+        key = (str(endpoint), rpc is not None)
+        if key not in cls._trackers:
+            cls._trackers[key] = cls(web3, rpc)
+        return cls._trackers[key]
+
+    def __init__(self, web3, rpc=None, poll_interval: float = 0.1):
+        """
+        :param object web3: the Web3 instance of the connection
+        :param object rpc: the AsyncJsonRpc client of the connection, if the asynchronous transport is used
+        :param float poll_interval: seconds between two reads of the block number
+        """
+        self.web3 = web3
+        self.rpc = rpc
+        self.poll_interval = poll_interval
+        self.pending = {}     # tx hash -> [future of the receipt, deadline]
+        self.checked = set()  # tx hashes already fetched at the current block
+        self.block = None     # last block number seen
+        self.runner = None    # the task watching the blocks, while transactions are pending
+
+    async def wait(self, tx_hash, timeout: float) -> dict:
+        """Wait for the receipt of a transaction.
+
+        :param tx_hash: the hash of the transaction
+        :param float timeout: number of seconds before giving up
+
+        :returns: the receipt, as returned by the node
+        :rtype: dict
+
+        :raises ReceiptTimeout: if the transaction is not mined in time
+        """
+        loop = asyncio.get_event_loop()
+        key = bytes(tx_hash)
+        deadline = loop.time() + timeout
+        if key in self.pending:
+            entry = self.pending[key]
+            entry[1] = max(entry[1], deadline)
+        else:
+            entry = [loop.create_future(), deadline]
+            self.pending[key] = entry
+        if self.runner is None or self.runner.done():
+            self.runner = asyncio.ensure_future(self._run())
+        # a cancelled waiter does not cancel the others waiting for the same transaction
+        return await asyncio.shield(entry[0])
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        while self.pending:
+            try:
+                block = await self._block_number()
+                if block != self.block:
+                    self.block = block
+                    self.checked.clear()
+                # the transactions added since the last pass may have been mined in the current block
+                hashes = [key for key in self.pending if key not in self.checked]
+                if hashes:
+                    receipts = await self._receipts(hashes)
+                    self.checked.update(hashes)
+                    for key, receipt in zip(hashes, receipts):
+                        if receipt is not None and receipt.get('blockHash') is not None:
+                            self._resolve(key, receipt)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # connection errors are retried at the next pass, until the deadlines expire
+                pass
+            self._expire(loop.time())
+            if self.pending:
+                await asyncio.sleep(self.poll_interval)
+
+    def _resolve(self, key: bytes, receipt: dict):
+        future, _ = self.pending.pop(key)
+        self.checked.discard(key)
+        if not future.done():
+            future.set_result(receipt)
+
+    def _expire(self, now: float):
+        for key, (future, deadline) in list(self.pending.items()):
+            if future.done():
+                del self.pending[key]
+            elif now >= deadline:
+                del self.pending[key]
+                self.checked.discard(key)
+                future.set_exception(ReceiptTimeout(
+                    f"Transaction 0x{key.hex()} is not in the chain after its timeout"))
+
+    async def _block_number(self) -> int:
+        if self.rpc:
+            return int(await self.rpc.request('eth_blockNumber'), 16)
+        return await asyncio.get_event_loop().run_in_executor(None, lambda: self.web3.eth.blockNumber)
+
+    async def _receipts(self, hashes: list) -> list:
+        """The receipt of each transaction, None while it is not mined
+        """
+        if self.rpc:
+            results = await self.rpc.batch([('eth_getTransactionReceipt', ['0x' + key.hex()]) for key in hashes])
+            return [None if isinstance(result, Exception) else result for result in results]
+        return await asyncio.get_event_loop().run_in_executor(None, self._receipts_blocking, hashes)
+
+    def _receipts_blocking(self, hashes: list) -> list:
+        receipts = []
+        for key in hashes:
+            try:
+                receipts.append(self.web3.eth.getTransactionReceipt(key))
+            except Exception as e:
+                # TransactionNotFound while the transaction is pending
+                receipts.append(None)
+        return receipts
@@ -6,6 +6,7 @@ from hfc.fabric import Client
 
 
 from .interfaces import ILStateManager
+from .fabric_events import ChannelEventStream, block_number, chaincode_events, decode_payload
 from ..transfer import TransferStatus, Transfer
 
 
@@ -83,7 +84,8 @@ class FabricILStateManager(LocalILStateManger):
                  cc_version: str,
                  org_name: str,
                  user_name: str,
-                 peer_name: str) -> None:
+                 peer_name: str,
+                 poll_timeout: float = 1.0) -> None:
 
         self.entries_ready = [] # to store list of json objects
         self.entries_responded = [] # to store list of json objects
@@ -107,8 +109,9 @@ class FabricILStateManager(LocalILStateManger):
         self.peers = [self.client.get_peer(peer_name)]
         print(f'HF state manager - peers: {self.peers}')
 
-        self.hub = None
-        self.reg_num = None
+        self.height = None
+        self.poll_timeout = poll_timeout
+        self.blocks = None  # queue of the blocks delivered by the event stream
         self.events = []
 
     async def get_height(self):
@@ -119,8 +122,7 @@ class FabricILStateManager(LocalILStateManger):
                            id: str,
                            transfer: Transfer) -> bool:
 
-        payload = transfer.payload
-        nonce, data = payload.nonce, payload.data
+        nonce, data = transfer.nonce, transfer.data
 
         try:
             await self.client.chaincode_invoke(
@@ -181,42 +183,38 @@ class FabricILStateManager(LocalILStateManger):
     async def receive_entry_events(self,
                                    event: TransferStatus) -> None:
 
-        self.hub = self.channel.newChannelEventHub(self.peers[0], self.user)
-        self.reg_num = self.hub.registerBlockEvent(
-            onEvent=self._event_handler)
+        # the blocks are streamed from the block after the last one read, on the session of the channel
+        if self.blocks is None:
+            if not self.height:
+                self.height = await self.get_height()
+            stream = ChannelEventStream.shared(self.channel, self.peers[0], self.user)
+            self.blocks = stream.subscribe(self.height)
 
-        if not self.height:
-            self.height = await self.get_height()
-
-        stream = self.hub.connect(filtered=False, start=self.height)
+        # wait for a block up to poll_timeout, then take all the blocks delivered meanwhile
         try:
-            await asyncio.wait_for(stream, timeout=1)
+            blocks = [await asyncio.wait_for(self.blocks.get(), timeout=self.poll_timeout)]
         except asyncio.TimeoutError:
-            pass
-
-        self.height = await self.get_height()
-
+            blocks = []
+        while not self.blocks.empty():
+            blocks.append(self.blocks.get_nowait())
+        for block in blocks:
+            self._event_handler(block)
+            self.height = block_number(block) + 1
+
+        # the entries of the other status are kept until they are asked for
         if event == TransferStatus.READY:
             self.transfers_ready = self._buffer_data(self.entries_ready)
+            self.entries_ready.clear()
         if event == TransferStatus.RESPONDED:
             self.transfers_responded = self._buffer_data(self.entries_responded)
-
-        # clean up
-        self.hub.disconnect()
-        self.hub.unregisterBlockEvent(self.reg_num)
+            self.entries_responded.clear()
 
     def _event_handler(self, event_obj):
-        d = event_obj['data']['data']
-        actions = d[0]['payload']['data']['actions']
-        action = actions[0]
-
-        event = action['payload']['action']['proposal_response_payload']['extension']['events']
-        event_name = event['event_name']
-
-        if event_name == "transferReady":
-            self.entries_ready.append(event)
-        if event_name == "transferResponded":
-            self.entries_responded.append(event)
+        for event in chaincode_events(event_obj, self.cc_name):
+            if event['event_name'] == "transferReady":
+                self.entries_ready.append(event)
+            if event['event_name'] == "transferResponded":
+                self.entries_responded.append(event)
 
 
     def _buffer_data(self, events):
@@ -225,8 +223,7 @@ class FabricILStateManager(LocalILStateManger):
         for event in events:
             transfer = Transfer()
 
-            json_str = event['payload']
-            t_obj = json.loads(json_str)
+            t_obj = decode_payload(event['payload'])
             
             transfer.status, = t_obj['status']
             transfer.payload = t_obj['payload']
@@ -0,0 +1,88 @@
+import asyncio
+
+
+class Batcher(object):
+    """Coalesce the calls submitted within a time / size window into a single call of a batch operation,
+    e.g. Responder.send_data_batch(). Each submitted call gets its own future, resolved with its item of
+    the batch result.
+    """
+
+    def __init__(self, call, size: int, window: float):
+        """
+        :param function call: coroutine function taking one list per argument of the submitted calls,
+            and returning one result per call, in the same order; a result which is an exception is raised
+            by the future of its call
+        :param int size: a batch is submitted as soon as it has this number of calls
+        :param float window: a batch is submitted at most this number of seconds after its first call
+        """
+        if size <= 0:
+            raise ValueError("Invalid batch size")
+        if window < 0:
+            raise ValueError("Invalid batch window")
+        self.call = call
+        self.size = size
+        self.window = window
+        self.pending = []  # (args, future) of the batch being collected
+        self.timer = None
+        self.batches = set()  # submitted batch tasks
+
+    def submit(self, *args) -> asyncio.Future:
+        """Add a call to the current batch.
+
+        :returns: the future of the result of the call
+        :rtype: asyncio.Future
+        """
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self.pending.append((args, future))
+        if len(self.pending) >= self.size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+        return future
+
+    def flush(self):
+        """Submit the current batch, if any, without waiting for the window to expire
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+        items, self.pending = self.pending, []
+        task = asyncio.ensure_future(self._run(items))
+        self.batches.add(task)
+        task.add_done_callback(self.batches.discard)
+
+    def cancel(self):
+        """Drop the current batch and cancel the submitted ones
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        for _, future in self.pending:
+            future.cancel()
+        self.pending = []
+        for task in list(self.batches):
+            task.cancel()
+
+    async def _run(self, items):
+        futures = [future for _, future in items]
+        try:
+            results = await self.call(*[list(column) for column in zip(*[args for args, _ in items])])
+            if len(results) != len(items):
+                raise ValueError(f"Batch of {len(items)} calls returned {len(results)} results")
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            results = [e] * len(items)
+
+        for future, result in zip(futures, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+
+
+class CheckpointStore(object):
+    """
+    A checkpoint store persists, per Initiator, how far its ledger has been processed, so that a restarted
+    Interledger resumes listening from there instead of from the current block.
+
+    The states are kept in memory by update() and written to disk in batches, when flush_every updates have
+    accumulated or flush_interval seconds after the first unwritten update, so that the cost of the fsync
+    is shared by many transfers.
+    """
+
+    def __init__(self, flush_every: int = 100, flush_interval: float = 1.0):
+        """
+        :param int flush_every: the states are written after this number of updates
+        :param float flush_interval: the states are written at most this number of seconds after an update
+        """
+        if flush_every <= 0:
+            raise ValueError("Invalid flush count")
+        if flush_interval < 0:
+            raise ValueError("Invalid flush interval")
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.dirty = {}  # name -> function returning the state to write
+        self.updates = 0
+        self.first_update = None
+        self.timer = None
+        self.flushes = 0  # number of writes to disk
+
+    def load(self, name: str) -> dict:
+        """Read the last state written for an Initiator.
+
+        :param str name: the name of the Initiator, unique in the store
+
+        :returns: the state, None if there is none
+        :rtype: dict {
+            'position': int,  # last block, or height, whose transfers are all finalized
+            'head': int,      # last block whose events had been read
+            'in_flight': list, # ids of the transfers read but not finalized
+            'done': list       # ids of the transfers finalized after position
+        }
+        """
+        assert False, "must be implemented in child class"
+
+    def update(self, name: str, snapshot) -> None:
+        """Record that the state of an Initiator has changed.
+
+        :param str name: the name of the Initiator, unique in the store
+        :param function snapshot: function returning the current state, called when the state is written
+        """
+        self.dirty[name] = snapshot
+        self.updates += 1
+        if self.updates >= self.flush_every:
+            self.flush()
+        elif self.timer is None:
+            self.first_update = time.monotonic()
+            try:
+                self.timer = asyncio.get_event_loop().call_later(self.flush_interval, self.flush)
+            except RuntimeError:
+                # no event loop, the states are written by the next flush()
+                pass
+        elif time.monotonic() - self.first_update >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the states updated since the last flush
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.dirty:
+            return
+        states = {name: snapshot() for name, snapshot in self.dirty.items()}
+        self.dirty = {}
+        self.updates = 0
+        self._write(states)
+        self.flushes += 1
+
+    def close(self) -> None:
+        """Write the pending states and release the resources of the store
+        """
+        self.flush()
+
+    def _write(self, states: dict) -> None:
+        """Durably write the states, name -> state
+        """
+        assert False, "must be implemented in child class"
+
+
+class FileCheckpointStore(CheckpointStore):
+    """JSON file holding the states of all the Initiators. It is replaced atomically at each flush.
+    """
+
+    def __init__(self, path: str, flush_every: int = 100, flush_interval: float = 1.0):
+        """
+        :param str path: the checkpoint file
+        """
+        super().__init__(flush_every, flush_interval)
+        self.path = path
+        self.states = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.states = json.load(f)
+
+    def load(self, name: str) -> dict:
+        return self.states.get(name)
+
+    def _write(self, states: dict) -> None:
+        self.states.update(states)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.states, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+class SqliteCheckpointStore(CheckpointStore):
+    """SQLite database with one row per Initiator.
+    """
+
+    def __init__(self, path: str, flush_every: int = 100, flush_interval: float = 1.0):
+        """
+        :param str path: the database file
+        """
+        super().__init__(flush_every, flush_interval)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA synchronous = FULL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS checkpoints (name TEXT PRIMARY KEY, state TEXT NOT NULL)")
+        self.db.commit()
+
+    def load(self, name: str) -> dict:
+        row = self.db.execute("SELECT state FROM checkpoints WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write(self, states: dict) -> None:
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO checkpoints (name, state) VALUES (?, ?)",
+                                [(name, json.dumps(state)) for name, state in states.items()])
+
+    def close(self) -> None:
+        super().close()
+        self.db.close()
+
+
+class InitiatorProgress(object):
+    """Tracks which transfers read from an Initiator are finalized, to derive its checkpoint state: the position
+    up to which all the transfers are finalized, the ids of the transfers still in flight, and the ids of those
+    finalized after that position, which are skipped when the blocks after the position are read again.
+    """
+
+    def __init__(self, state: dict = None):
+        """
+        :param dict state: the state loaded from the checkpoint store, if any
+        """
+        self.position = None
+        self.fetches = []  # [before, after, pending ids, finalized ids] of the reads, by position before the read
+        self.by_id = {}    # id -> fetch of the in-flight transfers
+        self.replay = set()  # ids finalized before the restart, skipped when they are read again
+        self.in_flight = set()  # ids in flight before the restart
+        if state and state['position'] is not None:
+            self.position = state['position']
+            # the blocks up to the head of the previous run are read again
+            self.fetches.append([state['position'], state['head'], set(), set(state['done'])])
+            self.replay = set(state['done'])
+            self.in_flight = set(state['in_flight'])
+
+    def resume(self, ids: list) -> None:
+        """Record that transfers in flight before the restart are carried on without being read again,
+        they are skipped when their blocks are read again.
+        """
+        if not self.fetches:
+            return
+        restored = self.fetches[0]
+        for id in ids:
+            if id in self.in_flight:
+                restored[2].add(id)
+                self.by_id[id] = restored
+                self.replay.add(id)
+
+    def skip(self, id: str) -> bool:
+        """Whether a transfer read again after a restart was already finalized, or resumed
+        """
+        if id in self.replay:
+            self.replay.discard(id)
+            return True
+        return False
+
+    def fetched(self, before: int, after: int, ids: list) -> None:
+        """Record a read of the Initiator.
+
+        :param int before: the position of the Initiator before the read
+        :param int after: the position of the Initiator after the read
+        :param list ids: the ids of the transfers read
+        """
+        if after is None:
+            return
+        if before is None:
+            # the Initiator did not know where it started from
+            before = after
+        if self.position is None or after > self.position:
+            self.position = after
+        if ids:
+            fetch = [before, after, set(ids), set()]
+            index = len(self.fetches)
+            while index > 0 and self.fetches[index - 1][0] > before:
+                index -= 1
+            self.fetches.insert(index, fetch)
+            for id in ids:
+                self.by_id[id] = fetch
+        self._trim()
+
+    def finalized(self, id: str) -> None:
+        """Record that a transfer is finalized
+        """
+        fetch = self.by_id.pop(id, None)
+        if fetch is None:
+            return
+        fetch[2].discard(id)
+        fetch[3].add(id)
+        self._trim()
+
+    def state(self) -> dict:
+        """The state to write in the checkpoint store, see CheckpointStore.load()
+        """
+        in_flight, done = [], []
+        for _, _, pending, finalized in self.fetches:
+            in_flight.extend(pending)
+            done.extend(finalized)
+        return {'position': self.fetches[0][0] if self.fetches else self.position,
+                'head': max([self.position] + [after for _, after, _, _ in self.fetches]),
+                'in_flight': in_flight,
+                'done': done}
+
+    def _trim(self):
+        # the reads whose transfers are all finalized are no longer needed once their blocks are all before
+        # the first read with transfers in flight, which is the position the Initiator would resume from
+        first = 0
+        while first < len(self.fetches) and not self.fetches[first][2]:
+            first += 1
+        if first == 0:
+            return
+        position = self.fetches[first][0] if first < len(self.fetches) else self.position
+        kept = [fetch for fetch in self.fetches[:first] if fetch[1] > position]
+        if len(kept) < first:
+            self.fetches[:first] = kept
@@ -1,21 +1,70 @@
 import asyncio
+import time
+from itertools import islice
 from typing import Union, List
 from uuid import uuid4
 
 from .adapter.interfaces import Initiator, Responder, MultiResponder, ErrorCode, LedgerType
-from .transfer import TransferStatus
+from .batcher import Batcher
+from .checkpoint import CheckpointStore, InitiatorProgress
+from .registry import TransferRegistry, TransferSet, TransferCollection, CompletionQueue
+from .scheduler import StageScheduler
+from .sinks import ResultSink
+from .transfer import TransferStatus, Transfer
+from .wal import WriteAheadLog, decode_result
+from .metrics import Metrics
+from .tracing import Tracer
+from .quorum import Quorum
 
 
 class Interledger(object):
     """
     Class definition of an interledger component, which is composed by an Initiator and a Responder to implement the data transfer operation.
     """
-    def __init__(self, initiator: Initiator, responder: Union[Responder, List], multi: bool=False, threshold: int=1):
+
+    # transfer collections, lists assigned to them are converted
+    transfers = TransferCollection(TransferRegistry)
+    transfers_inquired = TransferCollection(TransferSet, '_watch_inquiry')
+    transfers_answered = TransferCollection(TransferSet)
+    transfers_sent = TransferCollection(TransferSet, '_watch_send')
+    transfers_responded = TransferCollection(TransferSet)
+    results_committing = TransferCollection(TransferSet, '_watch_confirm')
+    results_aborting = TransferCollection(TransferSet, '_watch_confirm')
+
+    def __init__(self, initiator: Initiator, responder: Union[Responder, List], multi: bool=False, threshold: int=1,
+                 pipeline: bool=False, queue_size: int=1024, max_in_flight: int=None,
+                 result_sink: ResultSink=None, batch_size: int=None, batch_window: float=0.05,
+                 checkpoint: CheckpointStore=None, checkpoint_name: str='initiator', wal: WriteAheadLog=None,
+                 metrics: Metrics=None, metrics_name: str=None, tracer: Tracer=None,
+                 responder_timeout: Union[float, List]=None):
         """Constructor
         :param object initiator: The Initiator object
         :param object responder: The Responder object by default, list of Responder objects in multi-ledger mode
         :param bool multi: whether the multi-ledger mode is enabled
         :param int threshold: threshold number of minimum requirement for positive responses from all responders
+        :param bool pipeline: whether run() uses the event-driven stage scheduler instead of the polling loop
+        :param int queue_size: capacity of each stage queue of the stage scheduler
+        :param int max_in_flight: maximum number of transfers handled at the same time, unbounded if None
+        :param object result_sink: The ResultSink receiving the results of finalized transfers,
+            instead of keeping them in results_commit / results_abort
+        :param int batch_size: maximum number of transfers sent to a Responder with one send_data_batch() call,
+            and committed / aborted with one commit_sending_batch() / abort_sending_batch() call of the Initiator;
+            transfers are handled one by one if None
+        :param float batch_window: maximum number of seconds a transfer waits for its batch to fill up
+        :param object checkpoint: The CheckpointStore recording how far the Initiator ledger has been processed,
+            the Initiator resumes from its last checkpoint if there is one; the Initiator must implement
+            set_position() and get_position()
+        :param str checkpoint_name: the name of the Initiator in the checkpoint store
+        :param object wal: The WriteAheadLog recording the status transitions of the transfers, from which
+            the transfers in flight are recovered when run() starts; not supported in multi-ledger mode
+        :param object metrics: The Metrics registry recording the latency of each status transition, of the reads of
+            the Initiator, and the number of transfers in each status and stage queue
+        :param str metrics_name: the value of the 'bridge' label of the metrics, checkpoint_name by default
+        :param object tracer: The Tracer receiving the spans of each stage of the transfers and of each call
+            to the adapters, the no-op Tracer by default
+        :param float responder_timeout: seconds each responder has to answer an inquiry or a send before it
+            counts as a negative answer, or list of such deadlines, one per responder (multi-ledger mode only);
+            no deadline if None
         """
 
         # multi-ledger mode
@@ -41,6 +90,25 @@ class Interledger(object):
                 raise ValueError("Invalid threshold number")
             self.threshold = threshold
 
+        # deadlines of the responders, the threshold votes of the multi-ledger mode do not wait for them longer
+        self.responder_timeouts = None
+        if responder_timeout is not None:
+            if not self.multi:
+                raise ValueError("The responder timeout is only supported in multi-ledger mode")
+            if isinstance(responder_timeout, (list, tuple)):
+                timeouts = list(responder_timeout)
+            else:
+                timeouts = [responder_timeout] * len(self.responders)
+            if len(timeouts) != len(self.responders) \
+               or any(timeout is not None and timeout <= 0 for timeout in timeouts):
+                raise ValueError("Invalid responder timeout")
+            self.responder_timeouts = timeouts
+
+        # transfers whose inquiry vote, send task or send vote, or confirm task has completed
+        self._answers = CompletionQueue()
+        self._responses = CompletionQueue()
+        self._confirmations = CompletionQueue()
+
         # transfer ralated
         self.transfers = []
         
@@ -60,6 +128,69 @@ class Interledger(object):
         self.results_aborting = []
         self.results_abort = []
 
+        # event-driven stage scheduler
+        if queue_size <= 0:
+            raise ValueError("Invalid queue size")
+        self.pipeline = pipeline
+        self.queue_size = queue_size
+        self.scheduler = None
+        self.triggers = {}  # name -> task of the triggers of the polling loop still waiting
+
+        # in-flight window: the Initiator is not polled while it is full
+        if max_in_flight is not None and max_in_flight <= 0:
+            raise ValueError("Invalid max in-flight number")
+        self.max_in_flight = max_in_flight
+
+        # destination of the finalized results
+        self.result_sink = result_sink
+
+        # coalesce the transfers sent to each responder, and committed or aborted by the initiator, into batches
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.send_batchers = None
+        self.commit_batcher = None
+        self.abort_batcher = None
+        if batch_size is not None:
+            responders = [self.responder] if not self.multi else self.responders
+            self.send_batchers = [Batcher(resp.send_data_batch, batch_size, batch_window) for resp in responders]
+            self.commit_batcher = Batcher(initiator.commit_sending_batch, batch_size, batch_window)
+            self.abort_batcher = Batcher(initiator.abort_sending_batch, batch_size, batch_window)
+
+        # resume the Initiator from its checkpoint
+        self.checkpoint = checkpoint
+        self.checkpoint_name = checkpoint_name
+        self.progress = None
+        self.fetching = None  # lock serializing the reads of the Initiator, created on first use
+        if checkpoint is not None:
+            if type(initiator).set_position is Initiator.set_position:
+                raise ValueError(f"{type(initiator).__name__} cannot resume from a position, "
+                                 "checkpoints are not supported")
+            state = checkpoint.load(checkpoint_name)
+            if state and state['position'] is not None:
+                initiator.set_position(state['position'])
+            self.progress = InitiatorProgress(state)
+
+        # write-ahead log of the transitions, the transactions sent by the adapters are logged as well
+        # so that the recovered transfers wait for them instead of sending them again
+        if wal is not None and self.multi:
+            raise ValueError("The write-ahead log is not supported in multi-ledger mode")
+        self.wal = wal
+        self.recovered = []  # (transfer, commit) pairs recovered from the log, for the stage scheduler
+        if wal is not None:
+            self.responder.on_submitted = self._log_send_submitted
+            self.initiator.on_submitted = self._log_confirm_submitted
+
+        # latency histograms and gauges
+        self.metrics = metrics
+        self.metrics_name = metrics_name or checkpoint_name
+        if metrics is not None:
+            self._register_metrics()
+
+        # spans of the stages and of the adapter calls
+        self.tracer = tracer or Tracer()
+        # whether the time of the status changes is kept
+        self._timed = metrics is not None or self.tracer.enabled
+
         # initial state is down
         self.up = False
         
@@ -68,36 +199,62 @@ class Interledger(object):
         Wait for new transfers from the Initiator, forward them to the Responder and finalize the protocol with the Intiator.
         """
         self.up = True
+        if self.wal is not None:
+            self._recover()
+        if self.pipeline:
+            self.scheduler = StageScheduler(self, self.queue_size)
+            await self.scheduler.run()
+            return
+
+        triggers = self.triggers
         while self.up:
-            # Triggers
-            receive = asyncio.ensure_future(self.receive_transfer())
-            if not self.transfers_inquired \
-               and not self.transfers_sent \
-               and not self.results_committing \
-               and not self.results_aborting:
-                await receive
+            # Triggers, each one is started again only once its previous run has completed
+            # the Initiator is not polled while the in-flight window is full
+            if 'receive' not in triggers and not self._window_full():
+                triggers['receive'] = asyncio.ensure_future(self.receive_transfer())
+            if 'answer' not in triggers and self.transfers_inquired:
+                triggers['answer'] = asyncio.ensure_future(self.transfer_inquiry())
+            if 'result' not in triggers and self.transfers_sent:
+                triggers['result'] = asyncio.ensure_future(self.transfer_result())
+            if 'confirm' not in triggers and (self.results_committing or self.results_aborting):
+                triggers['confirm'] = asyncio.ensure_future(self.confirm_transfer())
+            if triggers:
+                await asyncio.wait(list(triggers.values()), return_when=asyncio.FIRST_COMPLETED)
             else:
-                answer = asyncio.ensure_future(self.transfer_inquiry())
-                result = asyncio.ensure_future(self.transfer_result())
-                confirm = asyncio.ensure_future(self.confirm_transfer())
-                asyncio.wait([receive, answer, result, confirm], return_when=asyncio.FIRST_COMPLETED)
+                await asyncio.sleep(0)
+            if not self.up:
+                break
+            for name, trigger in list(triggers.items()):
+                if trigger.done():
+                    del triggers[name]
+                    trigger.result()
 
             # Actions
-            inquiry = asyncio.ensure_future(self.send_inquiry())
-            send = asyncio.ensure_future(self.send_transfer())
-            process = asyncio.ensure_future(self.process_result())
-            await send
-            await process
+            await self.send_inquiry()
+            await self.send_transfer()
+            await self.process_result()
 
             # clean up
             self.cleanup()
 
-        # TODO Add some closing procedure
+        # the triggers still waiting are cancelled by stop()
+        triggers.clear()
 
     def stop(self):
         """Stop the interledger run() operation
         """
         self.up = False
+        if self.scheduler:
+            self.scheduler.stop()
+        for trigger in self.triggers.values():
+            trigger.cancel()
+        if self.batch_size is not None:
+            for batcher in self.send_batchers + [self.commit_batcher, self.abort_batcher]:
+                batcher.cancel()
+        if self.checkpoint is not None:
+            self.checkpoint.flush()
+        if self.wal is not None:
+            self.wal.flush()
 
         self.transfers = []
 
@@ -114,14 +271,42 @@ class Interledger(object):
     async def receive_transfer(self):
         """Receive the list of transfers from the Initiator. 
            This operation blocks until it receives at least one transfer.
+           The Initiator is not polled while the in-flight window is full.
+        """
+        if self._window_full():
+            return 0
+        transfers = await self._fetch_transfers()
+        return len(transfers)
+
+    async def _fetch_transfers(self):
+        """Fetch the new transfers from the Initiator and store them as READY.
+
+        :returns: The received transfers
+        :rtype: list
         """
-        transfers = await self.initiator.listen_for_events()
+        if self.progress is None:
+            transfers = await self._listen()
+        else:
+            # one read at a time, so that a checkpoint never moves past transfers not registered yet
+            if self.fetching is None:
+                self.fetching = asyncio.Lock()
+            async with self.fetching:
+                position = self.initiator.get_position()
+                transfers = await self._listen()
+                # the transfers finalized before a restart are read again, up to the last checkpoint
+                transfers = [t for t in transfers if not self.progress.skip(t.id)]
+                self.progress.fetched(position, self.initiator.get_position(), [t.id for t in transfers])
+                self.checkpoint.update(self.checkpoint_name, self.progress.state)
         if transfers:
             # include random nonce in transfer paylaod
+            now = time.monotonic() if self._timed else None
             for transfer in transfers:
-                transfer.payload['nonce'] = str(uuid4().int)
+                transfer.nonce = str(uuid4().int)
+                transfer.status_time = now
+                if self.wal is not None:
+                    self._log(transfer, id=transfer.id, **_log_data(transfer.data))
             self.transfers.extend(transfers)
-        return len(transfers)
+        return transfers
 
     # Action (used by multi-ledger mode only)
     async def send_inquiry(self):
@@ -129,40 +314,25 @@ class Interledger(object):
         """
         if not self.multi:
             return
-        for transfer in self.transfers:
-            if transfer.status == TransferStatus.READY:
-                transfer.status = TransferStatus.INQUIRED
-                nonce, data = transfer.payload['nonce'], transfer.payload['data']
-                transfer.inquiry_tasks = [asyncio.ensure_future( \
-                    resp.send_data_inquire(nonce, data)) \
-                    for resp in self.responders]
-                transfer.inquiry_results = [None] * len(self.responders)
-                self.transfers_inquired.append(transfer)
+        for transfer in self._ready_to_forward():
+            self._start_inquiry(transfer)
+            self.transfers_inquired.append(transfer)
 
     # Trigger (used by multi-ledger mode only)
     async def transfer_inquiry(self):
         """Stores the inquiry results coming back to connected responders.
+           This operation blocks until the inquiry vote of at least one transfer is decided,
+           each transfer is answered as soon as its own vote is.
         """
-        if not self.multi: 
+        if not self.multi or not self.transfers_inquired:
             return
 
-        inquiry_tasks = []
-        for transfer in self.transfers_inquired:
-            inquiry_tasks.extend(transfer.inquiry_tasks)
-        if not inquiry_tasks: 
-            return
-
-        await asyncio.wait(inquiry_tasks, return_when=asyncio.ALL_COMPLETED)
-
-        for transfer in self.transfers_inquired:
-            transfer.inquiry_results = [t.result() if t.done() else None for t in transfer.inquiry_tasks]
-            status = [r['status'] for r in transfer.inquiry_results]
-            transfer.inquiry_decision = status.count(True) >= self.threshold
-            transfer.status = TransferStatus.ANSWERED
-            self.transfers_answered.append(transfer)
-
-        # update records
-        self.transfers_inquired = [transfer for transfer in self.transfers_inquired if transfer.status == TransferStatus.INQUIRED]
+        await self._answers.wait()
+        for transfer in self._answers.drain():
+            if transfer.status == TransferStatus.INQUIRED and transfer in self.transfers_inquired:
+                self._record_inquiry(transfer)
+                self.transfers_inquired.remove(transfer)
+                self.transfers_answered.append(transfer)
 
 
     # Action
@@ -170,174 +340,443 @@ class Interledger(object):
         """Forward the stored transfers to the Responder.
         """
         if not self.multi:
-            for transfer in self.transfers:
-                # generate nonce
-                nonce, data = transfer.payload['nonce'], transfer.payload['data']
-
-                if transfer.status == TransferStatus.READY:
-                    transfer.status = TransferStatus.SENT                    
-                    # send data to destination ledger
-                    transfer.send_task = asyncio.ensure_future(self.responder.send_data(nonce, data))
-                    self.transfers_sent.append(transfer)
+            for transfer in self._ready_to_forward():
+                self._start_send(transfer)
+                self.transfers_sent.append(transfer)
 
         else: # multi-ledger mode
             for transfer in self.transfers_answered:
-                # generate nonce
-                nonce, data = transfer.payload['nonce'], transfer.payload['data']
-
                 if transfer.status == TransferStatus.ANSWERED:
-                    transfer.status = TransferStatus.SENT
-                    if transfer.inquiry_decision: # inquiry agreed
-                        transfer.send_tasks = [asyncio.ensure_future( \
-                            resp.send_data(nonce, data)) \
-                            for resp in self.responders]
-                    else: # inquiry rejected
-                        transfer.send_tasks = [asyncio.ensure_future( \
-                            resp.abort_send_data(nonce, 5)) \
-                            for resp in self.responders] # reason = 5 for INQUIRY_REJECT
-                    transfer.results = [None] * len(self.responders)
+                    self._start_send(transfer)
                     self.transfers_sent.append(transfer)
             
             # update records
-            self.transfers_answered = [transfer for transfer in self.transfers_answered if transfer.status == TransferStatus.ANSWERED]
+            self.transfers_answered.clear()
 
 
     # Trigger
     async def transfer_result(self):
-        """Store the results of the transfers sent to the Responder. 
-           This operation blocks until at least one future has been completed.
+        """Store the results of the transfers sent to the Responder(s).
+           This operation blocks until at least one future, or send vote in multi-ledger mode, has been completed.
         """
-        if not self.multi:
-            send_tasks = [transfer.send_task for transfer in self.transfers_sent]
-        else:
-            send_tasks = []
-            for transfer in self.transfers_sent:
-                send_tasks.extend(transfer.send_tasks)
-
-        if not send_tasks:
+        if not self.transfers_sent:
             return
 
-        if not self.multi:
-            await asyncio.wait(send_tasks, return_when=asyncio.FIRST_COMPLETED)
-            for transfer in self.transfers_sent:
-                if transfer.status == TransferStatus.SENT and transfer.send_task.done():
-                    transfer.result = transfer.send_task.result()
-                    transfer.status = TransferStatus.RESPONDED
-                    self.transfers_responded.append(transfer)
-
-        else:
-            await asyncio.wait(send_tasks, return_when=asyncio.ALL_COMPLETED)
-            for transfer in self.transfers_sent:
-                transfer.results = [t.result() if t.done() else None for t in transfer.send_tasks]
-                transfer.status = TransferStatus.RESPONDED
+        await self._responses.wait()
+        for transfer in self._responses.drain():
+            if transfer.status == TransferStatus.SENT and transfer in self.transfers_sent:
+                self._record_response(transfer)
+                self.transfers_sent.remove(transfer)
                 self.transfers_responded.append(transfer)
-                
-        # update records
-        self.transfers_sent = [transfer for transfer in self.transfers_sent if transfer.status == TransferStatus.SENT]
 
     # Action
     async def process_result(self):
         """Process the result of the responder: trigger the commit() or the abort()
            operation of the Initiator to confirm the status of the transfer.
         """
-        if not self.multi:
-            for transfer in self.transfers_responded:
-                if transfer.status == TransferStatus.RESPONDED:
-                    id = transfer.payload['id']
-
-                    if transfer.result["status"]: # commit the transfer from initiator
-                        # If the Responder ledger is KSI, pass the KSI id (stored in 
-                        # tx_hash field of transfer) to the Initiator's commit function
-                        if self.responder.ledger_type == LedgerType.KSI:
-                            transfer.confirm_task = asyncio.ensure_future(
-                                self.initiator.commit_sending(id, transfer.result['tx_hash'].encode()))
-                        else:
-                            transfer.confirm_task = asyncio.ensure_future(
-                                self.initiator.commit_sending(id))
-                        self.results_committing.append(transfer)
-                    else: # abort the transfer from initiator
-                        reason =  2 # ErrorCode.TRANSACTION_FAILURE
-                        transfer.confirm_task = asyncio.ensure_future(self.initiator.abort_sending(id, reason))
-                        self.results_aborting.append(transfer)
-
-                    transfer.status = TransferStatus.CONFIRMING
-        
-        else: # multi-ledger mode
-            for transfer in self.transfers_responded:
-                if transfer.status == TransferStatus.RESPONDED:
-                    id = transfer.payload['id']
-
-                    if transfer.inquiry_decision:
-                        status = [r['status'] for r in transfer.results if r and 'status' in r]
-                        if status.count(True) >= self.threshold:
-                            transfer.confirm_task = asyncio.ensure_future(
-                                self.initiator.commit_sending(id))
-                            self.results_committing.append(transfer)
-                        else:
-                            reason =  2 # ErrorCode.TRANSACTION_FAILURE
-                            transfer.confirm_task = asyncio.ensure_future(
-                                self.initiator.abort_sending(id, reason))
-                            self.results_aborting.append(transfer)
-                    
-                    else: # inquiry rejected
-                        reason = 5 # ErrorCode.INQUIRY_REJECT
-                        transfer.confirm_task = asyncio.ensure_future(
-                            self.initiator.abort_sending(id, reason))
-                        self.results_aborting.append(transfer)
-
-                transfer.status = TransferStatus.CONFIRMING
+        for transfer in self.transfers_responded:
+            if transfer.status == TransferStatus.RESPONDED:
+                if self._start_confirm(transfer):
+                    self.results_committing.append(transfer)
+                else:
+                    self.results_aborting.append(transfer)
 
         # update records
-        self.transfers_responded = [transfer for transfer in self.transfers_responded \
-            if transfer.status == TransferStatus.RESPONDED]
+        self.transfers_responded.clear()
 
 
     async def confirm_transfer(self):
         """Confirm the status of transfer as either commit or abort based on the initiator operations, to complete the protocol
         """
-        confirm_tasks = [transfer.confirm_task for transfer in self.results_committing + self.results_aborting]
-        if not confirm_tasks:
+        if not self.results_committing and not self.results_aborting:
             return
-        await asyncio.wait(confirm_tasks, return_when=asyncio.FIRST_COMPLETED)
-
-        for transfer in self.results_committing:
-            if transfer.status == TransferStatus.CONFIRMING and transfer.confirm_task.done():
-                # retrieve confirm result and update state
-                commit_result = transfer.confirm_task.result()
-                transfer.status = TransferStatus.FINALIZED
-                # record confirm result
-                transfer.result['commit_status'] = commit_result['commit_status']
-                transfer.result['commit_tx_hash'] = commit_result['commit_tx_hash']
-                if 'commit_error_code' in commit_result:
-                    transfer.result['commit_error_code'] = commit_result['commit_error_code']
-                    transfer.result['commit_message'] = commit_result['commit_message']
-                # update records
-                self.results_commit.append(transfer.result)
-        self.results_committing = [transfer for transfer in self.results_committing if transfer.status == TransferStatus.CONFIRMING]
-
-        for transfer in self.results_aborting:
-            if transfer.status == TransferStatus.CONFIRMING and transfer.confirm_task.done():
-                # retrieve confirm result and update state
-                abort_result = transfer.confirm_task.result()
-                transfer.status = TransferStatus.FINALIZED
-                # record abort result
-                transfer.result['abort_status'] = abort_result['abort_status']
-                transfer.result['abort_tx_hash'] = abort_result['abort_tx_hash']
-                if 'abort_error_code' in abort_result:
-                    transfer.result['abort_error_code'] = abort_result['abort_error_code']
-                    transfer.result['abort_message'] = abort_result['abort_message']
-                # update records
-                self.results_abort.append(transfer.result)
-        self.results_aborting = [transfer for transfer in self.results_aborting if transfer.status == TransferStatus.CONFIRMING]
+        await self._confirmations.wait()
+
+        for transfer in self._confirmations.drain():
+            if transfer.status != TransferStatus.CONFIRMING:
+                continue
+            if transfer in self.results_committing:
+                self._record_confirm(transfer, True)
+                self.results_committing.remove(transfer)
+            elif transfer in self.results_aborting:
+                self._record_confirm(transfer, False)
+                self.results_aborting.remove(transfer)
         
 
+    # Per-transfer steps, shared by the polling loop and the stage scheduler
+
+    def _start_inquiry(self, transfer):
+        """Forward the inquiry of a READY transfer to all the responders (multi-ledger mode only).
+        """
+        nonce, data = transfer.nonce, transfer.data
+        self._move(transfer, TransferStatus.INQUIRED)
+        transfer.inquiry_tasks = [self._traced('send_data_inquire', transfer, asyncio.ensure_future( \
+            resp.send_data_inquire(nonce, data)), responder=i) \
+            for i, resp in enumerate(self.responders)]
+        transfer.inquiry_results = self._inquiry_quorum(transfer).results
+
+    def _inquiry_quorum(self, transfer) -> Quorum:
+        """The threshold vote over the inquiry answers of a transfer, created on first use (multi-ledger mode only).
+        """
+        if transfer.inquiry_quorum is None:
+            transfer.inquiry_quorum = Quorum(transfer.inquiry_tasks, self.threshold, self.responder_timeouts)
+        return transfer.inquiry_quorum
+
+    def _record_inquiry(self, transfer):
+        """Store the inquiry results of a transfer and take the inquiry decision, once its vote is decided
+        (multi-ledger mode only).
+        """
+        quorum = self._inquiry_quorum(transfer)
+        # the inquiries still pending cannot change the decision anymore
+        quorum.cancel_pending()
+        transfer.inquiry_results = quorum.results
+        transfer.inquiry_decision = quorum.decision
+        self._move(transfer, TransferStatus.ANSWERED)
+
+    def _start_send(self, transfer):
+        """Forward a transfer to the Responder, or to all the responders in multi-ledger mode.
+        """
+        nonce, data = transfer.nonce, transfer.data
+        self._move(transfer, TransferStatus.SENT)
+        if self.wal is not None:
+            self._log(transfer)
+        if not self.multi:
+            # send data to destination ledger
+            transfer.send_task = self._traced('send_data', transfer, self._send_data(0, nonce, data))
+        else:
+            if transfer.inquiry_decision: # inquiry agreed
+                transfer.send_tasks = [self._traced('send_data', transfer, self._send_data(i, nonce, data), responder=i) \
+                    for i in range(len(self.responders))]
+            else: # inquiry rejected
+                transfer.send_tasks = [self._traced('abort_send_data', transfer, asyncio.ensure_future( \
+                    resp.abort_send_data(nonce, 5)), responder=i) \
+                    for i, resp in enumerate(self.responders)] # reason = 5 for INQUIRY_REJECT
+            transfer.results = self._send_quorum(transfer).results
+
+    def _send_quorum(self, transfer) -> Quorum:
+        """The threshold vote over the send answers of a transfer, created on first use (multi-ledger mode only).
+        """
+        if transfer.send_quorum is None:
+            # after an inquiry rejection the transfer is aborted whatever the answers, it does not wait for them
+            threshold = 0 if transfer.inquiry_decision is False else self.threshold
+            transfer.send_quorum = Quorum(transfer.send_tasks, threshold, self.responder_timeouts)
+        return transfer.send_quorum
+
+    def _send_data(self, index: int, nonce: str, data: bytes) -> asyncio.Future:
+        """Send a data item to the responder at index, within a batch if batching is enabled.
+        """
+        if self.send_batchers:
+            return self.send_batchers[index].submit(nonce, data)
+        resp = self.responder if not self.multi else self.responders[index]
+        return asyncio.ensure_future(resp.send_data(nonce, data))
+
+    def _record_response(self, transfer):
+        """Store the result(s) of a transfer sent to the Responder(s).
+        """
+        if not self.multi:
+            transfer.result = transfer.send_task.result()
+        else:
+            quorum = self._send_quorum(transfer)
+            # once the threshold is unreachable the sends still pending are given up; once it is reached
+            # they go on, and their answers are filled in when they come
+            if not quorum.decision:
+                quorum.cancel_pending()
+            transfer.results = quorum.results
+        self._move(transfer, TransferStatus.RESPONDED)
+        if self.wal is not None:
+            self._log(transfer, result={k: v for k, v in transfer.result.items() if k != 'exception'})
+
+    def _start_confirm(self, transfer) -> bool:
+        """Trigger the commit() or the abort() operation of the Initiator for a RESPONDED transfer.
+
+        :returns: True if the transfer is being committed, False if it is being aborted
+        :rtype: bool
+        """
+        if not self.multi:
+            commit = transfer.result["status"]
+        elif transfer.inquiry_decision:
+            status = [r['status'] for r in transfer.results if r and 'status' in r]
+            commit = status.count(True) >= self.threshold
+        else:
+            commit = False
+
+        reason = None
+        if not commit: # abort the transfer from initiator
+            if not self.multi or transfer.inquiry_decision:
+                reason = 2 # ErrorCode.TRANSACTION_FAILURE
+            else: # inquiry rejected
+                reason = 5 # ErrorCode.INQUIRY_REJECT
+        transfer.confirm_task = self._confirm(transfer, commit, reason)
+        self._traced('commit_sending' if commit else 'abort_sending', transfer, transfer.confirm_task)
+
+        self._move(transfer, TransferStatus.CONFIRMING)
+        if self.wal is not None:
+            self._log(transfer, commit=commit, reason=reason)
+        return commit
+
+    def _confirm(self, transfer, commit: bool, reason: int = None):
+        """Send the commit() or the abort() operation of the Initiator for a transfer.
+
+        :param bool commit: whether the transfer is committed or aborted
+        :param int reason: the reason of the abort
+
+        :returns: the task of the operation
+        :rtype: asyncio.Future
+        """
+        id = transfer.id
+        if commit: # commit the transfer from initiator
+            # If the Responder ledger is KSI, pass the KSI id (stored in 
+            # tx_hash field of transfer) to the Initiator's commit function
+            if not self.multi and self.responder.ledger_type == LedgerType.KSI:
+                return asyncio.ensure_future(
+                    self.initiator.commit_sending(id, transfer.result['tx_hash'].encode()))
+            elif self.commit_batcher:
+                return self.commit_batcher.submit(id)
+            else:
+                return asyncio.ensure_future(
+                    self.initiator.commit_sending(id))
+        else: # abort the transfer from initiator
+            if self.abort_batcher:
+                return self.abort_batcher.submit(id, reason)
+            else:
+                return asyncio.ensure_future(
+                    self.initiator.abort_sending(id, reason))
+
+    def _record_confirm(self, transfer, commit: bool):
+        """Record the result of the commit() or abort() operation and finalize the transfer.
+        """
+        confirm_result = transfer.confirm_task.result()
+        self._move(transfer, TransferStatus.FINALIZED)
+        if self.wal is not None:
+            self._log(transfer)
+        if self.progress is not None:
+            self.progress.finalized(transfer.id)
+            self.checkpoint.update(self.checkpoint_name, self.progress.state)
+        prefix = 'commit' if commit else 'abort'
+        # record confirm result
+        transfer.result[prefix + '_status'] = confirm_result[prefix + '_status']
+        transfer.result[prefix + '_tx_hash'] = confirm_result[prefix + '_tx_hash']
+        if prefix + '_error_code' in confirm_result:
+            transfer.result[prefix + '_error_code'] = confirm_result[prefix + '_error_code']
+            transfer.result[prefix + '_message'] = confirm_result[prefix + '_message']
+        # update records
+        if self.result_sink is not None:
+            self.result_sink.emit(self._sink_record(transfer, commit))
+        elif commit:
+            self.results_commit.append(self._result_record(transfer))
+        else:
+            self.results_abort.append(self._result_record(transfer))
+
+    def _result_record(self, transfer):
+        """The record of a FINALIZED transfer stored in results_commit / results_abort
+        """
+        return transfer.result
+
+    def _sink_record(self, transfer, commit: bool) -> dict:
+        """The self-contained record of a FINALIZED transfer passed to the result sink
+        """
+        record = {'id': transfer.id,
+                  'nonce': transfer.nonce,
+                  'committed': commit}
+        for key, value in transfer.result.items():
+            # do not keep the exception objects, and what they reference, alive
+            record[key] = repr(value) if key == 'exception' else value
+        return record
+
+    async def _listen(self) -> list:
+        """Read the new transfers of the Initiator, timing the read if metrics or spans are recorded
+        """
+        if not self._timed:
+            return await self.initiator.listen_for_events()
+        with self.tracer.span('listen_for_events'):
+            if self.metrics is None:
+                return await self.initiator.listen_for_events()
+            with self.metrics.timer('interledger_listen_seconds', bridge=self.metrics_name):
+                return await self.initiator.listen_for_events()
+
+    def _move(self, transfer, status: TransferStatus):
+        """Change the status of a transfer, recording the time spent in the previous status
+        if metrics or spans are recorded
+        """
+        if self._timed:
+            now = time.monotonic()
+            if transfer.status_time is not None:
+                if self.metrics is not None:
+                    self.metrics.observe('interledger_stage_seconds', now - transfer.status_time,
+                                         bridge=self.metrics_name, **{'from': transfer.status.name, 'to': status.name})
+                if self.tracer.enabled:
+                    self.tracer.record(transfer.status.name, transfer.status_time, now,
+                                       id=transfer.id, nonce=transfer.nonce)
+            transfer.status_time = now
+        self.transfers.move(transfer, status)
+
+    def _traced(self, name: str, transfer, future: asyncio.Future, **attrs) -> asyncio.Future:
+        """Record the span of an adapter call of a transfer, from now until its future is done
+        """
+        if self.tracer.enabled:
+            self.tracer.watch(name, future, id=transfer.id, nonce=transfer.nonce, **attrs)
+        return future
+
+    # Metrics
+
+    def _register_metrics(self):
+        metrics, bridge = self.metrics, self.metrics_name
+        metrics.describe('interledger_stage_seconds', "Time spent by the transfers in a status before the next one")
+        metrics.describe('interledger_listen_seconds', "Duration of the reads of the Initiator")
+        metrics.describe('interledger_transfers', "Number of transfers in each status")
+        for status in TransferStatus:
+            metrics.gauge('interledger_transfers', lambda status=status: len(self.transfers.bucket(status)),
+                          bridge=bridge, status=status.name)
+        if self.pipeline:
+            metrics.describe('interledger_queue_depth', "Number of transfers waiting in each stage queue")
+            for queue in ('ready', 'answered', 'responded', 'confirmed'):
+                metrics.gauge('interledger_queue_depth', lambda queue=queue: self._queue_depth(queue),
+                              bridge=bridge, queue=queue)
+
+    def _queue_depth(self, name: str) -> int:
+        queue = getattr(self.scheduler, name, None) if self.scheduler else None
+        return queue.qsize() if queue is not None else 0
+
+    # Write-ahead log
+
+    def _log(self, transfer, **fields):
+        """Log the current status of a transfer, with the fields of the transition
+        """
+        record = {'nonce': transfer.nonce, 'status': transfer.status.name}
+        record.update(fields)
+        self.wal.append(record)
+
+    def _log_send_submitted(self, nonces: list, tx_hash):
+        """Log the transaction sent by the Responder for the data items with the given nonces
+        """
+        for nonce in nonces:
+            self.wal.append({'nonce': nonce, 'status': 'SUBMITTED', 'send_tx_hash': tx_hash})
+
+    def _log_confirm_submitted(self, ids: list, tx_hash):
+        """Log the commit or abort transaction sent by the Initiator for the data items with the given ids
+        """
+        for id in ids:
+            transfer = self.transfers.get(id)
+            if transfer is not None:
+                self.wal.append({'nonce': transfer.nonce, 'status': 'SUBMITTED', 'confirm_tx_hash': tx_hash})
+
+    def _recover(self):
+        """Rebuild the transfers in flight from the write-ahead log. The transfers whose transaction was sent
+        wait for its result instead of being sent again, and the log is compacted.
+        """
+        states = self.wal.read()
+        for nonce, state in list(states.items()):
+            try:
+                transfer, commit = self._recover_transfer(nonce, state)
+            except (KeyError, TypeError, ValueError) as e:
+                # partial record, e.g. a transfer whose first record was lost
+                print("WARNING: skipped malformed write-ahead log state of transfer", nonce, ":", repr(e))
+                del states[nonce]
+                continue
+
+            self.transfers.append(transfer)
+            if self.pipeline:
+                self.recovered.append((transfer, commit))
+            elif transfer.status == TransferStatus.SENT:
+                self.transfers_sent.append(transfer)
+            elif transfer.status == TransferStatus.CONFIRMING:
+                (self.results_committing if commit else self.results_aborting).append(transfer)
+        self.wal.compact(states)
+
+        # the recovered transfers are not read again from the checkpoint
+        if self.progress is not None:
+            self.progress.resume([transfer.id for transfer in self.transfers])
+
+    def _recover_transfer(self, nonce: str, state: dict) -> tuple:
+        """Rebuild a transfer from its state in the write-ahead log, see _recover()
+
+        :returns: (transfer, commit), commit being None unless the transfer is CONFIRMING
+        :rtype: tuple
+        """
+        transfer = Transfer()
+        transfer.payload = {'id': state['id'], 'nonce': nonce,
+                            'data': bytes.fromhex(state['data']) if state.get('binary') else state['data']}
+        status = TransferStatus[state['status']]
+        commit = None
+        if status in (TransferStatus.READY, TransferStatus.INQUIRED, TransferStatus.ANSWERED):
+            transfer.status = TransferStatus.READY
+        elif status == TransferStatus.SENT:
+            transfer.status = TransferStatus.SENT
+            if 'send_tx_hash' in state:
+                transfer.send_task = asyncio.ensure_future(
+                    self.responder.resume_send(nonce, transfer.data, state['send_tx_hash']))
+            else:
+                transfer.send_task = self._send_data(0, nonce, transfer.data)
+        elif status == TransferStatus.RESPONDED:
+            # the result is recorded again by the result stage
+            transfer.status = TransferStatus.SENT
+            transfer.send_task = asyncio.get_event_loop().create_future()
+            transfer.send_task.set_result(decode_result(state['result']))
+        else:
+            transfer.status = TransferStatus.CONFIRMING
+            transfer.result = decode_result(state['result'])
+            commit = state['commit']
+            if 'confirm_tx_hash' in state:
+                transfer.confirm_task = asyncio.ensure_future(self.initiator.resume_confirm(
+                    transfer.id, state['confirm_tx_hash'], commit, state['reason']))
+            else:
+                transfer.confirm_task = self._confirm(transfer, commit, state['reason'])
+        return transfer, commit
+
+    def _window_full(self) -> bool:
+        """Whether the number of unfinalized transfers has reached max_in_flight
+        """
+        if self.max_in_flight is None:
+            return False
+        pending = len(self.transfers) - len(self.transfers.bucket(TransferStatus.FINALIZED))
+        return pending >= self.max_in_flight
+
+    def _ready_to_forward(self) -> list:
+        """The READY transfers that can be forwarded without exceeding max_in_flight
+        """
+        ready = self.transfers.bucket(TransferStatus.READY)
+        if self.max_in_flight is None:
+            return list(ready)
+        in_flight = len(self.transfers) - len(ready) - len(self.transfers.bucket(TransferStatus.FINALIZED))
+        return list(islice(ready, max(0, self.max_in_flight - in_flight)))
+
+    def _watch_inquiry(self, transfer):
+        """Get notified when the inquiry vote of a transfer added to transfers_inquired is decided
+        """
+        if transfer.inquiry_tasks is not None:
+            self._answers.watch(transfer, self._inquiry_quorum(transfer).decided)
+
+    def _watch_send(self, transfer):
+        """Get notified when the send task, or the send vote in multi-ledger mode, of a transfer
+        added to transfers_sent completes
+        """
+        if not self.multi and transfer.send_task is not None:
+            self._responses.watch(transfer, transfer.send_task)
+        elif self.multi and transfer.send_tasks is not None:
+            self._responses.watch(transfer, self._send_quorum(transfer).decided)
+
+    def _watch_confirm(self, transfer):
+        """Get notified when the confirm task of a transfer added to results_committing / results_aborting completes
+        """
+        if transfer.confirm_task is not None:
+            self._confirmations.watch(transfer, transfer.confirm_task)
+
     def cleanup(self):
         """Cleanup the FINALIZED transfers from Interledger transfer arrays 
         """
-        self.transfers = [transfer for transfer in self.transfers if transfer.status != TransferStatus.FINALIZED]
+        for transfer in list(self.transfers.bucket(TransferStatus.FINALIZED)):
+            self.transfers.remove(transfer)
 
 
     def _filterOut(self, _list, _state: TransferStatus):
         """Cleanup elements with a particular state from an input list 
         """
         return [t for t in _list if t.state is not _state]
+
+
+def _log_data(data) -> dict:
+    """The fields logging the data of a transfer, bytes are logged in hex
+    """
+    if isinstance(data, (bytes, bytearray)):
+        return {'data': bytes(data).hex(), 'binary': True}
+    return {'data': data}
@@ -0,0 +1,190 @@
+import bisect
+import time
+
+# upper bounds, in seconds, of the buckets of the latency histograms: 0.5 ms to about 65 s
+DEFAULT_BUCKETS = tuple(0.0005 * 2 ** i for i in range(18))
+
+
+class Histogram(object):
+    """Latency histogram with fixed buckets, cumulative as in the Prometheus exposition format.
+    Recording a value costs a binary search and an increment.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        """
+        :param tuple buckets: the sorted upper bounds of the buckets, a last bucket holds the values above them
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a value
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket, like histogram_quantile() of Prometheus.
+
+        :param float q: the quantile, between 0 and 1
+
+        :returns: the estimate, None if no value was recorded
+        :rtype: float
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class Metrics(object):
+    """Registry of the histograms and gauges of the Interledger instances of a process,
+    rendered in the Prometheus text exposition format and optionally served on /metrics.
+
+    Histograms and gauges are identified by a name and a set of labels, e.g.
+    interledger_stage_seconds{bridge="left",from="READY",to="SENT"}.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        """
+        :param tuple buckets: the buckets of the histograms
+        """
+        self.buckets = buckets
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.gauges = {}      # (name, labels) -> function returning the current value
+        self.help = {}        # name -> description
+        self.runner = None
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        """The histogram with the given name and labels, created on first use
+        """
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        return histogram
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record a value in the histogram with the given name and labels
+        """
+        self.histogram(name, **labels).observe(value)
+
+    def timer(self, name: str, **labels) -> 'Timer':
+        """Context manager recording the duration of its block in the histogram with the given name and labels
+        """
+        return Timer(self.histogram(name, **labels))
+
+    def gauge(self, name: str, value, **labels) -> None:
+        """Register a gauge, read when the metrics are rendered.
+
+        :param str name: the name of the gauge
+        :param function value: function returning the current value
+        """
+        self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def describe(self, name: str, text: str) -> None:
+        """Set the HELP line of a metric
+        """
+        self.help[name] = text
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text exposition format
+        """
+        lines = []
+        for name, series in _by_name(self.histograms):
+            lines.extend(self._header(name, 'histogram'))
+            for labels, histogram in series:
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+        for name, series in _by_name(self.gauges):
+            lines.extend(self._header(name, 'gauge'))
+            for labels, value in series:
+                lines.append(f"{name}{_labels(labels)} {value()}")
+        return '\n'.join(lines) + '\n'
+
+    def _header(self, name: str, kind: str) -> list:
+        lines = [f"# TYPE {name} {kind}"]
+        if name in self.help:
+            lines.insert(0, f"# HELP {name} {self.help[name]}")
+        return lines
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 9100) -> int:
+        """Serve the metrics over HTTP on /metrics, until close() is called
+
+        :param str host: the address to listen on, local only by default
+        :param int port: the port to listen on, any free port if 0
+
+        :returns: the port listened on
+        :rtype: int
+        """
+        from aiohttp import web
+
+        async def handle(request):
+            return web.Response(text=self.render(), content_type='text/plain', charset='utf-8',
+                                headers={'X-Content-Type-Version': '0.0.4'})
+
+        app = web.Application()
+        app.router.add_get('/metrics', handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        return site._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """Stop serving the metrics
+        """
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+
+class Timer(object):
+    """Context manager recording the duration of its block in a histogram
+    """
+
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.monotonic() - self.start)
+        return False
+
+
+def _by_name(series: dict):
+    """Group the series of a metric family, (name, labels) -> value, by name
+    """
+    names = {}
+    for (name, labels), value in sorted(series.items(), key=lambda item: item[0]):
+        names.setdefault(name, []).append((labels, value))
+    return names.items()
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
@@ -0,0 +1,95 @@
+import asyncio
+from functools import partial
+
+from .adapter.interfaces import ErrorCode
+
+
+class Quorum(object):
+    """Threshold vote over the answers of the responders to one transfer, in multi-ledger mode.
+
+    The vote is decided as soon as threshold answers are positive, or as soon as so many answers are negative
+    that the threshold cannot be reached anymore, so that the decision waits for the k-th fastest responder
+    instead of the slowest one. An answer is positive if its 'status' is True; a responder which raises,
+    is cancelled, or does not answer before its deadline votes no.
+    """
+
+    def __init__(self, tasks: list, threshold: int, timeouts: list = None):
+        """
+        :param list tasks: the futures of the answers, one per responder
+        :param int threshold: the number of positive answers required
+        :param list timeouts: the seconds each responder has to answer, None for no deadline;
+            no deadline at all if None
+        """
+        loop = asyncio.get_event_loop()
+        self.tasks = tasks
+        self.threshold = threshold
+        # the answers, None while pending; late answers are filled in after the decision
+        self.results = [None] * len(tasks)
+        self.positive = 0
+        self.answered = 0
+        self.decided = loop.create_future()
+        self.timers = []
+        for index, task in enumerate(tasks):
+            task.add_done_callback(partial(self._done, index))
+        if timeouts is not None:
+            self.timers = [loop.call_later(timeout, self._expire, index)
+                           for index, timeout in enumerate(timeouts) if timeout is not None]
+        self._check()
+
+    @property
+    def decision(self) -> bool:
+        """Whether threshold answers are positive, None while the vote is pending
+        """
+        return self.decided.result() if self.decided.done() else None
+
+    @property
+    def pending(self) -> list:
+        """The indexes of the responders which have not answered yet
+        """
+        return [index for index, result in enumerate(self.results) if result is None]
+
+    def cancel_pending(self) -> None:
+        """Cancel the tasks of the responders which have not answered yet, they vote no
+        """
+        for index in self.pending:
+            self._answer(index, {"status": False, "error_code": ErrorCode.TIMEOUT, "message": "Cancelled"})
+            self.tasks[index].cancel()
+
+    def _done(self, index: int, task: asyncio.Future):
+        # the exception is retrieved even if the answer is already counted as a no
+        if task.cancelled():
+            result = {"status": False, "error_code": ErrorCode.TIMEOUT, "message": "Cancelled"}
+        elif task.exception() is not None:
+            e = task.exception()
+            result = {"status": False, "exception": e, "error_code": ErrorCode.TRANSACTION_FAILURE, "message": str(e)}
+        else:
+            result = task.result()
+        if self.results[index] is None:
+            self._answer(index, result)
+
+    def _expire(self, index: int):
+        if self.results[index] is not None:
+            return
+        self._answer(index, {"status": False, "error_code": ErrorCode.TIMEOUT,
+                             "message": "No answer before the deadline"})
+        self.tasks[index].cancel()
+
+    def _answer(self, index: int, result):
+        self.results[index] = result
+        self.answered += 1
+        if isinstance(result, dict) and result.get('status') is True:
+            self.positive += 1
+        self._check()
+
+    def _check(self):
+        if self.decided.done():
+            return
+        if self.positive >= self.threshold:
+            self._decide(True)
+        elif self.positive + len(self.tasks) - self.answered < self.threshold:
+            self._decide(False)
+
+    def _decide(self, decision: bool):
+        for timer in self.timers:
+            timer.cancel()
+        self.decided.set_result(decision)
@@ -0,0 +1,206 @@
+import asyncio
+from collections import deque
+from itertools import islice
+
+from .transfer import TransferStatus
+
+
+class TransferSet(object):
+    """Insertion-ordered set of transfers, with O(1) add, remove and membership test.
+    It supports the read operations of a list, so it can replace the transfer lists of the Interledger.
+    """
+
+    def __init__(self, transfers=(), on_add=None):
+        """
+        :param iterable transfers: the initial transfers
+        :param function on_add: optional callback invoked with each transfer added to the set
+        """
+        self._items = {}
+        self.on_add = on_add
+        self.extend(transfers)
+
+    def append(self, transfer):
+        key = id(transfer)
+        if key not in self._items:
+            self._items[key] = transfer
+            if self.on_add:
+                self.on_add(transfer)
+
+    def extend(self, transfers):
+        for transfer in transfers:
+            self.append(transfer)
+
+    def remove(self, transfer):
+        del self._items[id(transfer)]
+
+    def discard(self, transfer):
+        self._items.pop(id(transfer), None)
+
+    def clear(self):
+        self._items.clear()
+
+    def __contains__(self, transfer):
+        return id(transfer) in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+    def __getitem__(self, index):
+        if isinstance(index, int) and index >= 0:
+            try:
+                return next(islice(self._items.values(), index, None))
+            except StopIteration:
+                raise IndexError("TransferSet index out of range")
+        return list(self._items.values())[index]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self._items.values())!r})"
+
+
+class TransferRegistry(TransferSet):
+    """The transfers handled by an Interledger instance, indexed by transfer id and bucketed by TransferStatus.
+    Status transitions done through move() update the buckets in O(1), so each protocol stage only visits
+    the transfers that are in the status it processes.
+    """
+
+    def __init__(self, transfers=()):
+        self.buckets = {status: TransferSet() for status in TransferStatus}
+        self.ids = {}  # transfer id -> transfer
+        super().__init__(transfers)
+
+    def append(self, transfer):
+        if transfer in self:
+            return
+        super().append(transfer)
+        self.buckets[transfer.status].append(transfer)
+        id = self._id(transfer)
+        if id is not None:
+            self.ids[id] = transfer
+
+    def adopt(self, transfer):
+        """Add a transfer, replacing any other object registered with the same transfer id
+        """
+        previous = self.get(self._id(transfer))
+        if previous is not None and previous is not transfer:
+            self.remove(previous)
+        self.append(transfer)
+
+    def remove(self, transfer):
+        super().remove(transfer)
+        self._locate(transfer).remove(transfer)
+        id = self._id(transfer)
+        if self.ids.get(id) is transfer:
+            del self.ids[id]
+
+    def discard(self, transfer):
+        if transfer in self:
+            self.remove(transfer)
+
+    def clear(self):
+        super().clear()
+        for bucket in self.buckets.values():
+            bucket.clear()
+        self.ids.clear()
+
+    def move(self, transfer, status: TransferStatus):
+        """Update the status of a transfer and the bucket it belongs to.
+        Transfers that are not registered only get their status updated.
+        """
+        if transfer in self:
+            self._locate(transfer).remove(transfer)
+            self.buckets[status].append(transfer)
+        transfer.status = status
+
+    def bucket(self, status: TransferStatus) -> TransferSet:
+        """The registered transfers which are in the given status
+        """
+        return self.buckets[status]
+
+    def get(self, id: str):
+        """The transfer registered with the given transfer id, None if there is none
+        """
+        return self.ids.get(id)
+
+    def _locate(self, transfer) -> TransferSet:
+        # the status of a transfer may have been changed without move()
+        bucket = self.buckets[transfer.status]
+        if transfer not in bucket:
+            bucket = next(b for b in self.buckets.values() if transfer in b)
+        return bucket
+
+    @staticmethod
+    def _id(transfer):
+        return transfer.id
+
+
+class TransferCollection(object):
+    """Attribute descriptor that stores the transfer collections of the Interledger,
+    converting any list assigned to it into the given collection type.
+    """
+
+    def __init__(self, factory, on_add: str = None):
+        """
+        :param type factory: the collection type, TransferSet or TransferRegistry
+        :param str on_add: optional name of the owner method to invoke with each added transfer
+        """
+        self.factory = factory
+        self.on_add = on_add
+
+    def __set_name__(self, owner, name):
+        self.name = '_' + name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return getattr(obj, self.name)
+
+    def __set__(self, obj, value):
+        if value is not None and not isinstance(value, self.factory):
+            if self.on_add:
+                value = self.factory(value, on_add=getattr(obj, self.on_add))
+            else:
+                value = self.factory(value)
+        setattr(obj, self.name, value)
+
+
+class CompletionQueue(object):
+    """Transfers whose pending future has completed, in completion order.
+    It lets a stage wait for, and process, only the transfers that are ready to move on.
+    """
+
+    def __init__(self):
+        self._done = deque()
+        self._waiters = []
+
+    def watch(self, transfer, future):
+        """Queue the transfer once the future is done
+        """
+        future.add_done_callback(lambda _: self._put(transfer))
+
+    def _put(self, transfer):
+        self._done.append(transfer)
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def wait(self):
+        """Block until at least one transfer is queued
+        """
+        if self._done:
+            return
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        await waiter
+
+    def drain(self):
+        """Pop all the queued transfers
+        """
+        while self._done:
+            yield self._done.popleft()
+
+    def __len__(self):
+        return len(self._done)
@@ -0,0 +1,153 @@
+import asyncio
+
+
+class StageScheduler(object):
+    """Event-driven scheduler of an Interledger instance.
+
+    Each protocol stage (receive -> inquire -> send -> result -> confirm) is a long-lived worker
+    fed by a bounded queue. A transfer is handed over to the next stage as soon as the future(s)
+    of its current stage complete, so nothing is polled while the bridge is idle.
+    """
+
+    # pause before polling the Initiator again after it returned no transfers
+    idle_interval = 0.01
+
+    def __init__(self, interledger, queue_size: int = 1024):
+        """Constructor
+        :param object interledger: The Interledger instance to drive
+        :param int queue_size: capacity of each stage queue
+        """
+        self.interledger = interledger
+        self.queue_size = queue_size
+
+        # stage queues, created in run() so that they belong to the running loop
+        self.ready = None       # READY transfers
+        self.answered = None    # INQUIRED transfers whose inquiry vote is decided (multi-ledger mode)
+        self.responded = None   # SENT transfers whose send task, or send vote in multi-ledger mode, completed
+        self.confirmed = None   # (transfer, commit) pairs whose confirm task completed
+
+        # in-flight window, one slot per transfer from its reception to its finalization
+        self.window = None
+
+        self.workers = []
+        self.handovers = set()
+        self.up = False
+
+    async def run(self):
+        """Start the stage workers and run until stop() is called.
+        """
+        self.ready = asyncio.Queue(self.queue_size)
+        self.answered = asyncio.Queue(self.queue_size)
+        self.responded = asyncio.Queue(self.queue_size)
+        self.confirmed = asyncio.Queue(self.queue_size)
+        if self.interledger.max_in_flight:
+            self.window = asyncio.Semaphore(self.interledger.max_in_flight)
+
+        stages = [self._receive, self._send, self._result, self._confirm]
+        if self.interledger.multi:
+            stages.insert(1, self._inquire)
+
+        self.up = True
+        self.workers = [asyncio.ensure_future(stage()) for stage in stages]
+        try:
+            await asyncio.gather(*self.workers)
+        except asyncio.CancelledError:
+            if self.up:
+                raise
+        finally:
+            self._cancel()
+
+    def stop(self):
+        """Stop all the stage workers and the pending hand-overs.
+        """
+        self.up = False
+        self._cancel()
+
+    def _cancel(self):
+        for task in self.workers + list(self.handovers):
+            task.cancel()
+        self.handovers.clear()
+
+    def _hand_over(self, futures: list, item, queue: asyncio.Queue):
+        """Put item into queue as soon as all the futures are done.
+        """
+        async def forward():
+            await asyncio.wait(futures)
+            await queue.put(item)
+
+        task = asyncio.ensure_future(forward())
+        self.handovers.add(task)
+        task.add_done_callback(self.handovers.discard)
+
+    # Stage workers
+
+    async def _resume(self):
+        """Hand the transfers recovered from the write-ahead log over to the stage they were in
+        """
+        il = self.interledger
+        recovered, il.recovered = il.recovered, []
+        for transfer, commit in recovered:
+            if self.window:
+                await self.window.acquire()
+            if transfer.confirm_task is not None:
+                self._hand_over([transfer.confirm_task], (transfer, commit), self.confirmed)
+            elif transfer.send_task is not None:
+                self._hand_over([transfer.send_task], transfer, self.responded)
+            else:
+                await self.ready.put(transfer)
+
+    async def _receive(self):
+        il = self.interledger
+        await self._resume()
+        while self.up:
+            # do not poll the Initiator until a slot of the window is free
+            if self.window:
+                await self.window.acquire()
+            transfers = await il._fetch_transfers()
+            for i, transfer in enumerate(transfers):
+                if self.window and i > 0:
+                    await self.window.acquire()
+                # blocks while the next stage is saturated
+                await self.ready.put(transfer)
+            if not transfers:
+                if self.window:
+                    self.window.release()
+                await asyncio.sleep(self.idle_interval)
+
+    async def _inquire(self):
+        il = self.interledger
+        while self.up:
+            transfer = await self.ready.get()
+            il._start_inquiry(transfer)
+            self._hand_over([il._inquiry_quorum(transfer).decided], transfer, self.answered)
+
+    async def _send(self):
+        il = self.interledger
+        while self.up:
+            if not il.multi:
+                transfer = await self.ready.get()
+                il._start_send(transfer)
+                self._hand_over([transfer.send_task], transfer, self.responded)
+            else:
+                transfer = await self.answered.get()
+                il._record_inquiry(transfer)
+                il._start_send(transfer)
+                self._hand_over([il._send_quorum(transfer).decided], transfer, self.responded)
+
+    async def _result(self):
+        il = self.interledger
+        while self.up:
+            transfer = await self.responded.get()
+            il._record_response(transfer)
+            commit = il._start_confirm(transfer)
+            self._hand_over([transfer.confirm_task], (transfer, commit), self.confirmed)
+
+    async def _confirm(self):
+        il = self.interledger
+        while self.up:
+            transfer, commit = await self.confirmed.get()
+            il._record_confirm(transfer, commit)
+            if self.window:
+                self.window.release()
+            if self.confirmed.empty():
+                il.cleanup()
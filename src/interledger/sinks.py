@@ -0,0 +1,120 @@
+import asyncio
+import json
+from collections import deque
+from enum import Enum
+
+
+class ResultSink(object):
+    """
+    A result sink receives the record of every finalized transfer, so that the Interledger
+    does not need to keep the results in memory.
+    """
+
+    def emit(self, record: dict) -> None:
+        """Receive the record of a finalized transfer.
+
+        :param dict record: {
+            'id': str,
+            'nonce': str,
+            'committed': bool,
+            ... the result fields of the transfer, e.g. 'tx_hash', 'commit_status', 'abort_error_code'
+        }
+        """
+        assert False, "must be implemented in child class"
+
+    def close(self) -> None:
+        """Release the resources of the sink, if any.
+        """
+        pass
+
+
+class MemorySink(ResultSink):
+    """Ring buffer keeping the most recent records in memory.
+    """
+
+    def __init__(self, size: int = 1000):
+        """
+        :param int size: the number of records kept, older records are dropped
+        """
+        if size <= 0:
+            raise ValueError("Invalid buffer size")
+        self.records = deque(maxlen=size)
+        self.count = 0  # number of records ever received
+
+    def emit(self, record: dict) -> None:
+        self.records.append(record)
+        self.count += 1
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+
+class JsonlSink(ResultSink):
+    """Append-only file with one JSON record per line.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param str path: the file to append the records to
+        """
+        self.path = path
+        self.file = open(path, 'a')
+
+    def emit(self, record: dict) -> None:
+        self.file.write(json.dumps(record, default=_encode) + '\n')
+        self.file.flush()
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.file.close()
+
+
+class CallbackSink(ResultSink):
+    """Subscriber interface: pass each record to a function, or to a coroutine function which is scheduled.
+    """
+
+    def __init__(self, callback):
+        """
+        :param function callback: function or coroutine function taking the record as argument
+        """
+        self.callback = callback
+
+    def emit(self, record: dict) -> None:
+        result = self.callback(record)
+        if asyncio.iscoroutine(result):
+            asyncio.ensure_future(result)
+
+
+class QueueSink(ResultSink):
+    """Subscriber interface: put each record into an asyncio queue.
+    If a bounded queue is full, its oldest record is dropped to make room.
+    """
+
+    def __init__(self, queue: asyncio.Queue):
+        """
+        :param asyncio.Queue queue: the queue read by the subscriber
+        """
+        self.queue = queue
+        self.dropped = 0
+
+    def emit(self, record: dict) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(record)
+
+
+def _encode(value):
+    """Encode the values that JSON does not support natively
+    """
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    return repr(value)
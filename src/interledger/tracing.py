@@ -0,0 +1,135 @@
+import json
+import os
+import time
+from collections import deque
+
+
+class Tracer(object):
+    """
+    A tracer receives the spans of an Interledger instance: the time spent by each transfer in each TransferStatus,
+    and the calls to the adapters and to the state manager, with the id and the nonce of their transfer.
+
+    This base class is the no-op tracer used by default, its methods return at once. Tracers recording the spans
+    override record() and set enabled, which the Interledger checks before building the spans of a transfer.
+    """
+
+    enabled = False
+
+    def record(self, name: str, start: float, end: float, **attrs) -> None:
+        """Receive a finished span.
+
+        :param str name: the name of the stage, e.g. 'SENT', or of the call, e.g. 'send_data'
+        :param float start: the time.monotonic() at the start of the span
+        :param float end: the time.monotonic() at the end of the span
+        :param attrs: the attributes of the span, 'id' and 'nonce' of the transfer if any
+        """
+        pass
+
+    def span(self, name: str, **attrs) -> 'Span':
+        """Context manager recording the duration of its block as a span
+        """
+        return _NOOP_SPAN if not self.enabled else Span(self, name, attrs)
+
+    def watch(self, name: str, future, **attrs):
+        """Record a span from now until the future is done.
+
+        :returns: the future
+        """
+        if self.enabled:
+            start = time.monotonic()
+            future.add_done_callback(lambda _: self.record(name, start, time.monotonic(), **attrs))
+        return future
+
+    def close(self) -> None:
+        """Release the resources of the tracer, if any
+        """
+        pass
+
+
+class Span(object):
+    """Span of a tracer, recorded when the with block exits
+    """
+
+    __slots__ = ('tracer', 'name', 'attrs', 'start')
+
+    def __init__(self, tracer: Tracer, name: str, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.start, time.monotonic(), **self.attrs)
+        return False
+
+
+class _NoopSpan(object):
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class ChromeTraceExporter(Tracer):
+    """Keeps the latest spans in memory and writes them in the Chrome trace-event JSON format,
+    which can be opened in chrome://tracing or https://ui.perfetto.dev.
+
+    The spans of each transfer are shown on their own track, named after its id; the other spans,
+    e.g. the reads of the Initiator, are shown on one track per process.
+    """
+
+    enabled = True
+
+    def __init__(self, path: str, max_spans: int = 100000, process: str = 'interledger'):
+        """
+        :param str path: the file written by flush()
+        :param int max_spans: the number of spans kept, older spans are dropped
+        :param str process: the name of the process in the trace, e.g. the name of the bridge
+        """
+        if max_spans <= 0:
+            raise ValueError("Invalid span count")
+        self.path = path
+        self.process = process
+        self.spans = deque(maxlen=max_spans)
+
+    def record(self, name: str, start: float, end: float, **attrs) -> None:
+        self.spans.append((name, start, end, attrs))
+
+    def events(self) -> list:
+        """The spans kept, as trace events
+        """
+        pid = os.getpid()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': self.process}}]
+        for name, start, end, attrs in self.spans:
+            args = {key: str(value) for key, value in attrs.items()}
+            if 'id' in attrs:
+                # async events of the same id share a track
+                event = {'name': name, 'cat': 'transfer', 'pid': pid, 'tid': 0, 'id': args['id'], 'args': args}
+                events.append(dict(event, ph='b', ts=start * 1e6))
+                events.append(dict(event, ph='e', ts=end * 1e6))
+            else:
+                events.append({'name': name, 'cat': 'call', 'ph': 'X', 'pid': pid, 'tid': 0,
+                               'ts': start * 1e6, 'dur': (end - start) * 1e6, 'args': args})
+        return events
+
+    def flush(self) -> None:
+        """Write the spans kept to the file, replacing it
+        """
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'traceEvents': self.events(), 'displayTimeUnit': 'ms'}, f)
+        os.replace(tmp, self.path)
+
+    def close(self) -> None:
+        self.flush()
@@ -1,3 +1,4 @@
+from collections.abc import MutableMapping
 from enum import Enum
 
 
@@ -13,31 +14,197 @@ class TransferStatus(Enum):
     FINALIZED = 7
 
 
+class _Missing:
+    """Value of the slots of a TransferResult whose key is absent, so that an explicit None is kept.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return '<missing>'
+
+    def __reduce__(self):
+        # copies and pickles of the sentinel are the sentinel itself
+        return '_MISSING'
+
+
+_MISSING = _Missing()
+
+
+class _SlotMapping(MutableMapping):
+    """Dict-like access to the attributes of a slotted object: the keys listed in _fields are stored
+    in slots, and _unset means the key is absent. Any other key is stored in the lazily created _extra dict.
+    """
+
+    __slots__ = ()
+    _fields = frozenset()
+    _unset = _MISSING
+
+    def _owner(self):
+        return self
+
+    def __getitem__(self, key):
+        owner = self._owner()
+        if key in self._fields:
+            value = getattr(owner, key)
+            if value is self._unset:
+                raise KeyError(key)
+            return value
+        if owner._extra is None:
+            raise KeyError(key)
+        return owner._extra[key]
+
+    def __setitem__(self, key, value):
+        owner = self._owner()
+        if key in self._fields:
+            setattr(owner, key, value)
+        else:
+            if owner._extra is None:
+                owner._extra = {}
+            owner._extra[key] = value
+
+    def __delitem__(self, key):
+        owner = self._owner()
+        if key in self._fields:
+            if getattr(owner, key) is self._unset:
+                raise KeyError(key)
+            setattr(owner, key, self._unset)
+        else:
+            if owner._extra is None:
+                raise KeyError(key)
+            del owner._extra[key]
+
+    def __iter__(self):
+        owner = self._owner()
+        for key in self._order:
+            if getattr(owner, key) is not self._unset:
+                yield key
+        if owner._extra:
+            yield from owner._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def _assign(self, mapping):
+        mapping = dict(mapping)  # mapping may be a view of the same owner
+        owner = self._owner()
+        for key in self._order:
+            setattr(owner, key, self._unset)
+        owner._extra = None
+        self.update(mapping)
+
+
+class TransferResult(_SlotMapping):
+    """Compact result of a data transfer: the outcome of accept() and of the commit / abort calls.
+    It behaves like the result dict returned by the adapters.
+    """
+
+    _order = ('status', 'tx_hash', 'error_code', 'message',
+              'commit_status', 'commit_tx_hash', 'commit_error_code', 'commit_message',
+              'abort_status', 'abort_tx_hash', 'abort_error_code', 'abort_message')
+    _fields = frozenset(_order)
+    __slots__ = _order + ('_extra',)
+
+    def __init__(self, result=()):
+        """
+        :param dict result: the initial result fields
+        """
+        for key in self._order:
+            setattr(self, key, _MISSING)
+        self._extra = None
+        self.update(result)
+
+
+class TransferPayload(_SlotMapping):
+    """Write-through view of the {id, nonce, data} bundle of a Transfer, stored in the slots of the transfer.
+    """
+
+    _order = ('id', 'nonce', 'data')
+    _fields = frozenset(_order)
+    # the slots are the public attributes of the Transfer, None until they are set
+    _unset = None
+    __slots__ = ('_transfer',)
+
+    def __init__(self, transfer):
+        self._transfer = transfer
+
+    def _owner(self):
+        return self._transfer
+
+
 class Transfer(object):
     """The information paired to a data transfer: its 'future' async call to accept(); the 'result' of the accept();
     the transfer 'state'; the event transfer 'data'.
+
+    The transactional bundle {id, nonce, data} is stored in typed slots, and 'payload' is a dict-like view of them.
     """
 
+    id: str
+    nonce: str
+    data: bytes
+    status: TransferStatus
+
+    __slots__ = ('status', 'id', 'nonce', 'data', '_extra',
+                 'send_accepted', 'send_task', 'confirm_accepted', 'confirm_task', '_result', 'status_time')
+
     def __init__(self):
         self.status = TransferStatus.READY
-        self.payload = None  # transactional bundle, {id, nonce, data}
+        self.id = None
+        self.nonce = None
+        self.data = None
+        self._extra = None  # payload keys other than id, nonce and data
         # denote whether the send task has been accepted by an IL Node
         self.send_accepted = False
         self.send_task = None
         # denote whether the confirm task has been accepted by an IL Node
         self.confirm_accepted = False
         self.confirm_task = None
-        self.result = {}
+        self._result = None
+        # monotonic time of the last status change, only kept when metrics are recorded
+        self.status_time = None
+
+    @property
+    def payload(self) -> TransferPayload:
+        """Transactional bundle, {id, nonce, data}
+        """
+        return TransferPayload(self)
+
+    @payload.setter
+    def payload(self, payload: dict):
+        TransferPayload(self)._assign(payload or ())
+
+    @property
+    def result(self):
+        """Result of the accept(), completed with the result of the commit / abort calls
+        """
+        if self._result is None:
+            self._result = TransferResult()
+        return self._result
+
+    @result.setter
+    def result(self, result):
+        # results that are not dicts are kept as they are
+        if isinstance(result, dict):
+            result = TransferResult(result)
+        self._result = result
 
 
 class TransferToMulti(Transfer):
     """The information of a data transfer, that is aimed to for multi-ledger targets
     """
 
+    __slots__ = ('inquiry_tasks', 'inquiry_results', 'inquiry_decision', 'inquiry_quorum',
+                 'send_tasks', 'results', 'send_quorum')
+
     def __init__(self):
         super().__init__()
         self.inquiry_tasks = None
         self.inquiry_results = None
         self.inquiry_decision = None
+        self.inquiry_quorum = None
         self.send_tasks = None
         self.results = None
+        self.send_quorum = None
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+
+from .adapter.interfaces import ErrorCode
+from .transfer import TransferStatus
+
+
+class WriteAheadLog(object):
+    """Append-only log of the TransferStatus transitions of an Interledger instance, one JSON record per line,
+    from which the transfers in flight are rebuilt after a crash.
+
+    The records are group-committed: they are buffered and written with a single fsync when group_size records
+    have accumulated or group_window seconds after the first buffered one, so the cost of the fsync is shared
+    by all the transfers of the group.
+
+    The log is compacted every compact_every finalized transfers, so that it only grows with the transfers in flight.
+    """
+
+    def __init__(self, path: str, group_size: int = 256, group_window: float = 0.005, compact_every: int = 10000):
+        """
+        :param str path: the log file
+        :param int group_size: the buffered records are written once there are this number of them
+        :param float group_window: the buffered records are written at most this number of seconds after the first one
+        :param int compact_every: the log is compacted once this number of transfers have been finalized since
+            the last compaction
+        """
+        if group_size <= 0:
+            raise ValueError("Invalid group size")
+        if group_window < 0:
+            raise ValueError("Invalid group window")
+        if compact_every <= 0:
+            raise ValueError("Invalid compaction interval")
+        self.path = path
+        self.group_size = group_size
+        self.group_window = group_window
+        self.buffer = []
+        self.timer = None
+        self.file = open(path, 'a')
+        self.syncs = 0  # number of group commits
+        self.compact_every = compact_every
+        self.finalized = 0  # number of FINALIZED records written since the last compaction
+
+    def append(self, record: dict) -> None:
+        """Add a record to the current group.
+
+        :param dict record: {
+            'nonce': str,
+            'status': str,  # the TransferStatus name, or 'SUBMITTED' when a transaction has been sent
+            ... the fields of the transition, see Interledger
+        }
+        """
+        self.buffer.append(json.dumps(record, default=_encode))
+        if record.get('status') == TransferStatus.FINALIZED.name:
+            self.finalized += 1
+        if len(self.buffer) >= self.group_size:
+            self.flush()
+        elif self.timer is None:
+            try:
+                self.timer = asyncio.get_event_loop().call_later(self.group_window, self.flush)
+            except RuntimeError:
+                # no event loop, the group is written by the next flush()
+                pass
+
+    def flush(self) -> None:
+        """Write and sync the current group
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.buffer:
+            return
+        self.file.write('\n'.join(self.buffer) + '\n')
+        self.buffer = []
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.syncs += 1
+        if self.finalized >= self.compact_every:
+            self.compact(self.read())
+
+    def read(self) -> dict:
+        """Replay the log.
+
+        :returns: the state of each transfer, nonce -> the fields of its records merged in order,
+            without the FINALIZED transfers
+        :rtype: dict
+        """
+        self.flush()
+        transfers = {}
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # torn write of the last group
+                    break
+                if not isinstance(record, dict) or 'nonce' not in record or 'status' not in record:
+                    print("WARNING: skipped malformed write-ahead log record:", line.strip())
+                    continue
+                nonce = record.pop('nonce')
+                if record['status'] == TransferStatus.FINALIZED.name:
+                    transfers.pop(nonce, None)
+                    continue
+                state = transfers.setdefault(nonce, {})
+                if record['status'] == 'SUBMITTED':
+                    del record['status']
+                state.update(record)
+        return transfers
+
+    def compact(self, transfers: dict) -> None:
+        """Replace the log with one record per transfer still in flight, as returned by read()
+        """
+        self.flush()
+        self.file.close()
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            for nonce, state in transfers.items():
+                f.write(json.dumps(dict(state, nonce=nonce), default=_encode) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.file = open(self.path, 'a')
+        self.finalized = 0
+
+    def close(self) -> None:
+        """Write the current group and close the log
+        """
+        self.flush()
+        if not self.file.closed:
+            self.file.close()
+
+
+def decode_result(result: dict) -> dict:
+    """Restore the error codes of a result read from the log
+    """
+    result = dict(result)
+    for key, value in result.items():
+        if key.endswith('error_code') and isinstance(value, str):
+            result[key] = ErrorCode[value]
+    return result
+
+
+def _encode(value):
+    """Encode the values that JSON does not support natively
+    """
+    if isinstance(value, ErrorCode):
+        return value.name
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    return repr(value)
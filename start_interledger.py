@@ -4,9 +4,15 @@ from configparser import ConfigParser
 import json
 
 from src.interledger.interledger import Interledger
+from src.interledger.sinks import MemorySink, JsonlSink
+from src.interledger.checkpoint import FileCheckpointStore, SqliteCheckpointStore
+from src.interledger.wal import WriteAheadLog
+from src.interledger.metrics import Metrics
+from src.interledger.tracing import ChromeTraceExporter
 from src.interledger.adapter.ethereum import EthereumInitiator, EthereumResponder, EthereumMultiResponder
 from src.interledger.adapter.ksi import KSIResponder
 from src.interledger.adapter.fabric import FabricInitiator, FabricResponder
+from src.interledger.adapter.fabric_events import ChannelEventStream
 
 
 # Helper function to read Ethereum related options from configuration file
@@ -53,6 +59,34 @@ def parse_ethereum(parser, section):
 
     return (minter, contract_address, contract_abi, url, port, private_key, password, poa)
 
+# Helper function to read the optional Ethereum adapter settings, passed as keyword arguments
+# The event scanning settings only apply to the Initiator
+def parse_ethereum_options(parser, section, initiator=False):
+    options = {}
+
+    try:
+        options['async_rpc'] = parser.get(section, 'async_rpc') in ('true', 'True')
+    except:
+        pass
+
+    if initiator:
+        try:
+            options['log_chunk_size'] = int(parser.get(section, 'log_chunk_size'))
+        except:
+            pass
+
+        try:
+            options['log_parallel'] = int(parser.get(section, 'log_parallel'))
+        except:
+            pass
+
+        try:
+            options['subscribe'] = parser.get(section, 'subscribe') in ('true', 'True')
+        except:
+            pass
+
+    return options
+
 # Helper function to read KSI related options from configuration file
 def parse_ksi(parser, section):
     net_type = parser.get(section, 'type')
@@ -99,9 +133,101 @@ def parse_fabric(parser, section):
 
     return (net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name)
 
+# Helper function to read the optional HyperLedger Fabric adapter settings, passed as keyword arguments
+# The event delivery settings only apply to the Initiator
+def parse_fabric_options(parser, section, initiator=False):
+    options = {}
+
+    try:
+        options['endorsements'] = int(parser.get(section, 'endorsements'))
+    except:
+        pass
+
+    if initiator:
+        try:
+            options['filtered'] = parser.get(section, 'filtered') in ('true', 'True')
+        except:
+            pass
+
+    return options
+
+# Helper function to create the write-ahead log of the Interledger instance whose Initiator is name,
+# each instance has its own log file
+def parse_wal_option(parser, name):
+    path = parser.get('service', 'wal_file', fallback=None)
+    if path is None:
+        return None
+    return WriteAheadLog(f"{path}.{name}",
+                         int(parser.get('service', 'wal_group_size', fallback=256)),
+                         float(parser.get('service', 'wal_group_window', fallback=0.005)),
+                         int(parser.get('service', 'wal_compact_every', fallback=10000)))
+
+# Helper function to read the optional Interledger scheduling options from the [service] section
+def parse_service_options(parser):
+    options = {}
+
+    try:
+        options['pipeline'] = parser.get('service', 'pipeline') in ('true', 'True')
+    except:
+        pass
+
+    try:
+        options['queue_size'] = int(parser.get('service', 'queue_size'))
+    except:
+        pass
+
+    try:
+        options['max_in_flight'] = int(parser.get('service', 'max_in_flight'))
+    except:
+        pass
+
+    try:
+        options['batch_size'] = int(parser.get('service', 'batch_size'))
+    except:
+        pass
+
+    try:
+        options['batch_window'] = float(parser.get('service', 'batch_window'))
+    except:
+        pass
+
+    # the checkpoint store is shared by the Interledger instances, each Initiator has its own entry
+    checkpoint_type = parser.get('service', 'checkpoint', fallback=None)
+    flush = {'flush_every': int(parser.get('service', 'checkpoint_flush_every', fallback=100)),
+             'flush_interval': float(parser.get('service', 'checkpoint_flush_interval', fallback=1))}
+    if checkpoint_type == 'file':
+        options['checkpoint'] = FileCheckpointStore(parser.get('service', 'checkpoint_file'), **flush)
+    elif checkpoint_type == 'sqlite':
+        options['checkpoint'] = SqliteCheckpointStore(parser.get('service', 'checkpoint_file'), **flush)
+    elif checkpoint_type is not None:
+        print(f"ERROR: checkpoint {checkpoint_type} not supported")
+        exit(1)
+
+    # the result sink is shared by the Interledger instances
+    sink_type = parser.get('service', 'result_sink', fallback=None)
+    if sink_type == 'memory':
+        options['result_sink'] = MemorySink(int(parser.get('service', 'result_buffer_size', fallback=1000)))
+    elif sink_type == 'jsonl':
+        options['result_sink'] = JsonlSink(parser.get('service', 'result_file'))
+    elif sink_type is not None:
+        print(f"ERROR: result sink {sink_type} not supported")
+        exit(1)
+
+    # the metrics are shared by the Interledger instances, labelled with the name of their Initiator ledger,
+    # and by the adapters, which record the latency of their requests to the ledgers
+    if parser.get('service', 'metrics_port', fallback=None) is not None:
+        options['metrics'] = Metrics()
+
+    # the spans of the Interledger instances are written to a Chrome trace file on shutdown
+    trace_file = parser.get('service', 'trace_file', fallback=None)
+    if trace_file is not None:
+        options['tracer'] = ChromeTraceExporter(trace_file, int(parser.get('service', 'trace_max_spans', fallback=100000)))
+
+    return options
+
 # Helper function to build a left to right interledger
 # Note: KSI is only supported as destination ledger
-def left_to_right_bridge(parser, left, right):
+def left_to_right_bridge(parser, left, right, metrics=None):
 
     initiator = None
     responder = None
@@ -112,12 +238,14 @@ def left_to_right_bridge(parser, left, right):
     if ledger_left == "ethereum":
         (minter, contract_address, contract_abi, url, port, private_key, password, poa) = parse_ethereum(parser, left)
         # Create Initiator
-        initiator = EthereumInitiator(minter, contract_address, contract_abi, url, port, private_key, password, poa)
+        initiator = EthereumInitiator(minter, contract_address, contract_abi, url, port, private_key, password, poa,
+                                      metrics=metrics, **parse_ethereum_options(parser, left, initiator=True))
 
     elif ledger_left == "fabric":
         (net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name) = parse_fabric(parser, left)
         # Create Initiator
-        initiator = FabricInitiator(net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name)
+        initiator = FabricInitiator(net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name,
+                                    metrics=metrics, **parse_fabric_options(parser, left, initiator=True))
 
     else:
         print(f"ERROR: ledger type {ledger_left} not supported yet")
@@ -127,7 +255,8 @@ def left_to_right_bridge(parser, left, right):
     if ledger_right == "ethereum":
         (minter, contract_address, contract_abi, url, port, private_key, password, poa) = parse_ethereum(parser, right)
         # Create Responder
-        responder = EthereumResponder(minter, contract_address, contract_abi, url, port, private_key, password, poa)
+        responder = EthereumResponder(minter, contract_address, contract_abi, url, port, private_key, password, poa,
+                                      metrics=metrics, **parse_ethereum_options(parser, right))
         
     elif ledger_right == "ksi":
         (url, hash_algorithm, username, password) = parse_ksi(parser, right)
@@ -137,7 +266,8 @@ def left_to_right_bridge(parser, left, right):
     elif ledger_right == "fabric":
         (net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name) = parse_fabric(parser, left)
         # Create Responder
-        responder = FabricResponder(net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name)
+        responder = FabricResponder(net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name,
+                                    metrics=metrics, **parse_fabric_options(parser, right))
 
     else:
         print(f"ERROR: ledger type {ledger_right} not supported yet")
@@ -148,7 +278,7 @@ def left_to_right_bridge(parser, left, right):
 
 # Helper function to build a right to left interledger
 # Note: KSI is only supported as destination ledger
-def right_to_left_bridge(parser, left, right):
+def right_to_left_bridge(parser, left, right, metrics=None):
 
     initiator = None
     responder = None
@@ -159,12 +289,14 @@ def right_to_left_bridge(parser, left, right):
     if ledger_right == "ethereum":
         (minter, contract_address, contract_abi, url, port, private_key, password, poa) = parse_ethereum(parser, right)
         # Create Initiator
-        initiator = EthereumInitiator(minter, contract_address, contract_abi, url, port, private_key, password, poa)
+        initiator = EthereumInitiator(minter, contract_address, contract_abi, url, port, private_key, password, poa,
+                                      metrics=metrics, **parse_ethereum_options(parser, right, initiator=True))
 
     elif ledger_right == "fabric":
         (net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name) = parse_fabric(parser, left)
         # Create Initiator
-        initiator = FabricInitiator(net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name)
+        initiator = FabricInitiator(net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name,
+                                    metrics=metrics, **parse_fabric_options(parser, right, initiator=True))
 
     else :
         print(f"ERROR: ledger type {ledger_right} not supported yet")
@@ -174,7 +306,8 @@ def right_to_left_bridge(parser, left, right):
     if ledger_left == "ethereum":
         (minter, contract_address, contract_abi, url, port, private_key, password, poa) = parse_ethereum(parser, left)
         # Create Responder
-        responder = EthereumResponder(minter, contract_address, contract_abi, url, port, private_key, password, poa)
+        responder = EthereumResponder(minter, contract_address, contract_abi, url, port, private_key, password, poa,
+                                      metrics=metrics, **parse_ethereum_options(parser, left))
         
     elif ledger_left == "ksi":
         (url, hash_algorithm, username, password) = parse_ksi(parser, left)
@@ -183,7 +316,8 @@ def right_to_left_bridge(parser, left, right):
     elif ledger_left == "fabric":
         (net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name) = parse_fabric(parser, left)
         # Create Responder
-        responder = FabricResponder(net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name)
+        responder = FabricResponder(net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name,
+                                    metrics=metrics, **parse_fabric_options(parser, left))
 
     else :
         print(f"ERROR: ledger type {ledger_left} not supported yet")
@@ -192,7 +326,7 @@ def right_to_left_bridge(parser, left, right):
     return (initiator, responder)
 
 
-def multi_bridge(parser, left, rights):
+def multi_bridge(parser, left, rights, metrics=None):
     initiator = None
     responders = []
 
@@ -202,12 +336,14 @@ def multi_bridge(parser, left, rights):
     if ledger_left == "ethereum":
         (minter, contract_address, contract_abi, url, port, private_key, password, poa) = parse_ethereum(parser, left)
         # Create Initiator
-        initiator = EthereumInitiator(minter, contract_address, contract_abi, url, port, private_key, password, poa)
+        initiator = EthereumInitiator(minter, contract_address, contract_abi, url, port, private_key, password, poa,
+                                      metrics=metrics, **parse_ethereum_options(parser, left, initiator=True))
 
     elif ledger_left == "fabric":
         (net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name) = parse_fabric(parser, left)
         # Create Initiator
-        initiator = FabricInitiator(net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name)
+        initiator = FabricInitiator(net_profile, channel_name, cc_name, cc_version, org_name, user_name, peer_name,
+                                    metrics=metrics, **parse_fabric_options(parser, left, initiator=True))
 
     else:
         print(f"ERROR: ledger type {ledger_left} not supported yet")
@@ -221,7 +357,8 @@ def multi_bridge(parser, left, rights):
         if ledger_right == "ethereum":
             (minter, contract_address, contract_abi, url, port, private_key, password, poa) = parse_ethereum(parser, right)
             # Create Responder
-            responder = EthereumMultiResponder(minter, contract_address, contract_abi, url, port, private_key, password, poa)
+            responder = EthereumMultiResponder(minter, contract_address, contract_abi, url, port, private_key, password, poa,
+                                               metrics=metrics, **parse_ethereum_options(parser, right))
             
         elif ledger_right == "ksi":
             # (url, hash_algorithm, username, password) = parse_ksi(parser, right)
@@ -255,22 +392,27 @@ def main():
     left = parser.get('service', 'left')
     right = rights = parser.get('service', 'right')
     print(f"rights: {rights} of type: {type(rights)}")
+    options = parse_service_options(parser)
 
     # Build interledger bridge(s)
     interledger_left_to_right = None
     interledger_right_to_left = None
 
     if direction == "left-to-right":
-        (initiator, responder) = left_to_right_bridge(parser, left, right)
-        interledger_left_to_right = Interledger(initiator, responder)
+        (initiator, responder) = left_to_right_bridge(parser, left, right, options.get('metrics'))
+        interledger_left_to_right = Interledger(initiator, responder, checkpoint_name=left,
+                                                wal=parse_wal_option(parser, left), **options)
     elif direction == "right-to-left":
-        (initiator, responder) = right_to_left_bridge(parser, left, right)
-        interledger_right_to_left = Interledger(initiator, responder)
+        (initiator, responder) = right_to_left_bridge(parser, left, right, options.get('metrics'))
+        interledger_right_to_left = Interledger(initiator, responder, checkpoint_name=right,
+                                                wal=parse_wal_option(parser, right), **options)
     elif direction == "both":
-        (initiator_lr, responder_lr) = left_to_right_bridge(parser, left, right)
-        (initiator_rl, responder_rl) = right_to_left_bridge(parser, left, right)
-        interledger_left_to_right = Interledger(initiator_lr, responder_lr)
-        interledger_right_to_left = Interledger(initiator_rl, responder_rl)
+        (initiator_lr, responder_lr) = left_to_right_bridge(parser, left, right, options.get('metrics'))
+        (initiator_rl, responder_rl) = right_to_left_bridge(parser, left, right, options.get('metrics'))
+        interledger_left_to_right = Interledger(initiator_lr, responder_lr, checkpoint_name=left,
+                                                wal=parse_wal_option(parser, left), **options)
+        interledger_right_to_left = Interledger(initiator_rl, responder_rl, checkpoint_name=right,
+                                                wal=parse_wal_option(parser, right), **options)
     elif direction == "multi":
         rights = rights.split(',')
         try:
@@ -280,14 +422,28 @@ def main():
             exit(1)
         except Exception:
             threshold = len(rights)
-        (initiator, responders) = multi_bridge(parser, left, rights)
+        # one deadline for all the responders, or one per responder
+        responder_timeout = parser.get('service', 'responder_timeout', fallback=None)
+        if responder_timeout is not None:
+            timeouts = [float(timeout) for timeout in responder_timeout.split(',')]
+            responder_timeout = timeouts[0] if len(timeouts) == 1 else timeouts
+        (initiator, responders) = multi_bridge(parser, left, rights, options.get('metrics'))
         multi_mode = True
-        interledger_left_to_right = Interledger(initiator, responders, multi_mode, threshold)
+        interledger_left_to_right = Interledger(initiator, responders, multi_mode, threshold,
+                                                checkpoint_name=left, responder_timeout=responder_timeout,
+                                                **options)
     else:
         print("ERROR: supported 'direction' values are 'left-to-right', 'right-to-left' or 'both'")
         print("Check your configuration file")
         exit(1)
 
+    # Serve the metrics
+    if 'metrics' in options:
+        host = parser.get('service', 'metrics_host', fallback='127.0.0.1')
+        port = int(parser.get('service', 'metrics_port'))
+        asyncio.get_event_loop().run_until_complete(options['metrics'].serve(host, port))
+        print(f"Serving the metrics on http://{host}:{port}/metrics")
+
     # Init Interledger(s)
     task = None
 
@@ -325,6 +481,22 @@ if __name__ == "__main__":
             interledger2.stop()
 
         loop.run_until_complete(task)
+        # the event streams of the Fabric channels
+        loop.run_until_complete(ChannelEventStream.close_all())
+        metrics = (interledger1 or interledger2).metrics
+        if metrics is not None:
+            loop.run_until_complete(metrics.close())
         loop.close()
 
+        # the result sink is shared, close it once
+        interledger = interledger1 or interledger2
+        if interledger.result_sink is not None:
+            interledger.result_sink.close()
+        if interledger.checkpoint is not None:
+            interledger.checkpoint.close()
+        interledger.tracer.close()
+        for interledger in (interledger1, interledger2):
+            if interledger and interledger.wal is not None:
+                interledger.wal.close()
+
         print("-- Finished correctly --")
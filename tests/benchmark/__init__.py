@@ -0,0 +1,6 @@
+import sys, os
+
+# allow running the benchmarks as modules from the repository root, e.g.
+#   python -m tests.benchmark.bench_registry
+sys.path.append(os.path.realpath('.'))
+sys.path.append(os.path.realpath('./src'))
@@ -0,0 +1,139 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from interledger.interledger import Interledger
+from interledger.adapter.ethereum import EthereumInitiator, EthereumResponder, EthereumMultiResponder
+from interledger.transfer import TransferToMulti
+from tests.integration.evm import TesterLedger
+from tests.integration.utils import MockInitiator
+
+# Gas per transfer and throughput of the Ethereum adapters against in-process chains (tester:// urls),
+# with the contracts of solidity/contracts, so that the runs are reproducible and need no node.
+# Requires eth-tester with the py-evm backend, and py-solc-x if the contracts are not compiled by truffle.
+
+CONFIGS = ['single', 'bidirectional', 'multi', 'game_token']
+MULTI_RESPONDERS = 3
+
+
+class Run(object):
+    """The chains, the Interledger instances and the emission of the transfers of a configuration
+    """
+
+    def __init__(self, config: str, count: int, pipeline: bool):
+        self.count = count
+        self.ledgers = []
+        self.interledgers = []
+        self.emit = []      # functions emitting the i-th transfer
+        getattr(self, '_' + config)(pipeline)
+
+    def _ledger(self, name: str) -> TesterLedger:
+        ledger = TesterLedger(f"bench-{name}")
+        self.ledgers.append(ledger)
+        return ledger
+
+    def _single(self, pipeline: bool):
+        left, right = self._ledger('single-left'), self._ledger('single-right')
+        sender, receiver = left.deploy('DataSender'), right.deploy('DataReceiver')
+        self.interledgers.append(Interledger(EthereumInitiator(*left.adapter_args(sender)),
+                                             EthereumResponder(*right.adapter_args(receiver)), pipeline=pipeline))
+        self.emit.append(lambda i: sender.functions.emitData(b"benchmark").transact({'from': left.minter}))
+
+    def _bidirectional(self, pipeline: bool):
+        left, right = self._ledger('bidirectional-left'), self._ledger('bidirectional-right')
+        contracts = left.deploy('DataTransceiver'), right.deploy('DataTransceiver')
+        for (a, ca), (b, cb) in [((left, contracts[0]), (right, contracts[1])),
+                                 ((right, contracts[1]), (left, contracts[0]))]:
+            self.interledgers.append(Interledger(EthereumInitiator(*a.adapter_args(ca)),
+                                                 EthereumResponder(*b.adapter_args(cb)), pipeline=pipeline))
+            self.emit.append(lambda i, a=a, ca=ca: ca.functions.emitData(b"benchmark").transact({'from': a.minter}))
+
+    def _multi(self, pipeline: bool):
+        # the transfers of the multi-ledger mode come from a mock Initiator, see test_ethereum_tester
+        responders = []
+        for i in range(MULTI_RESPONDERS):
+            ledger = self._ledger(f'multi-right-{i}')
+            responders.append(EthereumMultiResponder(*ledger.adapter_args(ledger.deploy('DataMultiReceiver'))))
+        init = MockInitiator([])
+        self.interledgers.append(Interledger(init, responders, multi=True, threshold=2, pipeline=pipeline))
+
+        def emit(i):
+            t = TransferToMulti()
+            t.payload = {'id': str(i + 1), 'data': b"benchmark"}
+            init.events.append(t)
+        self.emit.append(emit)
+
+    def _game_token(self, pipeline: bool):
+        left, right = self._ledger('game-left'), self._ledger('game-right')
+        tokens = left.deploy('GameToken', "GameToken", "GAME"), right.deploy('GameToken', "GameToken", "GAME")
+        for ledger, token in zip((left, right), tokens):
+            for i in range(1, self.count + 1):
+                token.functions.mint(ledger.minter, i, f"token{i}", ledger.web3.toBytes(text=f"asset{i}")) \
+                    .transact({'from': ledger.minter})
+        for i in range(1, self.count + 1):
+            tokens[0].functions.accept(i).transact({'from': left.minter})
+        self.interledgers.append(Interledger(EthereumInitiator(*left.adapter_args(tokens[0])),
+                                             EthereumResponder(*right.adapter_args(tokens[1])), pipeline=pipeline))
+        self.emit.append(lambda i: tokens[0].functions.transferOut(i + 1).transact({'from': left.minter}))
+
+    @property
+    def finalized(self) -> int:
+        return sum(len(i.results_commit) + len(i.results_abort) for i in self.interledgers)
+
+
+async def measure(config: str, count: int, pipeline: bool, timeout: float) -> dict:
+    run = Run(config, count, pipeline)
+    total = count * len(run.emit)
+    emitted_at = [ledger.web3.eth.blockNumber for ledger in run.ledgers]
+    for i in range(count):
+        for emit in run.emit:
+            emit(i)
+    first_blocks = [ledger.web3.eth.blockNumber for ledger in run.ledgers]
+
+    start, cpu = time.monotonic(), time.process_time()
+    tasks = [asyncio.ensure_future(i.run()) for i in run.interledgers]
+    deadline = start + timeout
+    while run.finalized < total and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    elapsed, cpu = time.monotonic() - start, time.process_time() - cpu
+    for interledger in run.interledgers:
+        interledger.stop()
+    await asyncio.gather(*tasks)
+
+    emit_gas = sum(ledger.gas_used(first) - ledger.gas_used(last)
+                   for ledger, first, last in zip(run.ledgers, emitted_at, first_blocks))
+    bridge_gas = sum(ledger.gas_used(first) for ledger, first in zip(run.ledgers, first_blocks))
+    finalized = run.finalized
+    return {
+        "config": config,
+        "pipeline": pipeline,
+        "transfers": total,
+        "finalized": finalized,
+        "committed": sum(len(i.results_commit) for i in run.interledgers),
+        "transfers_per_sec": round(finalized / elapsed, 1),
+        "emit_gas_per_transfer": emit_gas // total,
+        "bridge_gas_per_transfer": bridge_gas // finalized if finalized else None,
+        "cpu_per_transfer_ms": round(cpu / finalized * 1000, 2) if finalized else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Gas and throughput of the Ethereum adapters on in-process chains")
+    parser.add_argument('--config', action='append', choices=CONFIGS,
+                        help="configuration to run, all of them by default; can be repeated")
+    parser.add_argument('--transfers', type=int, default=50, help="number of transfers per direction")
+    parser.add_argument('--pipeline', action='store_true', help="run the Interledger instances in pipeline mode")
+    parser.add_argument('--timeout', type=float, default=300, help="seconds before a configuration is given up")
+    args = parser.parse_args(argv)
+
+    loop = asyncio.get_event_loop()
+    report = [loop.run_until_complete(measure(config, args.transfers, args.pipeline, args.timeout))
+              for config in args.config or CONFIGS]
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
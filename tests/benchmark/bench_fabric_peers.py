@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+from interledger.adapter.fabric_peers import PeerSelector
+
+# Throughput of the endorsements of concurrent transactions spread over 1 to 4 simulated peers by the PeerSelector,
+# one endorsement per transaction. Each peer endorses one proposal at a time in SERVICE seconds, so the throughput
+# should scale with the number of peers; in the second run one peer answers in SLOW seconds and should not matter.
+
+TRANSACTIONS = 400
+CONCURRENCY = 64      # transactions being endorsed at the same time
+SERVICE = 0.005       # seconds for a peer to endorse a proposal
+SLOW = 0.5            # seconds for the slow peer to endorse a proposal
+PEERS = [1, 2, 4]
+
+
+class Peer:
+    def __init__(self, service: float):
+        self.service = service
+        self.lock = asyncio.Lock()
+        self.endorsed = 0
+
+    async def endorse(self):
+        async with self.lock:
+            await asyncio.sleep(self.service)
+            self.endorsed += 1
+            return True
+
+
+async def measure(peers: int, slow: bool) -> dict:
+    nodes = [Peer(SERVICE) for _ in range(peers)]
+    if slow and peers > 1:
+        nodes[0].service = SLOW
+    selector = PeerSelector(nodes)
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+
+    async def transaction():
+        async with semaphore:
+            start = loop.time()
+            accepted, _ = await selector.gather(lambda peer: peer.endorse(), 1)
+            latencies.append(loop.time() - start)
+            return accepted
+
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    await asyncio.gather(*[transaction() for _ in range(TRANSACTIONS)])
+    elapsed = loop.time() - start
+    # the endorsements given up on the slow peer
+    for task in asyncio.all_tasks() - {asyncio.current_task()}:
+        task.cancel()
+
+    latencies.sort()
+    return {
+        "peers": peers,
+        "slow_peer": slow and peers > 1,
+        "endorsements_per_sec": round(TRANSACTIONS / elapsed, 1),
+        "latency_p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "latency_p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 1),
+        "endorsed_per_peer": [node.endorsed for node in nodes],
+    }
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    report = []
+    for slow in (False, True):
+        for peers in PEERS:
+            if slow and peers == 1:
+                continue
+            report.append(loop.run_until_complete(measure(peers, slow)))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
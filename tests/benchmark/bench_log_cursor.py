@@ -0,0 +1,53 @@
+import asyncio
+import json
+import time
+
+from interledger.adapter.log_cursor import LogCursor
+
+# Wall time to catch up a backlog of blocks after a downtime, reading the logs with
+# eth_getLogs requests of log_chunk_size blocks, log_parallel of them at a time.
+# The stand-in node answers each request after a fixed latency plus a cost per block scanned.
+
+BACKLOG = 100000       # blocks mined while the bridge was down
+EVENT_EVERY = 50       # one InterledgerEventSending() event every this number of blocks
+RPC_LATENCY = 0.05     # seconds per request
+BLOCK_COST = 0.00001   # seconds per block scanned by the node
+CONFIGS = [(2000, 1), (2000, 4), (2000, 16), (10000, 4)]   # (log_chunk_size, log_parallel)
+
+
+async def get_logs(start, end):
+    await asyncio.sleep(RPC_LATENCY + (end - start + 1) * BLOCK_COST)
+    first = -(-start // EVENT_EVERY) * EVENT_EVERY
+    return list(range(first, end + 1, EVENT_EVERY))
+
+
+async def measure(chunk_size, parallel):
+    cursor = LogCursor(0, chunk_size, parallel)
+    events = 0
+    scans = 0
+    start = time.perf_counter()
+    while cursor.last_block < BACKLOG:
+        events += len(await cursor.scan(BACKLOG, get_logs))
+        scans += 1
+    elapsed = time.perf_counter() - start
+    assert events == BACKLOG // EVENT_EVERY
+    return elapsed, scans
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    report = []
+    for chunk_size, parallel in CONFIGS:
+        elapsed, scans = loop.run_until_complete(measure(chunk_size, parallel))
+        report.append({
+            "backlog_blocks": BACKLOG,
+            "log_chunk_size": chunk_size,
+            "log_parallel": parallel,
+            "scans": scans,
+            "catch_up_s": round(elapsed, 2),
+        })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
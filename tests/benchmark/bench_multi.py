@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+from interledger.interledger import Interledger
+from tests.benchmark.simulated import SimulatedLedger, SimulatedInitiator, SimulatedMultiResponder
+
+# Throughput and latency of the multi-ledger mode with 3 to 7 responders, k-out-of-N with k = N - 1,
+# when all the responders answer after LATENCY seconds and when one of them lags LAG seconds behind.
+# Each transfer is decided by its N - 1 fastest responders, so the lagging one should not slow the bridge down.
+
+TRANSFERS = 500
+RATE = 500            # transfers emitted per second by the Initiator
+LATENCY = 0.02        # seconds for a responder to answer
+LAG = 1.0             # seconds for the lagging responder to answer
+RESPONDERS = [3, 5, 7]
+TIMEOUT = 60
+
+
+async def measure(responders: int, lagging: bool, pipeline: bool) -> dict:
+    initiator = SimulatedInitiator(SimulatedLedger(latency=LATENCY, seed=1), TRANSFERS, RATE, multi=True)
+    ledgers = [SimulatedLedger(latency=LATENCY, seed=2 + i) for i in range(responders)]
+    if lagging:
+        ledgers[-1].latency = LAG
+    interledger = Interledger(initiator, [SimulatedMultiResponder(ledger) for ledger in ledgers],
+                              multi=True, threshold=responders - 1, pipeline=pipeline)
+
+    task = asyncio.ensure_future(interledger.run())
+    deadline = asyncio.get_event_loop().time() + TIMEOUT
+    while not initiator.done and asyncio.get_event_loop().time() < deadline:
+        await asyncio.sleep(0.05)
+    interledger.stop()
+    await task
+    # the sends of the lagging responder still pending after the decisions
+    for t in asyncio.all_tasks() - {asyncio.current_task()}:
+        t.cancel()
+
+    latencies = sorted(initiator.finalized[id] - initiator.emitted[id] for id in initiator.finalized)
+    elapsed = max(initiator.finalized.values()) - initiator.start if latencies else None
+    return {
+        "responders": responders,
+        "threshold": responders - 1,
+        "lagging": lagging,
+        "pipeline": pipeline,
+        "finalized": len(latencies),
+        "transfers_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_p50_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+        "latency_max_ms": round(latencies[-1] * 1000, 1) if latencies else None,
+    }
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    report = []
+    for pipeline in (False, True):
+        for responders in RESPONDERS:
+            for lagging in (False, True):
+                report.append(loop.run_until_complete(measure(responders, lagging, pipeline)))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
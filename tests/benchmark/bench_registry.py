@@ -0,0 +1,68 @@
+import asyncio
+import json
+import time
+from uuid import uuid4
+
+from interledger.interledger import Interledger
+from interledger.transfer import TransferStatus, Transfer
+from tests.integration.utils import MockInitiator, MockResponder
+
+# Per-iteration cost of the Interledger stages while a growing number of
+# transfers is pending, i.e. waiting for a Responder answer that never comes.
+# Each iteration drives a small batch of new transfers from READY to FINALIZED.
+
+PENDING = [10, 100, 1000, 10000, 100000]
+BATCH = 10
+ITERATIONS = 50
+
+
+def make_transfer(id):
+    t = Transfer()
+    t.payload = {'id': str(id), 'nonce': str(uuid4().int), 'data': b"dummy"}
+    return t
+
+
+async def iteration(il, batch):
+    il.transfers.extend(batch)
+    await il.send_transfer()
+    while not all(t.status == TransferStatus.FINALIZED for t in batch):
+        await il.transfer_result()
+        await il.process_result()
+        await il.confirm_transfer()
+    il.cleanup()
+
+
+async def measure(pending):
+    loop = asyncio.get_event_loop()
+    il = Interledger(MockInitiator([]), MockResponder())
+
+    # the backlog of pending transfers
+    backlog = [make_transfer(i) for i in range(pending)]
+    for t in backlog:
+        t.status = TransferStatus.SENT
+        t.send_task = loop.create_future()
+    il.transfers.extend(backlog)
+    il.transfers_sent.extend(backlog)
+
+    elapsed = []
+    for i in range(ITERATIONS):
+        batch = [make_transfer(pending + i * BATCH + j) for j in range(BATCH)]
+        start = time.perf_counter()
+        await iteration(il, batch)
+        elapsed.append(time.perf_counter() - start)
+
+    assert len(il.transfers) == pending
+    elapsed.sort()
+    return {"pending": pending,
+            "iteration_us_p50": round(elapsed[len(elapsed) // 2] * 1e6, 1),
+            "iteration_us_max": round(elapsed[-1] * 1e6, 1)}
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    report = [loop.run_until_complete(measure(pending)) for pending in PENDING]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
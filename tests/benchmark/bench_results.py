@@ -0,0 +1,65 @@
+import asyncio
+import gc
+import json
+import tracemalloc
+
+from interledger.interledger import Interledger
+from interledger.sinks import MemorySink
+from interledger.transfer import Transfer
+from tests.integration.utils import MockInitiator, MockResponder
+
+# Memory retained by an Interledger instance after finalizing a growing number
+# of transfers, when keeping results_commit (default) or streaming the results
+# to a bounded ring buffer sink.
+
+TRANSFERS = [1000, 10000, 50000]
+BURST = 500
+
+
+class BurstInitiator(MockInitiator):
+    """Emits the transfers in bursts, as the ledger events would arrive"""
+
+    def __init__(self, count):
+        super().__init__([])
+        self.remaining = count
+
+    async def listen_for_events(self):
+        burst = min(BURST, self.remaining)
+        self.remaining -= burst
+        result = []
+        for i in range(burst):
+            t = Transfer()
+            t.payload = {'id': str(self.remaining + i), 'data': b"dummy"}
+            result.append(t)
+        return result
+
+
+async def measure(count, sink):
+    il = Interledger(BurstInitiator(count), MockResponder(), pipeline=True, result_sink=sink)
+    gc.collect()
+    tracemalloc.start()
+    task = asyncio.ensure_future(il.run())
+    while len(il.results_commit) + (sink.count if sink else 0) < count:
+        await asyncio.sleep(0.05)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    il.stop()
+    await task
+    return retained
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    report = []
+    for count in TRANSFERS:
+        report.append({
+            "transfers": count,
+            "retained_kb_results_commit": loop.run_until_complete(measure(count, None)) // 1024,
+            "retained_kb_memory_sink": loop.run_until_complete(measure(count, MemorySink(1000))) // 1024,
+        })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import resource
+import sys
+import time
+
+from interledger.interledger import Interledger
+from interledger.dil import DecentralizedInterledger
+from tests.benchmark.simulated import SimulatedLedger, SimulatedInitiator, SimulatedResponder, \
+    SimulatedMultiResponder, SimulatedStateManager
+
+# Throughput and latency of the Interledger modes against simulated ledgers, without any ledger node.
+# Each scenario runs in its own process, so that its CPU time and peak RSS are its own.
+
+SCENARIOS = {
+    # name -> Interledger options, 'scale' being the fraction of the transfers and of the rate of the scenario
+    'polling': {},
+    'pipeline': {'pipeline': True},
+    'pipeline_batch': {'pipeline': True, 'batch_size': 50},
+    'multi': {'multi': True, 'threshold': 2},
+    'multi_pipeline': {'multi': True, 'threshold': 2, 'pipeline': True},
+    # the state layer is updated one transfer at a time
+    'decentralized': {'decentralized': True, 'scale': 0.02},
+}
+MULTI_RESPONDERS = 3
+
+
+def build(options: dict, ledger: dict, count: int, rate: float):
+    options = dict(options)
+    scale = options.pop('scale', 1)
+    count, rate = max(1, int(count * scale)), rate * scale
+    initiator = SimulatedInitiator(SimulatedLedger(seed=1, **ledger), count, rate, multi=options.get('multi', False))
+    if options.pop('decentralized', False):
+        interledger = DecentralizedInterledger(initiator, SimulatedResponder(SimulatedLedger(seed=2, **ledger)),
+                                               SimulatedStateManager(SimulatedLedger(seed=3, **ledger)))
+    elif options.get('multi'):
+        responders = [SimulatedMultiResponder(SimulatedLedger(seed=2 + i, **ledger)) for i in range(MULTI_RESPONDERS)]
+        interledger = Interledger(initiator, responders, **options)
+    else:
+        interledger = Interledger(initiator, SimulatedResponder(SimulatedLedger(seed=2, **ledger)), **options)
+    return initiator, interledger
+
+
+async def measure(name: str, ledger: dict, count: int, rate: float, timeout: float) -> dict:
+    initiator, interledger = build(SCENARIOS[name], ledger, count, rate)
+    cpu = time.process_time()
+    task = asyncio.ensure_future(interledger.run())
+    deadline = asyncio.get_event_loop().time() + timeout
+    while not initiator.done and asyncio.get_event_loop().time() < deadline:
+        await asyncio.sleep(0.05)
+    cpu = time.process_time() - cpu
+    interledger.stop()
+    await task
+
+    latencies = sorted(initiator.finalized[id] - initiator.emitted[id] for id in initiator.finalized)
+    finalized = len(latencies)
+    elapsed = max(initiator.finalized.values()) - initiator.start if finalized else None
+    return {
+        "scenario": name,
+        "transfers": initiator.count,
+        "finalized": finalized,
+        "transfers_per_sec": round(finalized / elapsed, 1) if elapsed else 0.0,
+        "latency_p50_ms": _percentile(latencies, 0.50),
+        "latency_p95_ms": _percentile(latencies, 0.95),
+        "latency_p99_ms": _percentile(latencies, 0.99),
+        "cpu_s": round(cpu, 2),
+        "cpu_per_transfer_us": round(cpu / finalized * 1e6, 1) if finalized else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def _percentile(values: list, q: float):
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 1)
+
+
+def run_scenario(args) -> dict:
+    name, ledger, count, rate, timeout = args
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(measure(name, ledger, count, rate, timeout))
+    finally:
+        loop.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help="scenario to run, all of them by default; can be repeated")
+    parser.add_argument('--transfers', type=int, default=5000, help="number of transfers per scenario")
+    parser.add_argument('--rate', type=float, default=2000, help="transfers emitted per second by the Initiator")
+    parser.add_argument('--latency', type=float, default=0.02, help="seconds for a ledger to answer a request")
+    parser.add_argument('--jitter', type=float, default=0.01, help="variation of the latency, in seconds")
+    parser.add_argument('--failure-rate', type=float, default=0.01, help="fraction of the transactions which fail")
+    parser.add_argument('--block-time', type=float, default=0.1, help="seconds between two blocks")
+    parser.add_argument('--timeout', type=float, default=120, help="seconds before a scenario is given up")
+    parser.add_argument('--output', help="file to write the report to, in addition to stdout")
+    parser.add_argument('--baseline', help="report of a previous run; the exit status is 1 if the throughput "
+                                           "of a scenario dropped by more than --tolerance")
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    ledger = {'latency': args.latency, 'jitter': args.jitter, 'failure_rate': args.failure_rate,
+              'block_time': args.block_time}
+    names = args.scenario or list(SCENARIOS)
+    context = multiprocessing.get_context('spawn')
+    report = []
+    for name in names:
+        with context.Pool(1) as pool:
+            report.append(pool.apply(run_scenario, ((name, ledger, args.transfers, args.rate, args.timeout),)))
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {r['scenario']: r for r in json.load(f)}
+        for result in report:
+            previous = baseline.get(result['scenario'])
+            if previous and result['transfers_per_sec'] < previous['transfers_per_sec'] * (1 - args.tolerance):
+                print(f"REGRESSION {result['scenario']}: {result['transfers_per_sec']} transfers/s, "
+                      f"{previous['transfers_per_sec']} in the baseline", file=sys.stderr)
+                status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
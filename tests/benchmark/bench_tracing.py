@@ -0,0 +1,30 @@
+import json
+import timeit
+
+from interledger.tracing import Tracer, ChromeTraceExporter
+
+# Cost of one span of the tracing hooks of Interledger, with the no-op Tracer used by default
+# and with the Chrome trace exporter, in nanoseconds.
+
+COUNT = 1000000
+
+
+def measure(tracer):
+    span = min(timeit.repeat(lambda: tracer.span('update_entry', id='1', nonce='2').__enter__().__exit__(),
+                             number=COUNT, repeat=3))
+    record = min(timeit.repeat(lambda: tracer.record('SENT', 1.0, 2.0, id='1', nonce='2'),
+                               number=COUNT, repeat=3))
+    return {
+        "tracer": type(tracer).__name__,
+        "span_ns": round(span / COUNT * 1e9),
+        "record_ns": round(record / COUNT * 1e9),
+    }
+
+
+def main():
+    report = [measure(Tracer()), measure(ChromeTraceExporter('/dev/null', max_spans=1000))]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
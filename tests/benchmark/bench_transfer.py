@@ -0,0 +1,61 @@
+import gc
+import json
+import tracemalloc
+
+from interledger.transfer import Transfer, TransferStatus
+
+# Bytes per in-flight transfer, for the slotted Transfer and for the previous
+# representation: a plain object holding a payload dict and a result dict.
+
+TRANSFERS = [1000, 10000, 100000]
+
+
+class DictTransfer(object):
+    """The Transfer as it was before using slots"""
+
+    def __init__(self):
+        self.status = TransferStatus.READY
+        self.payload = None
+        self.send_accepted = False
+        self.send_task = None
+        self.confirm_accepted = False
+        self.confirm_task = None
+        self.result = {}
+
+
+def populate(factory, count):
+    transfers = []
+    for i in range(count):
+        t = factory()
+        t.payload = {'id': str(i), 'data': b"dummy"}
+        t.payload['nonce'] = str(i)
+        t.result = {'status': True, 'tx_hash': "0x" + "ab" * 32}
+        t.result['commit_status'] = True
+        t.result['commit_tx_hash'] = "0x" + "cd" * 32
+        transfers.append(t)
+    return transfers
+
+
+def measure(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    transfers = populate(factory, count)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del transfers
+    return retained // count
+
+
+def main():
+    report = []
+    for count in TRANSFERS:
+        report.append({
+            "transfers": count,
+            "bytes_per_transfer_dict": measure(DictTransfer, count),
+            "bytes_per_transfer_slots": measure(Transfer, count),
+        })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
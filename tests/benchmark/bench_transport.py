@@ -0,0 +1,97 @@
+import asyncio
+import json
+import threading
+import time
+import urllib.request
+
+from aiohttp import web
+
+from interledger.adapter.jsonrpc import AsyncJsonRpc
+
+# Wall time of the ledger requests of a two-direction bridge against a slow JSON-RPC node,
+# with blocking requests issued from the event loop (as the web3 HTTPProvider does)
+# and with the asynchronous JSON-RPC transport. The worst stall of a heartbeat task
+# running on the same loop shows how long the other direction is blocked.
+
+RPC_LATENCY = 0.05   # seconds added by the stand-in node to every request
+REQUESTS = [1, 10, 50]   # concurrent requests per direction
+DIRECTIONS = 2
+
+
+async def handle(request):
+    message = await request.json()
+    await asyncio.sleep(RPC_LATENCY)
+    return web.json_response({"jsonrpc": "2.0", "id": message["id"], "result": hex(1)})
+
+
+def start_node():
+    """Run the slow node in its own thread, so that blocking clients do not stall it"""
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(web.Application())
+    runner.app.router.add_post("/", handle)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = site._server.sockets[0].getsockname()[1]
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}/"
+
+
+def blocking_request(url, method):
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": []}).encode()
+    request = urllib.request.Request(url, body, {"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())["result"]
+
+
+async def heartbeat(stalls, interval=0.005):
+    loop = asyncio.get_event_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        stalls.append(loop.time() - start - interval)
+
+
+async def measure(url, count, transport):
+    rpc = AsyncJsonRpc(url)
+
+    async def direction():
+        if transport == "blocking":
+            async def call():
+                return blocking_request(url, "eth_blockNumber")
+        else:
+            async def call():
+                return await rpc.request("eth_blockNumber")
+        await asyncio.gather(*[call() for _ in range(count)])
+
+    stalls = [0]
+    beat = asyncio.ensure_future(heartbeat(stalls))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await asyncio.gather(*[direction() for _ in range(DIRECTIONS)])
+    elapsed = time.perf_counter() - start
+    beat.cancel()
+    await rpc.close()
+    return elapsed, max(stalls)
+
+
+def main():
+    url = start_node()
+    loop = asyncio.get_event_loop()
+    report = []
+    for count in REQUESTS:
+        blocking, blocking_stall = loop.run_until_complete(measure(url, count, "blocking"))
+        asynchronous, async_stall = loop.run_until_complete(measure(url, count, "async"))
+        report.append({
+            "requests_per_direction": count,
+            "rpc_latency_ms": RPC_LATENCY * 1000,
+            "blocking_ms": round(blocking * 1000, 1),
+            "async_ms": round(asynchronous * 1000, 1),
+            "blocking_max_loop_stall_ms": round(blocking_stall * 1000, 1),
+            "async_max_loop_stall_ms": round(async_stall * 1000, 1),
+        })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
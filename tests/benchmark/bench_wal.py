@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from interledger.interledger import Interledger
+from interledger.transfer import Transfer
+from interledger.wal import WriteAheadLog
+from tests.integration.utils import MockInitiator, MockResponder
+
+# Cost of the write-ahead log when the bridge carries RATE transfers per second: CPU time per transfer
+# with and without the log, and number of fsyncs, for several group commit windows.
+
+RATE = 1000           # transfers per second read from the Initiator
+DURATION = 3          # seconds
+TICK = 0.01           # the Initiator returns RATE * TICK transfers every TICK seconds
+CONFIGS = [None, (256, 0.0), (256, 0.005), (256, 0.02)]   # (wal_group_size, wal_group_window)
+
+
+class PacedInitiator(MockInitiator):
+
+    def __init__(self):
+        super().__init__([])
+        self.count = 0
+        self.start = None
+
+    async def listen_for_events(self):
+        now = time.monotonic()
+        if self.start is None:
+            self.start = now
+        due = min(int((now - self.start) * RATE), RATE * DURATION)
+        transfers = []
+        for i in range(self.count, due):
+            t = Transfer()
+            t.payload = {'id': str(i), 'data': b"dummy"}
+            transfers.append(t)
+        self.count = due
+        if not transfers:
+            await asyncio.sleep(TICK)
+        return transfers
+
+
+async def measure(config, directory):
+    wal = None
+    if config:
+        wal = WriteAheadLog(os.path.join(directory, f"wal-{config[0]}-{config[1]}"), *config)
+    init = PacedInitiator()
+    interledger = Interledger(init, MockResponder(), pipeline=True, wal=wal)
+    task = asyncio.ensure_future(interledger.run())
+    cpu = time.process_time()
+    while len(interledger.results_commit) < RATE * DURATION:
+        await asyncio.sleep(TICK)
+    cpu = time.process_time() - cpu
+    interledger.stop()
+    await task
+    syncs = 0
+    if wal:
+        wal.close()
+        syncs = wal.syncs
+    return cpu, syncs
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    report = []
+    with tempfile.TemporaryDirectory() as directory:
+        for config in CONFIGS:
+            cpu, syncs = loop.run_until_complete(measure(config, directory))
+            report.append({
+                "transfers": RATE * DURATION,
+                "wal_group_size": config[0] if config else None,
+                "wal_group_window": config[1] if config else None,
+                "cpu_per_transfer_us": round(cpu / (RATE * DURATION) * 1e6, 1),
+                "fsyncs": syncs,
+            })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import asyncio
+import random
+from copy import deepcopy
+
+from interledger.adapter.interfaces import ErrorCode, ILStateManager, MultiResponder
+from interledger.transfer import Transfer, TransferToMulti, TransferStatus
+from tests.integration.utils import MockInitiator, MockResponder
+
+# Mock adapters backed by a simulated ledger, which answers each request after a configurable latency
+# and jitter, includes the transactions in blocks mined at a fixed cadence, and fails a fraction of them.
+
+
+class SimulatedLedger(object):
+
+    def __init__(self, latency: float = 0.02, jitter: float = 0.0, failure_rate: float = 0.0,
+                 block_time: float = 0.0, seed: int = 0):
+        """
+        :param float latency: seconds for the node to answer a request
+        :param float jitter: the latency varies uniformly by up to this number of seconds
+        :param float failure_rate: fraction of the transactions which fail
+        :param float block_time: seconds between two blocks, a transaction is mined with the next block;
+            transactions are mined at once if 0
+        :param int seed: seed of the random generator, so that runs are reproducible
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.block_time = block_time
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.transactions = 0
+
+    async def request(self):
+        """Wait for the answer of a read request
+        """
+        self.requests += 1
+        await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+
+    async def transact(self) -> bool:
+        """Send a transaction and wait until it is mined.
+
+        :returns: whether the transaction succeeded
+        :rtype: bool
+        """
+        await self.request()
+        await self.next_block()
+        self.transactions += 1
+        return self.random.random() >= self.failure_rate
+
+    async def next_block(self):
+        if self.block_time:
+            now = asyncio.get_event_loop().time()
+            await asyncio.sleep(self.block_time - now % self.block_time)
+
+    def mined_at(self, time: float) -> float:
+        """The time of the block including an event emitted at the given time
+        """
+        if not self.block_time:
+            return time
+        return (time // self.block_time + 1) * self.block_time
+
+
+class SimulatedInitiator(MockInitiator):
+    """Emits count transfers at the given rate, each visible once its block is mined, and records the time
+    each transfer is emitted and finalized, i.e. its commit or abort transaction returns.
+    """
+
+    def __init__(self, ledger: SimulatedLedger, count: int, rate: float, poll_interval: float = 0.01,
+                 multi: bool = False):
+        super().__init__([])
+        self.transfer_class = TransferToMulti if multi else Transfer
+        self.ledger = ledger
+        self.count = count
+        self.rate = rate
+        self.poll_interval = poll_interval
+        self.start = None
+        self.next = 0
+        self.emitted = {}    # id -> emission time
+        self.finalized = {}  # id -> finalization time
+
+    async def listen_for_events(self):
+        loop = asyncio.get_event_loop()
+        if self.start is None:
+            self.start = loop.time()
+        await self.ledger.request()
+        now = loop.time()
+        transfers = []
+        while self.next < self.count:
+            emitted = self.start + self.next / self.rate
+            if self.ledger.mined_at(emitted) > now:
+                break
+            t = self.transfer_class()
+            t.payload = {'id': str(self.next), 'data': b"benchmark"}
+            self.emitted[t.id] = emitted
+            transfers.append(t)
+            self.next += 1
+        if not transfers:
+            await asyncio.sleep(self.poll_interval)
+        return transfers
+
+    @property
+    def done(self) -> bool:
+        return len(self.finalized) >= self.count
+
+    def _finalize(self, ids):
+        now = asyncio.get_event_loop().time()
+        for id in ids:
+            self.finalized.setdefault(id, now)
+
+    async def commit_sending(self, id: str, data: bytes = None):
+        ok = await self.ledger.transact()
+        self._finalize([id])
+        return {"commit_status": ok, "commit_tx_hash": '0x111'}
+
+    async def abort_sending(self, id: str, reason: int):
+        ok = await self.ledger.transact()
+        self._finalize([id])
+        return {"abort_status": ok, "abort_tx_hash": '0x222'}
+
+    async def commit_sending_batch(self, ids: list):
+        ok = await self.ledger.transact()
+        self._finalize(ids)
+        return [{"commit_status": ok, "commit_tx_hash": '0x333'} for _ in ids]
+
+    async def abort_sending_batch(self, ids: list, reasons: list):
+        ok = await self.ledger.transact()
+        self._finalize(ids)
+        return [{"abort_status": ok, "abort_tx_hash": '0x444'} for _ in ids]
+
+
+def _send_result(ok: bool) -> dict:
+    if ok:
+        return {"status": True, "tx_hash": "0xsuccess_tx_hash"}
+    return {"status": False, "tx_hash": "0xfail_tx_hash",
+            "error_code": ErrorCode.TRANSACTION_FAILURE, "message": "Error in the transaction"}
+
+
+class SimulatedResponder(MockResponder):
+
+    def __init__(self, ledger: SimulatedLedger):
+        super().__init__()
+        self.ledger = ledger
+
+    async def send_data(self, nonce: str, data: bytes):
+        return _send_result(await self.ledger.transact())
+
+    async def send_data_batch(self, nonces: list, data: list):
+        return [_send_result(ok) for ok in [await self.ledger.transact()] * len(nonces)]
+
+
+class SimulatedMultiResponder(MultiResponder):
+
+    def __init__(self, ledger: SimulatedLedger):
+        self.ledger = ledger
+
+    async def send_data_inquire(self, nonce: str, data: bytes):
+        await self.ledger.request()
+        return {"status": True}
+
+    async def send_data(self, nonce: str, data: bytes):
+        return _send_result(await self.ledger.transact())
+
+    async def abort_send_data(self, nonce: str, reason: int):
+        await self.ledger.transact()
+        return {"status": False, "tx_hash": "0xfail_tx_hash"}
+
+
+class SimulatedStateManager(ILStateManager):
+    """In-memory state layer, as the local state manager, whose calls go through the simulated ledger
+    """
+
+    def __init__(self, ledger: SimulatedLedger):
+        self.ledger = ledger
+        self.local_transfers = {}
+        self.transfers_ready = []
+        self.transfers_responded = []
+
+    async def create_entry(self, id: str, transfer: Transfer) -> bool:
+        await self.ledger.transact()
+        if id in self.local_transfers:
+            return False
+        self.local_transfers[id] = deepcopy(transfer)
+        return True
+
+    async def signal_send_acceptance(self, id: str) -> bool:
+        await self.ledger.request()
+        t = self.local_transfers[id]
+        if t.send_accepted:
+            return False
+        t.send_accepted = True
+        return True
+
+    async def signal_confirm_acceptance(self, id: str) -> bool:
+        await self.ledger.request()
+        t = self.local_transfers[id]
+        if t.confirm_accepted:
+            return False
+        t.confirm_accepted = True
+        return True
+
+    async def update_entry(self, id: str, status: TransferStatus, transfer: Transfer = None) -> bool:
+        await self.ledger.transact()
+        t = self.local_transfers[id]
+        if transfer:
+            t.send_accepted = transfer.send_accepted
+            t.confirm_accepted = transfer.confirm_accepted
+            t.result = transfer.result
+        t.status = status
+        if status == TransferStatus.FINALIZED:
+            del self.local_transfers[id]
+        return True
+
+    async def receive_entry_events(self, status: TransferStatus) -> None:
+        await self.ledger.request()
+        entries = [t for t in self.local_transfers.values() if t.status == status]
+        if status == TransferStatus.READY:
+            self.transfers_ready.extend(entries)
+        elif status == TransferStatus.RESPONDED:
+            self.transfers_responded.extend(entries)
+        else:
+            raise ValueError
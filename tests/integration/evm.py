@@ -0,0 +1,90 @@
+import json
+import os
+
+from web3 import Web3
+
+from interledger.adapter.ethereum import Web3Initializer
+
+# Deploys the contracts of solidity/contracts into the in-process chains of tester:// urls, for the tests and
+# the benchmarks of the Ethereum adapters without any node. Requires eth-tester with the py-evm backend.
+#
+# The bytecode is read from the truffle artifacts of solidity/build/contracts if they exist ('npx truffle compile');
+# otherwise the contracts are compiled with py-solc-x, using the solc version of truffle-config.js, and the result
+# is cached in the same directory. GameToken needs the OpenZeppelin contracts of solidity/node_modules ('npm install').
+
+SOLIDITY_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'solidity')
+CONTRACTS_DIR = os.path.join(SOLIDITY_DIR, 'contracts')
+ARTIFACTS_DIR = os.path.join(SOLIDITY_DIR, 'build', 'contracts')
+SOLC_VERSION = '0.5.17'
+
+
+def load_contract(name: str) -> tuple:
+    """The ABI and the bytecode of a contract of solidity/contracts
+
+    :returns: (abi, bytecode)
+    :rtype: tuple
+    """
+    path = os.path.join(ARTIFACTS_DIR, name + '.json')
+    if not os.path.exists(path):
+        _compile(name)
+    with open(path) as f:
+        artifact = json.load(f)
+    return artifact['abi'], artifact['bytecode']
+
+
+def _compile(name: str):
+    import solcx
+
+    if SOLC_VERSION not in [str(version) for version in solcx.get_installed_solc_versions()]:
+        solcx.install_solc(SOLC_VERSION)
+    source = os.path.abspath(os.path.join(CONTRACTS_DIR, name + '.sol'))
+    modules = os.path.abspath(os.path.join(SOLIDITY_DIR, 'node_modules'))
+    output = solcx.compile_files([source], output_values=['abi', 'bin'], solc_version=SOLC_VERSION,
+                                 import_remappings=[f"@openzeppelin/={modules}/@openzeppelin/"],
+                                 allow_paths=[os.path.abspath(CONTRACTS_DIR), modules])
+    compiled = output[f"{source}:{name}"]
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    with open(os.path.join(ARTIFACTS_DIR, name + '.json'), 'w') as f:
+        json.dump({'contractName': name, 'abi': compiled['abi'], 'bytecode': '0x' + compiled['bin']}, f)
+
+
+class TesterLedger(object):
+    """An in-process chain, with the contracts deployed into it
+    """
+
+    def __init__(self, name: str):
+        """
+        :param str name: the name of the chain, its url is tester://<name>
+        """
+        self.url = f"tester://{name}"
+        self.web3 = Web3Initializer(self.url).web3
+        self.minter = self.web3.eth.accounts[0]
+
+    def deploy(self, name: str, *args):
+        """Deploy a contract from the minter account.
+
+        :param str name: the name of the contract, e.g. 'DataSender'
+        :param args: the arguments of its constructor
+
+        :returns: the contract instance
+        """
+        abi, bytecode = load_contract(name)
+        tx_hash = self.web3.eth.contract(abi=abi, bytecode=bytecode).constructor(*args).transact({'from': self.minter})
+        address = self.web3.eth.waitForTransactionReceipt(tx_hash)['contractAddress']
+        return self.web3.eth.contract(abi=abi, address=Web3.toChecksumAddress(address))
+
+    def adapter_args(self, contract) -> tuple:
+        """The first arguments of the Ethereum adapters connected to a contract of this chain:
+        (minter, contract address, contract ABI, url)
+        """
+        return self.minter, contract.address, contract.abi, self.url
+
+    def gas_used(self, first_block: int = 0) -> int:
+        """Total gas used by the transactions of the blocks after first_block
+        """
+        total = 0
+        for number in range(first_block + 1, self.web3.eth.blockNumber + 1):
+            block = self.web3.eth.getBlock(number, full_transactions=True)
+            for tx in block['transactions']:
+                total += self.web3.eth.getTransactionReceipt(tx['hash'])['gasUsed']
+        return total
@@ -0,0 +1,62 @@
+import pytest
+import asyncio
+
+pytest.importorskip("web3")
+pytest.importorskip("eth_tester")
+
+from interledger.interledger import Interledger
+from interledger.adapter.ethereum import EthereumInitiator, EthereumResponder, EthereumMultiResponder
+from interledger.transfer import TransferToMulti
+from .evm import TesterLedger
+from .utils import MockInitiator
+
+# # # Global view
+# #
+# #  tester://left <- EthereumInitiator <- Interledger -> EthereumResponder -> tester://right
+#
+# The in-process chains mine each transaction at once, so that these tests run without any node.
+
+
+async def _run_until(interledger, condition, timeout=30):
+    task = asyncio.ensure_future(interledger.run())
+    deadline = asyncio.get_event_loop().time() + timeout
+    while not condition() and asyncio.get_event_loop().time() < deadline:
+        await asyncio.sleep(0.1)
+    interledger.stop()
+    await task
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pipeline", [False, True])
+async def test_interledger_ethereum_tester(pipeline):
+    left, right = TesterLedger(f"left-{pipeline}"), TesterLedger(f"right-{pipeline}")
+    sender, receiver = left.deploy('DataSender'), right.deploy('DataReceiver')
+    init = EthereumInitiator(*left.adapter_args(sender))
+    resp = EthereumResponder(*right.adapter_args(receiver))
+    interledger = Interledger(init, resp, pipeline=pipeline)
+
+    for data in (b"first", b"second"):
+        sender.functions.emitData(data).transact({'from': left.minter})
+
+    await _run_until(interledger, lambda: len(interledger.results_commit) == 2)
+
+    assert sorted(r['commit_status'] for r in interledger.results_commit) == [True, True]
+    accepted = receiver.events.InterledgerEventAccepted().getLogs(fromBlock=0)
+    assert len(accepted) == 2
+
+
+@pytest.mark.asyncio
+async def test_interledger_ethereum_tester_multi():
+    # the transfers of the multi-ledger mode are created by the Initiator
+    t = TransferToMulti()
+    t.payload = {'id': '1', 'data': b"dummy"}
+    rights = [TesterLedger(f"multi-right-{i}") for i in range(3)]
+    receivers = [ledger.deploy('DataMultiReceiver') for ledger in rights]
+    responders = [EthereumMultiResponder(*ledger.adapter_args(receiver)) for ledger, receiver in zip(rights, receivers)]
+    interledger = Interledger(MockInitiator([t]), responders, multi=True, threshold=2)
+
+    await _run_until(interledger, lambda: len(interledger.results_commit) == 1)
+
+    assert interledger.results_commit[0]['commit_status'] is True
+    for receiver in receivers:
+        assert len(receiver.events.InterledgerEventAccepted().getLogs(fromBlock=0)) == 1
@@ -5,7 +5,8 @@ from uuid import uuid4
 
 from interledger.interledger import Interledger
 from interledger.transfer import TransferStatus, Transfer
-from .utils import MockInitiator, MockResponder, MockResponderAbort
+from .utils import MockInitiator, MockResponder, MockResponderAbort, MockBatchResponder, \
+    MockBatchInitiator, MockBlockInitiator
 
 # # # Global view
 # #
@@ -317,3 +318,593 @@ async def test_interledger_run_with_cleanup():
 
     i.stop()
     await task
+
+
+
+@pytest.mark.asyncio
+async def test_interledger_run_single_listener():
+
+    class SlowInitiator(MockInitiator):
+        """Polls the ledger for 10 ms, counting the concurrent calls"""
+        def __init__(self, events):
+            super().__init__(events)
+            self.listening = self.max_listening = 0
+
+        async def listen_for_events(self):
+            self.listening += 1
+            self.max_listening = max(self.max_listening, self.listening)
+            try:
+                await asyncio.sleep(0.01)
+                return await super().listen_for_events()
+            finally:
+                self.listening -= 1
+
+    class SlowResponder(MockResponder):
+        async def send_data(self, nonce, data):
+            await asyncio.sleep(0.05)
+            return await super().send_data(nonce, data)
+
+    l = []
+    for n in range(3):
+        t = Transfer()
+        t.payload = {'id': str(n), 'data': b"dummy"}
+        l.append(t)
+
+    init = SlowInitiator(l)
+    i = Interledger(init, SlowResponder())
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.3)
+    assert len(i.results_commit) == 3
+
+    # a pending poll is awaited again instead of being started once more
+    i.stop()
+    await task
+    assert init.max_listening == 1
+    await asyncio.sleep(0.02)
+    assert init.listening == 0
+
+
+# #
+# # Test run with the stage scheduler
+# #
+
+@pytest.mark.asyncio
+async def test_interledger_run_pipeline():
+
+    l1, l2 = [], []
+    for i in range(4):
+        t1, t2 = Transfer(), Transfer()
+        t1.payload, t2.payload = {}, {}
+        t1.payload['id'], t1.payload['data'] = '1', b"dummy1"
+        t2.payload['id'], t2.payload['data'] = '2', b"dummy2"
+        l1.append(t1)
+        l2.append(t2)
+
+    init = MockInitiator(l1)
+    i = Interledger(init, MockResponder(), pipeline=True, queue_size=2)
+
+    task = asyncio.ensure_future(i.run())
+
+    time = 0.5
+    # Consume l1
+    await asyncio.sleep(time)   # Simulate interledger running
+
+    # New events
+    i.responder = MockResponderAbort()
+    init.events = l2
+    # Consume l2, but with a responder returning False -> abort
+    await asyncio.sleep(time)   # Simulate interledger running
+
+    assert len(i.transfers) == 0
+    assert len(i.results_commit) == 4
+    assert len(i.results_abort) == 4
+    assert all(t.status == TransferStatus.FINALIZED for t in l1 + l2)
+
+    i.stop()
+    await task
+    assert task.done()
+    assert not i.scheduler.handovers
+
+
+def test_interledger_invalid_queue_size():
+
+    with pytest.raises(ValueError):
+        Interledger(MockInitiator([]), MockResponder(), pipeline=True, queue_size=0)
+
+
+#
+# Test the in-flight window
+#
+@pytest.mark.asyncio
+async def test_interledger_max_in_flight():
+
+    l = []
+    for i in range(5):
+        t = Transfer()
+        t.payload = {'id': str(i), 'data': b"dummy"}
+        l.append(t)
+
+    init = MockInitiator(l)
+    i = Interledger(init, MockResponder(), max_in_flight=2)
+
+    # the whole burst is received, only the window is sent
+    assert await i.receive_transfer() == 5
+    await i.send_transfer()
+    assert len(i.transfers_sent) == 2
+    assert len(i.transfers.bucket(TransferStatus.READY)) == 3
+
+    # the Initiator is not polled while the window is full
+    init.events = [Transfer()]
+    assert await i.receive_transfer() == 0
+    assert len(init.events) == 1
+
+    # finalizing the sent transfers frees the window
+    while len(i.results_commit) < 2:
+        await i.transfer_result()
+        await i.process_result()
+        await i.confirm_transfer()
+    i.cleanup()
+    await i.send_transfer()
+    assert len(i.transfers_sent) == 2
+    assert len(i.transfers.bucket(TransferStatus.READY)) == 1
+
+
+@pytest.mark.asyncio
+async def test_interledger_run_pipeline_max_in_flight():
+
+    l = []
+    for i in range(10):
+        t = Transfer()
+        t.payload = {'id': str(i), 'data': b"dummy"}
+        l.append(t)
+
+    class WindowResponder(MockResponder):
+        def __init__(self):
+            super().__init__()
+            self.in_flight = self.max_in_flight = 0
+
+        async def send_data(self, nonce: str, data: bytes):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            return await super().send_data(nonce, data)
+
+    resp = WindowResponder()
+    i = Interledger(MockInitiator(l), resp, pipeline=True, max_in_flight=3)
+
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.5)   # Simulate interledger running
+
+    assert len(i.results_commit) == 10
+    assert resp.max_in_flight == 3
+
+    i.stop()
+    await task
+
+
+@pytest.mark.asyncio
+async def test_interledger_run_max_in_flight():
+
+    class BlockInitiator(MockInitiator):
+        """Returns one transfer per poll, recording how many transfers are held when polled"""
+        def __init__(self, events):
+            super().__init__(events)
+            self.held = []
+
+        async def listen_for_events(self):
+            self.held.append(in_memory())
+            await asyncio.sleep(0.001)
+            return [self.events.pop(0)] if self.events else []
+
+    class WindowResponder(MockResponder):
+        def __init__(self):
+            super().__init__()
+            self.held = []
+
+        async def send_data(self, nonce: str, data: bytes):
+            self.held.append(in_memory())
+            await asyncio.sleep(0.01)
+            return await super().send_data(nonce, data)
+
+    def in_memory():
+        return len(i.transfers) - len(i.transfers.bucket(TransferStatus.FINALIZED))
+
+    l = []
+    for n in range(10):
+        t = Transfer()
+        t.payload = {'id': str(n), 'data': b"dummy"}
+        l.append(t)
+
+    init, resp = BlockInitiator(l), WindowResponder()
+    i = Interledger(init, resp, max_in_flight=2)
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.5)
+    assert len(i.results_commit) == 10
+    i.stop()
+    await task
+
+    # the Initiator is only polled with a free slot, and never more than the window is held
+    assert max(init.held) <= 1
+    assert max(resp.held) <= 2
+
+
+def test_interledger_invalid_max_in_flight():
+
+    with pytest.raises(ValueError):
+        Interledger(MockInitiator([]), MockResponder(), max_in_flight=0)
+
+
+#
+# Test streaming the results to a result sink
+#
+@pytest.mark.asyncio
+async def test_interledger_result_sink():
+    from interledger.sinks import MemorySink
+
+    l = []
+    for i in range(4):
+        t = Transfer()
+        t.payload = {'id': str(i), 'data': b"dummy"}
+        l.append(t)
+
+    sink = MemorySink(3)
+    i = Interledger(MockInitiator(l), MockResponder(), pipeline=True, result_sink=sink)
+
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.5)   # Simulate interledger running
+
+    assert sink.count == 4
+    assert len(sink) == 3
+    assert all(r['committed'] and r['commit_tx_hash'] == '0x111' for r in sink)
+    assert [r['id'] for r in sink] == ['1', '2', '3']
+
+    # nothing is kept by the Interledger itself
+    assert len(i.transfers) == 0
+    assert len(i.results_commit) == 0
+
+    i.stop()
+    await task
+
+
+#
+# Test sending the transfers in batches
+#
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pipeline", [False, True])
+async def test_interledger_run_batch(pipeline):
+
+    l = []
+    for i in range(5):
+        t = Transfer()
+        t.payload = {'id': str(i), 'data': b"reject" if i == 1 else b"dummy"}
+        l.append(t)
+
+    resp = MockBatchResponder()
+    i = Interledger(MockInitiator(l.copy()), resp, pipeline=pipeline, batch_size=2, batch_window=0.05)
+
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.5)   # Simulate interledger running
+
+    assert sorted(len(batch) for batch in resp.batches) == [1, 2, 2]
+    # each item of a batch is mapped back to its transfer
+    assert sorted(r['tx_hash'] for r in i.results_commit) == ['0xbatch_tx_hash'] * 4
+    assert len(i.results_abort) == 1
+    assert l[1].result['status'] is False
+    assert all(t.status == TransferStatus.FINALIZED for t in l)
+
+    i.stop()
+    await task
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pipeline", [False, True])
+async def test_interledger_run_confirm_batch(pipeline):
+
+    l = []
+    for i in range(5):
+        t = Transfer()
+        t.payload = {'id': str(i), 'data': b"reject" if i == 1 else b"dummy"}
+        l.append(t)
+
+    init = MockBatchInitiator(l.copy())
+    i = Interledger(init, MockBatchResponder(), pipeline=pipeline, batch_size=4, batch_window=0.05)
+
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.5)   # Simulate interledger running
+
+    commits = [ids for kind, ids in init.batches if kind == 'commit']
+    aborts = [ids for kind, ids in init.batches if kind == 'abort']
+    assert sorted(sum(commits, [])) == ['0', '2', '3', '4']
+    assert len(commits) < 4
+    assert aborts == [['1']]
+    assert all(r['commit_tx_hash'] == '0x333' for r in i.results_commit)
+    assert i.results_abort[0]['abort_tx_hash'] == '0x444'
+
+    i.stop()
+    await task
+
+
+def test_interledger_invalid_batch_size():
+
+    with pytest.raises(ValueError):
+        Interledger(MockInitiator([]), MockResponder(), batch_size=0)
+
+
+#
+# Test resuming the Initiator from its checkpoint
+#
+@pytest.mark.asyncio
+async def test_interledger_checkpoint_restart(tmp_path):
+    from interledger.checkpoint import FileCheckpointStore
+
+    class StuckResponder(MockResponder):
+        """Never answers for the data b"stuck" """
+        def __init__(self):
+            super().__init__()
+            self.received = []
+
+        async def send_data(self, nonce, data):
+            self.received.append(data)
+            if data == b"stuck":
+                await asyncio.sleep(3600)
+            return await super().send_data(nonce, data)
+
+    def blocks(count):
+        l = []
+        for i in range(count):
+            t = Transfer()
+            t.payload = {'id': str(i), 'data': b"stuck" if i == 1 else b"dummy" + str(i).encode()}
+            l.append([t])
+        return l
+
+    path = str(tmp_path / "checkpoint.json")
+    resp = StuckResponder()
+    i = Interledger(MockBlockInitiator(blocks(3)), resp, pipeline=True,
+                    checkpoint=FileCheckpointStore(path), checkpoint_name='left')
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.3)
+    i.stop()
+    await task
+
+    # transfer 1 is still in flight: the blocks after 1 are read again on restart, skipping the finalized transfer 2
+    store = FileCheckpointStore(path)
+    assert store.load('left') == {'position': 1, 'head': 3, 'in_flight': ['1'], 'done': ['2']}
+
+    init = MockBlockInitiator(blocks(4))
+    resp = StuckResponder()
+    i = Interledger(init, resp, pipeline=True, checkpoint=store, checkpoint_name='left')
+    assert init.position == 1
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.3)
+    i.stop()
+    await task
+
+    assert resp.received == [b"stuck", b"dummy3"]
+    assert store.load('left') == {'position': 1, 'head': 4, 'in_flight': ['1'], 'done': ['2', '3']}
+
+
+@pytest.mark.asyncio
+async def test_interledger_checkpoint_concurrent_fetch(tmp_path):
+    from interledger.checkpoint import FileCheckpointStore
+
+    class SlowBlockInitiator(MockBlockInitiator):
+        """The first block takes 0.1 s to read"""
+        async def listen_for_events(self):
+            transfers = await super().listen_for_events()
+            if self.position == 1:
+                await asyncio.sleep(0.1)
+            return transfers
+
+    blocks = []
+    for n in range(2):
+        t = Transfer()
+        t.payload = {'id': str(n), 'data': b"dummy"}
+        blocks.append([t])
+
+    # every update is written at once
+    store = FileCheckpointStore(str(tmp_path / "checkpoint.json"), flush_every=1)
+    i = Interledger(SlowBlockInitiator(blocks), MockResponder(), checkpoint=store, checkpoint_name='left')
+    first = asyncio.ensure_future(i.receive_transfer())
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(i.receive_transfer())
+
+    # the second read waits for the first one, the checkpoint does not skip block 1 meanwhile
+    await asyncio.sleep(0.05)
+    assert store.load('left') is None
+
+    assert await first == 1 and await second == 1
+    assert store.load('left') == {'position': 0, 'head': 2, 'in_flight': ['0', '1'], 'done': []}
+
+
+def test_interledger_checkpoint_unsupported(tmp_path):
+    from interledger.checkpoint import FileCheckpointStore
+
+    # MockInitiator cannot resume from a position
+    with pytest.raises(ValueError):
+        Interledger(MockInitiator([]), MockResponder(), checkpoint=FileCheckpointStore(str(tmp_path / "checkpoint.json")))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pipeline", [False, True])
+async def test_interledger_wal_recovery(tmp_path, pipeline):
+    from interledger.wal import WriteAheadLog
+
+    class CrashingResponder(MockResponder):
+        """Sends the transaction of the data b"crash", then never answers"""
+        def __init__(self):
+            super().__init__()
+            self.received = []
+            self.resumed = []
+
+        async def send_data(self, nonce, data):
+            self.received.append(data)
+            if data == b"crash":
+                self.on_submitted([nonce], '0xcrash')
+                await asyncio.sleep(3600)
+            return await super().send_data(nonce, data)
+
+        async def resume_send(self, nonce, data, tx_hash):
+            self.resumed.append((data, tx_hash))
+            return {"status": True, "tx_hash": tx_hash}
+
+    def transfer(id, data):
+        t = Transfer()
+        t.payload = {'id': id, 'data': data}
+        return t
+
+    path = str(tmp_path / "wal")
+    resp = CrashingResponder()
+    i = Interledger(MockInitiator([transfer('1', b"crash"), transfer('2', b"dummy")]), resp,
+                    pipeline=pipeline, wal=WriteAheadLog(path))
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.3)
+    i.stop()
+    await task
+    i.wal.close()
+
+    # the transfer in flight waits for its transaction instead of sending the data again
+    resp = CrashingResponder()
+    wal = WriteAheadLog(path)
+    i = Interledger(MockInitiator([]), resp, pipeline=pipeline, wal=wal)
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.3)
+    i.stop()
+    await task
+
+    assert resp.received == []
+    assert resp.resumed == [(b"crash", '0xcrash')]
+    assert len(i.transfers) == 0
+    assert wal.read() == {}
+    wal.close()
+
+
+@pytest.mark.asyncio
+async def test_interledger_wal_recovery_malformed(tmp_path):
+    from interledger.wal import WriteAheadLog
+
+    path = str(tmp_path / "wal")
+    with open(path, 'w') as f:
+        # the first record of transfer 1 was lost
+        f.write('{"nonce": "1", "status": "SUBMITTED", "send_tx_hash": "0x1"}\n'
+                '{"nonce": "2", "status": "READY", "id": "2", "data": "dummy"}\n')
+
+    wal = WriteAheadLog(path)
+    i = Interledger(MockInitiator([]), MockResponder(), wal=wal)
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.3)
+    assert len(i.results_commit) == 1
+    i.stop()
+    await task
+
+    assert wal.read() == {}
+    wal.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pipeline", [False, True])
+async def test_interledger_wal_recovery_ksi(tmp_path, pipeline):
+    from interledger.adapter.interfaces import LedgerType
+    from interledger.wal import WriteAheadLog
+
+    class KSIResponder(MockResponder):
+        def __init__(self):
+            super().__init__()
+            self.ledger_type = LedgerType.KSI
+
+        async def send_data(self, nonce, data):
+            return {"status": True, "tx_hash": 'ksi-id'}
+
+    class CommittingInitiator(MockInitiator):
+        """Records the commits, the first instance crashes before its commit is sent"""
+        def __init__(self, events, crash):
+            super().__init__(events)
+            self.crash = crash
+            self.committed = []
+
+        async def commit_sending(self, id, data=None):
+            self.committed.append((id, data))
+            if self.crash:
+                await asyncio.sleep(3600)
+            return await super().commit_sending(id)
+
+    t = Transfer()
+    t.payload = {'id': '1', 'data': b"dummy"}
+    path = str(tmp_path / "wal")
+    init = CommittingInitiator([t], crash=True)
+    i = Interledger(init, KSIResponder(), pipeline=pipeline, wal=WriteAheadLog(path))
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.3)
+    i.stop()
+    await task
+    i.wal.close()
+    assert init.committed == [('1', b"ksi-id")]
+
+    # the recovered commit passes the KSI id to the Initiator as well
+    init = CommittingInitiator([], crash=False)
+    wal = WriteAheadLog(path)
+    i = Interledger(init, KSIResponder(), pipeline=pipeline, wal=wal)
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.3)
+    i.stop()
+    await task
+
+    assert init.committed == [('1', b"ksi-id")]
+    assert wal.read() == {}
+    wal.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pipeline", [False, True])
+async def test_interledger_metrics(pipeline):
+    from interledger.metrics import Metrics
+
+    def transfer(id):
+        t = Transfer()
+        t.payload = {'id': id, 'data': b"dummy"}
+        return t
+
+    metrics = Metrics()
+    i = Interledger(MockInitiator([transfer('1'), transfer('2')]), MockResponder(), pipeline=pipeline,
+                    metrics=metrics, metrics_name='left')
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.3)
+    i.stop()
+    await task
+
+    # every transition of both transfers is timed
+    for before, after in [('READY', 'SENT'), ('SENT', 'RESPONDED'), ('RESPONDED', 'CONFIRMING'),
+                          ('CONFIRMING', 'FINALIZED')]:
+        labels = {'bridge': 'left', 'from': before, 'to': after}
+        assert metrics.histogram('interledger_stage_seconds', **labels).count == 2
+    assert metrics.histogram('interledger_listen_seconds', bridge='left').count > 0
+    assert 'interledger_transfers{bridge="left",status="READY"} 0' in metrics.render()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pipeline", [False, True])
+async def test_interledger_tracing(pipeline):
+    from interledger.tracing import Tracer
+
+    class ListTracer(Tracer):
+        enabled = True
+
+        def __init__(self):
+            self.spans = []
+
+        def record(self, name, start, end, **attrs):
+            self.spans.append((name, attrs))
+
+    t = Transfer()
+    t.payload = {'id': '1', 'data': b"dummy"}
+    tracer = ListTracer()
+    i = Interledger(MockInitiator([t]), MockResponder(), pipeline=pipeline, tracer=tracer)
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.3)
+    i.stop()
+    await task
+
+    # the stages and the adapter calls of the transfer, correlated by its id and nonce
+    spans = [name for name, attrs in tracer.spans if attrs.get('id') == '1' and attrs.get('nonce') == t.nonce]
+    assert spans == ['READY', 'send_data', 'SENT', 'RESPONDED', 'commit_sending', 'CONFIRMING']
+    assert ('listen_for_events', {}) in tracer.spans
@@ -3,6 +3,7 @@ import asyncio
 from uuid import uuid4
 
 from interledger.interledger import Interledger
+from interledger.adapter.interfaces import ErrorCode
 from interledger.transfer import TransferStatus, TransferToMulti
 from .utils import MockInitiator, MockMultiResponder, MockMultiResponderAbort
 
@@ -40,7 +41,7 @@ async def test_interledger_multi_receive_transfer():
     assert init.events == []
     assert len(interledger.transfers) == 1
     assert l == 1
-    assert interledger.transfers[0].state == TransferStatus.READY
+    assert interledger.transfers[0].status == TransferStatus.READY
 
 
 #
@@ -113,7 +114,7 @@ async def test_interledger_multi_transfer_inquiry():
     assert len(i.transfers_answered) == 1
 
     tr = i.transfers_answered[0]
-    assert tr.state == TransferStatus.ANSWERED
+    assert tr.status == TransferStatus.ANSWERED
     assert tr.inquiry_results[0]['status'] == True
     assert tr.inquiry_results[1]['status'] == False
 
@@ -198,7 +199,7 @@ async def test_interledger_multi_transfer_result():
     assert t in i.transfers_responded
 
     tr = i.transfers_responded[0]
-    assert tr.state == TransferStatus.RESPONDED
+    assert tr.status == TransferStatus.RESPONDED
     assert tr.results[0]['status'] == True
     assert tr.results[1]['status'] == False
 
@@ -229,7 +230,7 @@ async def test_interledger_multi_process_result_commit():
 
     assert len(i.results_committing) == 1
     tr = i.results_committing[0]
-    assert tr.state == TransferStatus.CONFIRMING
+    assert tr.status == TransferStatus.CONFIRMING
     assert tr.results[0]['status'] == True
     assert tr.results[1]['status'] == False
     assert len(i.results_commit) == 0
@@ -262,7 +263,7 @@ async def test_interledger_multi_process_result_abort():
     await task
 
     tr = i.results_aborting[0]
-    assert tr.state == TransferStatus.CONFIRMING
+    assert tr.status == TransferStatus.CONFIRMING
     assert tr.results[0]['status'] == False
     assert tr.results[1]['status'] == False
     assert len(i.results_commit) == 0
@@ -295,7 +296,7 @@ async def test_interledger_multi_process_result_inquiry_rejection():
     await task
 
     tr = i.results_aborting[0]
-    assert tr.state == TransferStatus.CONFIRMING
+    assert tr.status == TransferStatus.CONFIRMING
     assert tr.results[0]['status'] == True
     assert tr.results[1]['status'] == True
     assert len(i.results_commit) == 0
@@ -430,3 +431,151 @@ async def test_interledger_ledger_run_with_cleanup():
 
     i.stop()
     await task
+
+
+@pytest.mark.asyncio
+async def test_interledger_multi_run_pipeline():
+
+    l1 = []
+    for i in range(4):
+        t = TransferToMulti()
+        t.payload = {}
+        t.payload['id'], t.payload['data'] = str(i), b"dummy"
+        l1.append(t)
+
+    init = MockInitiator(l1)
+    resp1 = MockMultiResponder()
+    resp2 = MockMultiResponder()
+    resp3 = MockMultiResponderAbort()
+    i = Interledger(init, [resp1, resp2, resp3], True, 2, pipeline=True)
+
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.5)   # Simulate interledger running
+
+    assert len(i.transfers) == 0
+    assert len(i.results_commit) == 4
+    assert len(i.results_abort) == 0
+    assert all(t.inquiry_decision for t in l1)
+
+    i.stop()
+    await task
+
+
+#
+# Test the early decision of the threshold votes
+#
+class MockMultiResponderLagging(MockMultiResponder):
+    """Answers an hour later"""
+    async def send_data_inquire(self, nonce: str, data: bytes):
+        await asyncio.sleep(3600)
+        return await super().send_data_inquire(nonce, data)
+
+    async def send_data(self, nonce: str, data: bytes):
+        await asyncio.sleep(3600)
+        return await super().send_data(nonce, data)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pipeline", [False, True])
+async def test_interledger_multi_run_lagging_responder(pipeline):
+
+    t = TransferToMulti()
+    t.payload = {'id': '1', 'data': b"dummy"}
+    lagging = MockMultiResponderLagging()
+    i = Interledger(MockInitiator([t]), [MockMultiResponder(), MockMultiResponder(), lagging], True, 2,
+                    pipeline=pipeline)
+
+    # the threshold is reached without the lagging responder
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.5)
+
+    assert len(i.results_commit) == 1
+    assert t.inquiry_decision == True
+    # its inquiry was cancelled, its send still goes on
+    assert t.inquiry_results[2]['status'] == False
+    assert t.send_tasks[2].done() == False
+
+    i.stop()
+    await task
+    t.send_tasks[2].cancel()
+
+
+@pytest.mark.asyncio
+async def test_interledger_multi_run_responder_timeout():
+
+    t = TransferToMulti()
+    t.payload = {'id': '1', 'data': b"dummy"}
+    i = Interledger(MockInitiator([t]), [MockMultiResponder(), MockMultiResponderLagging()], True, 2,
+                    pipeline=True, responder_timeout=0.1)
+
+    # all the responders are required, the lagging one does not answer before its deadline
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.5)
+
+    assert len(i.results_abort) == 1
+    assert t.inquiry_decision == False
+    assert t.inquiry_results[1]['error_code'] == ErrorCode.TIMEOUT
+
+    i.stop()
+    await task
+
+
+def test_interledger_multi_responder_timeout_invalid():
+
+    with pytest.raises(ValueError):
+        Interledger(MockInitiator([]), [MockMultiResponder(), MockMultiResponder()], True, 1,
+                    responder_timeout=[1.0])
+    with pytest.raises(ValueError):
+        Interledger(MockInitiator([]), MockMultiResponder(), responder_timeout=1.0)
+
+
+#
+# Test that each transfer advances on its own
+#
+class MockMultiResponderSlowData(MockMultiResponder):
+    """Answers the inquiry of the data b"slow" an hour later"""
+    async def send_data_inquire(self, nonce: str, data: bytes):
+        if data == b"slow":
+            await asyncio.sleep(3600)
+        return await super().send_data_inquire(nonce, data)
+
+
+@pytest.mark.asyncio
+async def test_interledger_multi_run_independent_transfers():
+
+    slow, fast = TransferToMulti(), TransferToMulti()
+    slow.payload = {'id': '1', 'data': b"slow"}
+    fast.payload = {'id': '2', 'data': b"fast"}
+    i = Interledger(MockInitiator([slow, fast]), [MockMultiResponderSlowData(), MockMultiResponderSlowData()],
+                    True, 2)
+
+    task = asyncio.ensure_future(i.run())
+    await asyncio.sleep(0.5)
+
+    # the fast transfer does not wait for the inquiry of the slow one
+    assert slow.status == TransferStatus.INQUIRED
+    assert fast.status == TransferStatus.FINALIZED
+    assert len(i.results_commit) == 1
+
+    i.stop()
+    await task
+    for t in slow.inquiry_tasks:
+        t.cancel()
+
+
+@pytest.mark.asyncio
+async def test_interledger_multi_process_result_only_responded():
+
+    i = Interledger(MockInitiator([]), [MockMultiResponder(), MockMultiResponder()], True)
+
+    t = TransferToMulti()
+    t.payload = {'id': '1'}
+    t.status = TransferStatus.SENT
+    i.transfers_responded = [t]
+
+    await i.process_result()
+
+    # a transfer which has not responded yet is not confirmed
+    assert t.status == TransferStatus.SENT
+    assert len(i.results_committing) == 0
+    assert len(i.results_aborting) == 0
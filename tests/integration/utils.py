@@ -23,6 +23,32 @@ class MockInitiator(Initiator):
          return {"abort_status": True, "abort_tx_hash" : '0x222'}
 
 
+# Initiator reading its events block by block, which can be checkpointed
+
+class MockBlockInitiator(MockInitiator):
+
+    def __init__(self, blocks: List):
+        """
+        :param list blocks: the transfers of each block, block numbers start at 1
+        """
+        super().__init__([])
+        self.blocks = blocks
+        self.position = 0
+
+    async def listen_for_events(self):
+        # one block per call
+        if self.position >= len(self.blocks):
+            return []
+        self.position += 1
+        return list(self.blocks[self.position - 1])
+
+    def get_position(self):
+        return self.position
+
+    def set_position(self, position):
+        self.position = position
+
+
 # Responder which getting positive result
 
 class MockResponder(Responder):
@@ -36,6 +62,39 @@ class MockResponder(Responder):
         return {"status": True, "tx_hash": "0xsuccess_tx_hash"}
 
 
+# Initiator confirming in batches
+
+class MockBatchInitiator(MockInitiator):
+
+    def __init__(self, events: List):
+        super().__init__(events)
+        self.batches = []
+
+    async def commit_sending_batch(self, ids: list):
+        self.batches.append(('commit', list(ids)))
+        return [{"commit_status": True, "commit_tx_hash": '0x333'} for _ in ids]
+
+    async def abort_sending_batch(self, ids: list, reasons: list):
+        self.batches.append(('abort', list(ids)))
+        return [{"abort_status": True, "abort_tx_hash": '0x444'} for _ in ids]
+
+
+# Responder accepting batches, which rejects the data b"reject"
+
+class MockBatchResponder(Responder):
+
+    def __init__(self):
+        self.batches = []
+        self.ledger_type = LedgerType.ETHEREUM
+
+    async def send_data(self, nonce: str, data: bytes):
+        return (await self.send_data_batch([nonce], [data]))[0]
+
+    async def send_data_batch(self, nonces: list, data: list):
+        self.batches.append(list(nonces))
+        return [{"status": item != b"reject", "tx_hash": "0xbatch_tx_hash"} for item in data]
+
+
 # Responder which getting negative result
 
 class MockResponderAbort(Responder):
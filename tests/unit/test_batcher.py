@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+
+from interledger.batcher import Batcher
+
+
+@pytest.mark.asyncio
+async def test_batcher_size_and_window():
+
+    calls = []
+
+    async def call(nonces, data):
+        calls.append(nonces)
+        return [n + d for n, d in zip(nonces, data)]
+
+    batcher = Batcher(call, 2, 0.05)
+    futures = [batcher.submit(str(i), 'x') for i in range(3)]
+
+    # the first two calls fill a batch, the last one waits for the window
+    await asyncio.sleep(0.01)
+    assert calls == [['0', '1']]
+    assert not futures[2].done()
+
+    results = await asyncio.gather(*futures)
+    assert calls == [['0', '1'], ['2']]
+    assert results == ['0x', '1x', '2x']
+
+
+@pytest.mark.asyncio
+async def test_batcher_errors():
+
+    async def call(nonces):
+        return [ValueError(n) if n == 'bad' else n for n in nonces]
+
+    async def failing(nonces):
+        raise RuntimeError("batch failed")
+
+    batcher = Batcher(call, 2, 0)
+    good, bad = batcher.submit('good'), batcher.submit('bad')
+    assert await good == 'good'
+    with pytest.raises(ValueError):
+        await bad
+
+    batcher = Batcher(failing, 1, 0)
+    with pytest.raises(RuntimeError):
+        await batcher.submit('any')
+
+    with pytest.raises(ValueError):
+        Batcher(call, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_batcher_cancel():
+
+    async def call(nonces):
+        return nonces
+
+    batcher = Batcher(call, 10, 1)
+    future = batcher.submit('1')
+    batcher.cancel()
+    assert future.cancelled()
+    assert not batcher.pending
@@ -0,0 +1,68 @@
+import pytest
+
+from interledger.checkpoint import FileCheckpointStore, SqliteCheckpointStore, InitiatorProgress
+
+
+@pytest.mark.parametrize("store_class", [FileCheckpointStore, SqliteCheckpointStore])
+def test_checkpoint_store_batches_writes(tmp_path, store_class):
+
+    path = str(tmp_path / "checkpoint")
+    store = store_class(path, flush_every=3, flush_interval=60)
+    state = {'position': 1, 'head': 2, 'in_flight': ['1'], 'done': []}
+    store.update('left', lambda: state)
+    store.update('left', lambda: state)
+    assert store.flushes == 0
+
+    store.update('right', lambda: state)
+    assert store.flushes == 1
+    assert store.load('left') == state
+
+    # the last update is the one written
+    store.update('left', lambda: dict(state, position=2))
+    store.close()
+    assert store.flushes == 2
+    assert store_class(path).load('left')['position'] == 2
+    assert store_class(path).load('unknown') is None
+
+
+def test_checkpoint_store_invalid(tmp_path):
+
+    with pytest.raises(ValueError):
+        FileCheckpointStore(str(tmp_path / "checkpoint"), flush_every=0)
+    with pytest.raises(ValueError):
+        FileCheckpointStore(str(tmp_path / "checkpoint"), flush_interval=-1)
+
+
+def test_initiator_progress():
+
+    progress = InitiatorProgress()
+    progress.fetched(10, 12, ['a', 'b'])
+    progress.fetched(12, 15, ['c'])
+    progress.fetched(15, 20, [])
+    state = progress.state()
+    assert (state['position'], state['head'], state['done']) == (10, 20, [])
+    assert sorted(state['in_flight']) == ['a', 'b', 'c']
+
+    # the position only moves past the reads whose transfers are all finalized
+    progress.finalized('c')
+    assert progress.state()['position'] == 10
+    assert progress.state()['done'] == ['c']
+    progress.finalized('a')
+    progress.finalized('b')
+    assert progress.state() == {'position': 20, 'head': 20, 'in_flight': [], 'done': []}
+
+
+def test_initiator_progress_restart():
+
+    progress = InitiatorProgress({'position': 10, 'head': 20, 'in_flight': ['a'], 'done': ['c']})
+    assert progress.position == 10
+
+    # the in-flight transfer is read again, the finalized one is skipped
+    assert not progress.skip('a')
+    progress.fetched(10, 12, ['a'])
+    assert progress.skip('c')
+    progress.fetched(12, 20, [])
+    assert progress.state() == {'position': 10, 'head': 20, 'in_flight': ['a'], 'done': ['c']}
+
+    progress.finalized('a')
+    assert progress.state() == {'position': 20, 'head': 20, 'in_flight': [], 'done': []}
@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+
+from interledger.adapter.fabric_commits import CommitTracker, CommitTimeout
+
+
+class Stream:
+    def __init__(self):
+        self.listeners = []
+
+    def listen(self, callback, start=None):
+        self.listeners.append((callback, start))
+
+    def deliver(self, block):
+        for callback, _ in self.listeners:
+            callback(block)
+
+
+def filtered_block(number, statuses):
+    transactions = []
+    for tx_id, code in statuses.items():
+        transaction = {'txid': tx_id}
+        if code != 'VALID':
+            transaction['tx_validation_code'] = code
+        transactions.append(transaction)
+    return {'number': number, 'filtered_transactions': transactions}
+
+
+@pytest.mark.asyncio
+async def test_commit_tracker_resolves_from_blocks():
+
+    stream = Stream()
+    tracker = CommitTracker(stream)
+    tx_ids = [f"tx{i}" for i in range(100)]
+    for tx_id in tx_ids:
+        tracker.watch(tx_id, start=10)
+
+    # a single listener on the stream, from the given height
+    assert stream.listeners == [(tracker._on_block, 10)]
+
+    waits = asyncio.gather(*[tracker.wait(tx_id, 10) for tx_id in tx_ids])
+    statuses = {tx_id: 'VALID' for tx_id in tx_ids[:99]}
+    statuses['tx99'] = 'MVCC_READ_CONFLICT'
+    statuses['other'] = 'VALID'
+    stream.deliver(filtered_block(10, statuses))
+
+    codes = await asyncio.wait_for(waits, 1)
+    assert codes == ['VALID'] * 99 + ['MVCC_READ_CONFLICT']
+    assert tracker.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_commit_tracker_committed_before_wait():
+
+    stream = Stream()
+    tracker = CommitTracker(stream)
+    tracker.watch("tx1")
+
+    # the transaction is committed before its submission returns
+    stream.deliver(filtered_block(3, {"tx1": 'VALID'}))
+    assert await asyncio.wait_for(tracker.wait("tx1", 10), 1) == 'VALID'
+
+
+@pytest.mark.asyncio
+async def test_commit_tracker_timeout():
+
+    stream = Stream()
+    tracker = CommitTracker(stream)
+    tracker.watch("tx1")
+
+    with pytest.raises(CommitTimeout):
+        await tracker.wait("tx1", 0.05)
+    assert tracker.pending == {}
+
+    tracker.watch("tx2")
+    tracker.forget("tx2")
+    assert tracker.pending == {}
+    assert len(stream.listeners) == 1
+
+
+def test_commit_tracker_shared():
+
+    stream = Stream()
+    assert CommitTracker.shared(stream) is CommitTracker.shared(stream)
+    assert CommitTracker.shared(Stream()) is not CommitTracker.shared(stream)
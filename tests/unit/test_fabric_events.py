@@ -0,0 +1,209 @@
+import pytest
+import asyncio
+import json
+from uuid import uuid4
+
+from interledger.adapter.fabric_peers import PeerSelector
+from interledger.adapter.fabric_events import ChannelEventStream, block_number, chaincode_events, decode_payload, \
+    transaction_statuses, batch_outcome
+
+
+class Hub:
+    """Event hub delivering the blocks of a chain, the stream breaks once `breaks` blocks are delivered"""
+    def __init__(self, chain):
+        self.chain = chain
+        self.on_event = None
+        self.connected = False
+
+    def registerBlockEvent(self, unregister=True, onEvent=None):
+        self.on_event = onEvent
+
+    async def connect(self, filtered=True, start=None):
+        self.connected = True
+        self.chain.starts.append(start)
+        number = start if start is not None else len(self.chain.blocks) - 1
+        while True:
+            if self.chain.breaks == 0:
+                self.chain.breaks = None
+                raise ConnectionError("stream reset")
+            if number < len(self.chain.blocks):
+                self.on_event(self.chain.blocks[number])
+                number += 1
+                if self.chain.breaks:
+                    self.chain.breaks -= 1
+            else:
+                await asyncio.sleep(0.01)
+
+    def disconnect(self):
+        self.connected = False
+
+
+class Channel:
+    name = "mychannel"
+
+    def __init__(self):
+        self.blocks = [{'header': {'number': i}} for i in range(5)]
+        self.starts = []
+        self.breaks = None
+        self.hubs = []
+
+    def newChannelEventHub(self, peer, user):
+        self.hubs.append(Hub(self))
+        return self.hubs[-1]
+
+
+@pytest.mark.asyncio
+async def test_event_stream_delivers_from_start():
+
+    channel = Channel()
+    stream = ChannelEventStream(channel, 'peer0', 'admin')
+    blocks = stream.subscribe(3)
+
+    assert block_number(await asyncio.wait_for(blocks.get(), 1)) == 3
+    assert block_number(await asyncio.wait_for(blocks.get(), 1)) == 4
+
+    # new blocks are streamed on the same connection
+    channel.blocks.append({'number': 5})
+    assert block_number(await asyncio.wait_for(blocks.get(), 1)) == 5
+    assert stream.connections == 1
+    await stream.close()
+    assert not channel.hubs[-1].connected
+
+
+@pytest.mark.asyncio
+async def test_event_stream_resumes_after_reconnection():
+
+    channel = Channel()
+    channel.breaks = 2
+    stream = ChannelEventStream(channel, 'peer0', 'admin', reconnect_delay=0.01)
+    blocks = stream.subscribe(0)
+
+    numbers = [block_number(await asyncio.wait_for(blocks.get(), 1)) for _ in range(5)]
+
+    # no block is lost or delivered twice
+    assert numbers == [0, 1, 2, 3, 4]
+    assert channel.starts == [0, 2]
+    await stream.close()
+
+
+@pytest.mark.asyncio
+async def test_event_stream_shared():
+
+    channel = Channel()
+    first = ChannelEventStream.shared(channel, 'peer0', 'admin')
+    assert ChannelEventStream.shared(channel, 'peer0', 'admin') is first
+    assert ChannelEventStream.shared(channel, 'peer1', 'admin') is not first
+
+    # a later listener only gets the blocks from its start
+    early, late = first.subscribe(1), first.subscribe(4)
+    assert block_number(await asyncio.wait_for(late.get(), 1)) == 4
+    assert early.qsize() == 4
+    first.unsubscribe(early)
+    channel.blocks.append({'number': 5})
+    assert block_number(await asyncio.wait_for(late.get(), 1)) == 5
+    assert early.qsize() == 4
+
+    await ChannelEventStream.close_all()
+    assert ChannelEventStream._streams == {}
+
+
+
+class DownHub(Hub):
+    async def connect(self, filtered=True, start=None):
+        raise ConnectionError("peer unavailable")
+
+
+@pytest.mark.asyncio
+async def test_event_stream_fails_over_to_another_peer():
+
+    class Peers(Channel):
+        def newChannelEventHub(self, peer, user):
+            self.hubs.append((peer, DownHub(self) if peer == 'peer0' else Hub(self)))
+            return self.hubs[-1][1]
+
+    channel = Peers()
+    selector = PeerSelector(['peer0', 'peer1'])
+    stream = ChannelEventStream(channel, selector, 'admin', reconnect_delay=0.01)
+    blocks = stream.subscribe(3)
+
+    assert block_number(await asyncio.wait_for(blocks.get(), 1)) == 3
+    assert [peer for peer, _ in channel.hubs] == ['peer0', 'peer1']
+    assert list(selector.height) == [1]
+    await stream.close()
+
+def action(cc_name, event_name, payload):
+    event = {'chaincode_id': cc_name, 'tx_id': 'tx', 'event_name': event_name, 'payload': payload}
+    return {'payload': {'action': {'proposal_response_payload': {'extension': {'events': event}}}}}
+
+
+def test_chaincode_events_full_block():
+
+    block = {
+        'header': {'number': 7},
+        'data': {'data': [
+            {'payload': {'data': {'actions': [action('data_sender', 'InterledgerEventSending', b'{"Id":1,"Data":"a"}'),
+                                              action('other', 'InterledgerEventSending', b'{}')]}}},
+            # invalidated transaction
+            {'payload': {'data': {'actions': [action('data_sender', 'InterledgerEventSending', b'{"Id":2}')]}}},
+            {'payload': {'data': {'actions': [action('data_sender', '', b''),
+                                              action('data_sender', 'InterledgerEventSending', b'{"Id":3,"Data":"c"}')]}}},
+            # configuration transaction
+            {'payload': {'data': {'config': {}}}},
+        ]},
+        'metadata': {'metadata': [b'', b'', bytes([0, 11, 0, 0]), b'']}
+    }
+
+    events = chaincode_events(block, 'data_sender', 'InterledgerEventSending')
+    assert [decode_payload(e['payload']) for e in events] == [{'Id': 1, 'Data': 'a'}, {'Id': 3, 'Data': 'c'}]
+    assert len(chaincode_events(block)) == 3
+
+
+def test_chaincode_events_filtered_block():
+
+    block = {
+        'number': 8,
+        'filtered_transactions': [
+            {'txid': 'tx1', 'transaction_actions': {'chaincode_actions': [
+                {'chaincode_event': {'chaincode_id': 'data_sender', 'tx_id': 'tx1', 'event_name': 'InterledgerEventSending'}}]}},
+            {'txid': 'tx2', 'tx_validation_code': 'MVCC_READ_CONFLICT', 'transaction_actions': {'chaincode_actions': [
+                {'chaincode_event': {'chaincode_id': 'data_sender', 'tx_id': 'tx2', 'event_name': 'InterledgerEventSending'}}]}},
+            {'txid': 'tx3', 'type': 'CONFIG'},
+        ]
+    }
+
+    events = chaincode_events(block, 'data_sender', 'InterledgerEventSending')
+    assert [e['tx_id'] for e in events] == ['tx1']
+    assert 'payload' not in events[0]
+    assert chaincode_events({'number': 9}) == []
+
+
+def test_transaction_statuses():
+
+    def envelope(tx_id):
+        return {'payload': {'header': {'channel_header': {'tx_id': tx_id}}, 'data': {'actions': []}}}
+
+    block = {
+        'header': {'number': 7},
+        'data': {'data': [envelope('tx1'), envelope('tx2')]},
+        'metadata': {'metadata': [b'', b'', bytes([0, 11]), b'']}
+    }
+    assert transaction_statuses(block) == {'tx1': 'VALID', 'tx2': 11}
+
+    block = {'number': 8, 'filtered_transactions': [{'txid': 'tx3'},
+                                                    {'txid': 'tx4', 'tx_validation_code': 'MVCC_READ_CONFLICT'}]}
+    assert transaction_statuses(block) == {'tx3': 'VALID', 'tx4': 'MVCC_READ_CONFLICT'}
+
+
+def test_batch_outcome():
+
+    payload = b'{"Accepted":["1","3"],"Rejected":["2"]}'
+    assert batch_outcome(payload, ["1", "2", "3", "4"]) == [True, False, True, None]
+
+    # the Interledger nonces are 128-bit integers
+    nonces = [str(uuid4().int | 1 << 127) for _ in range(3)]
+    payload = json.dumps({"Accepted": nonces[:2], "Rejected": nonces[2:]}).encode()
+    assert batch_outcome(payload, nonces) == [True, True, False]
+
+    # a chaincode without interledgerReceiveBatch answers "OK" to an unknown function
+    assert batch_outcome(b'OK', ["1", "2"]) == [None, None]
+    assert batch_outcome(b'', ["1"]) == [None]
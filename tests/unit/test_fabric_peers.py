@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+
+from interledger.adapter.fabric_peers import PeerSelector
+
+
+class Peer:
+    def __init__(self, endpoint, latency=0.0, fails=False, refuses=False):
+        self.endpoint = endpoint
+        self.latency = latency
+        self.fails = fails
+        self.refuses = refuses
+        self.requests = 0
+
+    async def handle(self):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        if self.fails:
+            raise ConnectionError(f"{self.endpoint} unavailable")
+        return self, not self.refuses
+
+
+async def request(peer):
+    return await peer.handle()
+
+
+@pytest.mark.asyncio
+async def test_selector_ranks_by_latency_and_load():
+
+    fast, slow = Peer("fast"), Peer("slow")
+    selector = PeerSelector([slow, fast])
+    selector.finished(fast, 0.01)
+    selector.finished(slow, 0.1)
+    assert selector.ranked() == [fast, slow]
+
+    # the fast peer is busy with many requests
+    for _ in range(20):
+        selector.started(fast)
+    assert selector.best() is slow
+
+    # a peer behind the highest height is ranked last
+    selector.observe_height(slow, 10)
+    selector.observe_height(fast, 12)
+    assert selector.best() is fast
+
+
+@pytest.mark.asyncio
+async def test_selector_query_fails_over():
+
+    down, up = Peer("down", fails=True), Peer("up")
+    selector = PeerSelector([down, up])
+
+    assert await selector.query(request) == (up, True)
+    # the failing peer is left aside
+    assert selector.ranked() == [up]
+    assert await selector.query(request) == (up, True)
+    assert down.requests == 1
+
+    # unless all the peers failed
+    up.fails = True
+    with pytest.raises(ConnectionError):
+        await selector.query(request)
+    assert len(selector.ranked()) == 2
+
+
+@pytest.mark.asyncio
+async def test_selector_gather_replaces_slow_failing_and_refusing_peers():
+
+    peers = [Peer("p0", latency=0.3), Peer("p1", fails=True), Peer("p2", refuses=True), Peer("p3", latency=0.01),
+             Peer("p4", latency=0.01)]
+    selector = PeerSelector(peers, default_latency=0.02)
+
+    accepted, rejected = await asyncio.wait_for(selector.gather(request, 2, lambda result: result[1]), 1)
+    assert sorted(peer.endpoint for peer, _ in accepted) == ["p3", "p4"]
+    assert len(rejected) == 2
+    # the request still running on the slow peer was given up
+    await asyncio.sleep(0)
+    assert selector.in_flight == [0] * 5
+    assert selector.ranked()[-1] is peers[0]
+
+    # not enough peers accept it
+    accepted, rejected = await asyncio.wait_for(selector.gather(request, 4, lambda result: result[1]), 1)
+    assert len(accepted) == 3
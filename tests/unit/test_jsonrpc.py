@@ -0,0 +1,138 @@
+import json
+import pytest
+from aiohttp import web, WSMsgType
+
+from interledger.adapter.jsonrpc import AsyncJsonRpc, JsonRpcError
+
+
+def answer(message):
+    if message['method'] == 'eth_fail':
+        return {"jsonrpc": "2.0", "id": message['id'], "error": {"code": -32000, "message": "nonce too low"}}
+    return {"jsonrpc": "2.0", "id": message['id'], "result": message['params']}
+
+
+async def handle_http(request):
+    data = await request.json()
+    if isinstance(data, list):
+        return web.json_response([answer(m) for m in reversed(data)])
+    return web.json_response(answer(data))
+
+
+async def handle_ws(request):
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    async for msg in ws:
+        if msg.type == WSMsgType.TEXT:
+            data = json.loads(msg.data)
+            response = [answer(m) for m in data] if isinstance(data, list) else answer(data)
+            await ws.send_str(json.dumps(response))
+    return ws
+
+
+async def start_node():
+    app = web.Application()
+    app.router.add_post("/", handle_http)
+    app.router.add_get("/ws", handle_ws)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, "127.0.0.1:%d" % site._server.sockets[0].getsockname()[1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("protocol", ["http", "ws"])
+async def test_jsonrpc_request(protocol):
+
+    runner, node = await start_node()
+    url = f"http://{node}/" if protocol == "http" else f"ws://{node}/ws"
+    rpc = AsyncJsonRpc(url)
+
+    assert await rpc.request('eth_echo', ['0x1']) == ['0x1']
+
+    with pytest.raises(ValueError) as e:
+        await rpc.request('eth_fail')
+    assert isinstance(e.value, JsonRpcError)
+    assert e.value.error['message'] == "nonce too low"
+
+    results = await rpc.batch([('eth_echo', [1]), ('eth_fail', []), ('eth_echo', [3])])
+    assert results[0] == [1] and results[2] == [3]
+    assert isinstance(results[1], JsonRpcError)
+
+    await rpc.close()
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_jsonrpc_metrics():
+    from interledger.metrics import Metrics
+
+    runner, node = await start_node()
+    metrics = Metrics()
+    rpc = AsyncJsonRpc(f"http://{node}/", metrics=metrics)
+
+    await rpc.request('eth_echo', ['0x1'])
+    await rpc.batch([('eth_echo', [1]), ('eth_echo', [2])])
+    assert metrics.histogram('interledger_rpc_seconds', endpoint=rpc.url, method='eth_echo').count == 1
+    assert metrics.histogram('interledger_rpc_seconds', endpoint=rpc.url, method='batch').count == 1
+
+    # the clients without metrics do not record anything
+    other = AsyncJsonRpc(f"http://{node}/")
+    await other.request('eth_echo', ['0x1'])
+    assert metrics.histogram('interledger_rpc_seconds', endpoint=rpc.url, method='eth_echo').count == 1
+
+    await rpc.close()
+    await other.close()
+    await runner.cleanup()
+
+
+def test_jsonrpc_invalid_url():
+
+    with pytest.raises(ValueError):
+        AsyncJsonRpc("ipc:///tmp/geth.ipc")
+
+
+async def handle_subscribe(request):
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    async for msg in ws:
+        if msg.type == WSMsgType.TEXT:
+            data = json.loads(msg.data)
+            subscription = '0x' + data['params'][0].encode().hex()
+            await ws.send_str(json.dumps({"jsonrpc": "2.0", "id": data['id'], "result": subscription}))
+            for i in range(2):
+                await ws.send_str(json.dumps({"jsonrpc": "2.0", "method": "eth_subscription",
+                                              "params": {"subscription": subscription, "result": i}}))
+            if data['params'][0] == 'close':
+                await ws.close()
+    return ws
+
+
+@pytest.mark.asyncio
+async def test_jsonrpc_subscribe():
+
+    app = web.Application()
+    app.router.add_get("/ws", handle_subscribe)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    rpc = AsyncJsonRpc("ws://127.0.0.1:%d/ws" % site._server.sockets[0].getsockname()[1])
+
+    logs, queue = await rpc.subscribe(['logs'])
+    heads, _ = await rpc.subscribe(['newHeads'], queue)
+    items = [await queue.get() for _ in range(4)]
+    assert [i for s, i in items if s == logs] == [0, 1]
+    assert [i for s, i in items if s == heads] == [0, 1]
+
+    # the subscriptions end with the connection
+    await rpc.subscribe(['close'], queue)
+    while await queue.get() is not None:
+        pass
+    assert rpc.subscriptions == {}
+
+    await rpc.close()
+    await runner.cleanup()
+
+    with pytest.raises(ValueError):
+        await AsyncJsonRpc("http://127.0.0.1:8545").subscribe(['newHeads'])
@@ -0,0 +1,93 @@
+import asyncio
+import random
+import pytest
+
+from interledger.adapter.log_cursor import LogCursor
+
+
+class Ledger:
+    """Ledger with one log per block listed in events, answering the log requests after a random delay"""
+
+    def __init__(self, events, fail=()):
+        self.events = events
+        self.fail = set(fail)
+        self.requests = []
+
+    async def get_logs(self, start, end):
+        self.requests.append((start, end))
+        await asyncio.sleep(random.random() * 0.01)
+        if start in self.fail:
+            raise ValueError("request failed")
+        return [block for block in self.events if start <= block <= end]
+
+
+@pytest.mark.asyncio
+async def test_log_cursor_chunks_in_order():
+
+    ledger = Ledger(events=list(range(1, 101, 7)))
+    cursor = LogCursor(0, chunk_size=10, parallel=4)
+
+    # the first round of 4 chunks contains logs
+    logs = await cursor.scan(100, ledger.get_logs)
+    assert ledger.requests == [(1, 10), (11, 20), (21, 30), (31, 40)]
+    assert logs == [1, 8, 15, 22, 29, 36]
+    assert cursor.last_block == 40
+
+    logs = await cursor.scan(100, ledger.get_logs)
+    assert logs == [43, 50, 57, 64, 71, 78]
+    logs = await cursor.scan(100, ledger.get_logs)
+    assert logs == [85, 92, 99]
+    assert cursor.last_block == 100
+
+    # no block is read twice
+    assert await cursor.scan(100, ledger.get_logs) == []
+    assert len(ledger.requests) == 10
+
+
+@pytest.mark.asyncio
+async def test_log_cursor_skips_empty_rounds():
+
+    ledger = Ledger(events=[95])
+    cursor = LogCursor(0, chunk_size=10, parallel=2)
+    assert await cursor.scan(100, ledger.get_logs) == [95]
+    assert cursor.last_block == 100
+
+
+@pytest.mark.asyncio
+async def test_log_cursor_failure():
+
+    ledger = Ledger(events=[5, 15, 25], fail=[21])
+    cursor = LogCursor(0, chunk_size=10, parallel=4)
+
+    # the chunks before the failed one are returned
+    assert await cursor.scan(40, ledger.get_logs) == [5, 15]
+    assert cursor.last_block == 20
+
+    # the failed chunk is the first one: nothing is skipped
+    with pytest.raises(ValueError):
+        await cursor.scan(40, ledger.get_logs)
+    assert cursor.last_block == 20
+
+    ledger.fail.clear()
+    assert await cursor.scan(40, ledger.get_logs) == [25]
+
+
+def test_log_cursor_invalid():
+
+    with pytest.raises(ValueError):
+        LogCursor(0, chunk_size=0)
+    with pytest.raises(ValueError):
+        LogCursor(0, parallel=0)
+
+
+@pytest.mark.asyncio
+async def test_log_cursor_concurrent_scans():
+
+    ledger = Ledger(events=list(range(1, 51)))
+    cursor = LogCursor(0, chunk_size=10, parallel=2)
+
+    # overlapping scans of the same blocks hand out each log once
+    scans = await asyncio.gather(*[cursor.scan(50, ledger.get_logs) for _ in range(5)])
+    logs = [log for scan in scans for log in scan]
+    assert sorted(logs) == list(range(1, 51))
+    assert cursor.last_block == 50
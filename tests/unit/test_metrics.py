@@ -0,0 +1,64 @@
+import aiohttp
+import pytest
+
+from interledger.metrics import Histogram, Metrics
+
+
+def test_histogram_quantile():
+
+    histogram = Histogram((0.1, 0.2, 0.4))
+    assert histogram.quantile(0.5) is None
+    for value in [0.05] * 50 + [0.15] * 49 + [1.0]:
+        histogram.observe(value)
+
+    assert histogram.counts == [50, 49, 0, 1]
+    assert histogram.count == 100
+    assert histogram.sum == pytest.approx(0.05 * 50 + 0.15 * 49 + 1.0)
+    assert histogram.quantile(0.5) == pytest.approx(0.1)
+    assert 0.1 < histogram.quantile(0.99) <= 0.2
+    # values above the last bound are reported as the last bound
+    assert histogram.quantile(1) == 0.4
+
+
+def test_metrics_render():
+
+    metrics = Metrics(buckets=(0.1, 1))
+    metrics.describe('stage_seconds', "Time per stage")
+    metrics.observe('stage_seconds', 0.05, bridge="left", stage="READY")
+    metrics.observe('stage_seconds', 0.5, bridge="left", stage="READY")
+    metrics.gauge('depth', lambda: 3, queue='ready')
+
+    assert metrics.render().splitlines() == [
+        '# HELP stage_seconds Time per stage',
+        '# TYPE stage_seconds histogram',
+        'stage_seconds_bucket{bridge="left",stage="READY",le="0.1"} 1',
+        'stage_seconds_bucket{bridge="left",stage="READY",le="1"} 2',
+        'stage_seconds_bucket{bridge="left",stage="READY",le="+Inf"} 2',
+        'stage_seconds_sum{bridge="left",stage="READY"} 0.55',
+        'stage_seconds_count{bridge="left",stage="READY"} 2',
+        '# TYPE depth gauge',
+        'depth{queue="ready"} 3',
+    ]
+
+
+def test_metrics_timer():
+
+    metrics = Metrics()
+    with metrics.timer('call_seconds', call='listen'):
+        pass
+    assert metrics.histogram('call_seconds', call='listen').count == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_serve():
+
+    metrics = Metrics()
+    metrics.observe('stage_seconds', 0.01, stage="READY")
+    port = await metrics.serve('127.0.0.1', 0)
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                assert response.status == 200
+                assert 'stage_seconds_count{stage="READY"} 1' in await response.text()
+    finally:
+        await metrics.close()
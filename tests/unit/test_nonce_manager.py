@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+
+from interledger.adapter.nonce_manager import NonceManager
+
+
+class Provider:
+    endpoint_uri = "http://localhost:7545"
+
+
+class Eth:
+    def __init__(self):
+        self.mined = 3
+        self.pending = 5
+
+    def getTransactionCount(self, account, block='latest'):
+        return self.pending if block == 'pending' else self.mined
+
+
+class Web3:
+    def __init__(self):
+        self.provider = Provider()
+        self.eth = Eth()
+
+
+def test_nonce_manager_acquire_release():
+
+    manager = NonceManager(Web3(), '0x1')
+    assert [manager.acquire() for _ in range(3)] == [5, 6, 7]
+
+    # the last nonce is reused
+    manager.release(7)
+    assert manager.acquire() == 7
+
+    # releasing an earlier nonce leaves a gap: resync from the ledger and fill it first
+    manager.sent(5, b'\x05')
+    manager.web3.eth.pending = 6
+    manager.release(6)
+    assert manager.acquire() == 6
+    assert manager.acquire() == 8
+
+
+def test_nonce_manager_pending():
+
+    web3 = Web3()
+    manager = NonceManager(web3, '0x1')
+    manager.sent(manager.acquire(), b'\x01')
+    manager.sent(manager.acquire(), b'\x02')
+    manager.mined(b'\x01')
+    assert manager.pending == {b'\x02': 6}
+
+    web3.eth.mined, web3.eth.pending = 7, 7
+    manager.resync()
+    assert manager.pending == {}
+    assert manager.acquire() == 7
+
+
+class Rpc:
+    def __init__(self, eth):
+        self.eth = eth
+
+    async def request(self, method, params=None):
+        await asyncio.sleep(0)
+        return hex(self.eth.getTransactionCount(*params))
+
+
+@pytest.mark.asyncio
+async def test_nonce_manager_resync_in_flight():
+
+    web3 = Web3()
+    rpc = Rpc(web3.eth)
+    manager = NonceManager(web3, '0x1')
+    await manager.resync_async(rpc)
+    sent = []
+
+    async def send(tx_hash):
+        nonce = await manager.acquire_async(rpc)
+        # still signing and sending when the resync happens
+        await asyncio.sleep(0.01)
+        manager.sent(nonce, tx_hash)
+        sent.append(nonce)
+
+    acquirers = [asyncio.ensure_future(send(bytes([i]))) for i in range(2)]
+    await asyncio.sleep(0)
+    assert manager.acquired == {5, 6}
+
+    # the node has not seen the two transactions yet
+    await manager.resync_async(rpc)
+    assert manager.next_nonce == 7
+    assert await manager.acquire_async(rpc) == 7
+
+    await asyncio.gather(*acquirers)
+    assert sorted(sent) == [5, 6]
+    assert manager.pending == {b'\x00': 5, b'\x01': 6}
+
+
+def test_nonce_manager_shared():
+
+    web3 = Web3()
+    assert NonceManager.shared(web3, '0xAB') is NonceManager.shared(Web3(), '0xab')
+    assert NonceManager.shared(web3, '0xAB') is not NonceManager.shared(web3, '0xCD')
+
+
+def test_nonce_manager_errors():
+
+    assert NonceManager.is_nonce_error(ValueError({'code': -32000, 'message': 'nonce too low'}))
+    assert NonceManager.is_nonce_error(ValueError("the tx doesn't have the correct nonce"))
+    assert not NonceManager.is_nonce_error(ValueError({'message': 'VM Exception while processing transaction: revert'}))
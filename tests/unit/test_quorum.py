@@ -0,0 +1,77 @@
+import pytest
+import asyncio
+
+from interledger.adapter.interfaces import ErrorCode
+from interledger.quorum import Quorum
+
+
+async def answer(status, delay=0):
+    await asyncio.sleep(delay)
+    return {"status": status}
+
+
+@pytest.mark.asyncio
+async def test_quorum_decided_by_the_fastest():
+
+    tasks = [asyncio.ensure_future(answer(True)), asyncio.ensure_future(answer(True)),
+             asyncio.ensure_future(answer(True, 3600))]
+    quorum = Quorum(tasks, 2)
+
+    assert await asyncio.wait_for(quorum.decided, 1) == True
+    assert quorum.pending == [2]
+
+    quorum.cancel_pending()
+    assert quorum.results[2]['status'] == False
+    await asyncio.sleep(0)
+    assert tasks[2].cancelled()
+
+
+@pytest.mark.asyncio
+async def test_quorum_unreachable():
+
+    tasks = [asyncio.ensure_future(answer(False)), asyncio.ensure_future(answer(False)),
+             asyncio.ensure_future(answer(True, 3600))]
+    quorum = Quorum(tasks, 2)
+
+    # the threshold cannot be reached once two responders out of three said no
+    assert await asyncio.wait_for(quorum.decided, 1) == False
+    assert quorum.decision == False
+    tasks[2].cancel()
+
+
+@pytest.mark.asyncio
+async def test_quorum_deadline():
+
+    tasks = [asyncio.ensure_future(answer(True)), asyncio.ensure_future(answer(True, 3600))]
+    quorum = Quorum(tasks, 2, [None, 0.05])
+
+    assert await asyncio.wait_for(quorum.decided, 1) == False
+    assert quorum.results[1]['error_code'] == ErrorCode.TIMEOUT
+    await asyncio.sleep(0)
+    assert tasks[1].cancelled()
+
+
+@pytest.mark.asyncio
+async def test_quorum_exception():
+
+    async def fail():
+        raise ValueError("no connection")
+
+    quorum = Quorum([asyncio.ensure_future(fail()), asyncio.ensure_future(answer(True))], 1)
+
+    assert await asyncio.wait_for(quorum.decided, 1) == True
+    assert quorum.results[0]['error_code'] == ErrorCode.TRANSACTION_FAILURE
+    assert quorum.results[1]['status'] == True
+
+
+@pytest.mark.asyncio
+async def test_quorum_threshold_zero():
+
+    task = asyncio.ensure_future(answer(True, 0.01))
+    quorum = Quorum([task], 0)
+
+    # nothing to wait for, the late answer is filled in
+    assert quorum.decision == True
+    await task
+    await asyncio.sleep(0)
+    assert quorum.results == [{"status": True}]
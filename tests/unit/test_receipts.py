@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+
+from interledger.adapter.receipts import ReceiptTracker, ReceiptTimeout
+
+
+class Provider:
+    endpoint_uri = "http://localhost:7545"
+
+
+class Eth:
+    def __init__(self):
+        self.blockNumber = 1
+        self.mined = {}  # tx hash -> block number
+        self.requests = 0
+
+    def getTransactionReceipt(self, tx_hash):
+        self.requests += 1
+        if tx_hash not in self.mined:
+            raise ValueError("Transaction not found")
+        return {'transactionHash': tx_hash, 'blockHash': b'\x01', 'blockNumber': self.mined[tx_hash], 'status': 1}
+
+
+class Web3:
+    def __init__(self):
+        self.provider = Provider()
+        self.eth = Eth()
+
+
+class Rpc:
+    def __init__(self, eth):
+        self.eth = eth
+        self.batches = []
+
+    async def request(self, method, params=()):
+        assert method == 'eth_blockNumber'
+        return hex(self.eth.blockNumber)
+
+    async def batch(self, calls):
+        self.batches.append(len(calls))
+        results = []
+        for _, (tx_hash,) in calls:
+            tx_hash = bytes.fromhex(tx_hash[2:])
+            results.append({'blockHash': '0x01', 'status': '0x1'} if tx_hash in self.eth.mined else None)
+        return results
+
+
+@pytest.mark.asyncio
+async def test_receipt_tracker_resolves_on_new_block():
+
+    web3 = Web3()
+    tracker = ReceiptTracker(web3, poll_interval=0.01)
+    hashes = [i.to_bytes(32, "big") for i in range(1000)]
+    waits = asyncio.gather(*[tracker.wait(tx_hash, 10) for tx_hash in hashes])
+    await asyncio.sleep(0.05)
+
+    # the pending transactions are fetched once per block
+    requests = web3.eth.requests
+    assert requests == len(hashes)
+    await asyncio.sleep(0.05)
+    assert web3.eth.requests == requests
+
+    web3.eth.mined = {tx_hash: 2 for tx_hash in hashes}
+    web3.eth.blockNumber = 2
+    receipts = await waits
+    assert [r['transactionHash'] for r in receipts] == hashes
+    assert tracker.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_receipt_tracker_batch():
+
+    web3 = Web3()
+    rpc = Rpc(web3.eth)
+    tracker = ReceiptTracker(web3, rpc, poll_interval=0.01)
+    web3.eth.mined = {b'\x01': 1}
+
+    receipts = await asyncio.gather(tracker.wait(b'\x01', 10), tracker.wait(b'\x01', 10))
+    assert receipts[0]['blockHash'] == '0x01'
+    assert receipts[0] is receipts[1]
+    assert rpc.batches == [1]
+
+
+@pytest.mark.asyncio
+async def test_receipt_tracker_timeout():
+
+    tracker = ReceiptTracker(Web3(), poll_interval=0.01)
+    with pytest.raises(ReceiptTimeout):
+        await tracker.wait(b'\x02', 0.03)
+    assert tracker.pending == {}
+
+
+def test_receipt_tracker_shared():
+
+    web3 = Web3()
+    assert ReceiptTracker.shared(web3) is ReceiptTracker.shared(Web3())
+    assert ReceiptTracker.shared(web3) is not ReceiptTracker.shared(web3, Rpc(web3.eth))
@@ -0,0 +1,79 @@
+import pytest
+
+from interledger.registry import TransferSet, TransferRegistry
+from interledger.transfer import TransferStatus, Transfer
+
+
+def make_transfer(id, status=TransferStatus.READY):
+    t = Transfer()
+    t.payload = {'id': id}
+    t.status = status
+    return t
+
+
+def test_transfer_set():
+
+    t1, t2, t3 = make_transfer('1'), make_transfer('2'), make_transfer('3')
+    added = []
+    s = TransferSet([t1, t2], on_add=added.append)
+
+    s.append(t3)
+    s.append(t1)  # already present
+
+    assert len(s) == 3
+    assert added == [t1, t2, t3]
+    assert s[0] is t1
+    assert s[-1] is t3
+    assert list(s) == [t1, t2, t3]
+
+    s.remove(t2)
+    s.discard(t2)
+    assert t2 not in s
+    assert list(s) == [t1, t3]
+
+    with pytest.raises(IndexError):
+        s[5]
+
+
+def test_transfer_registry_move():
+
+    t1, t2 = make_transfer('1'), make_transfer('2', TransferStatus.SENT)
+    r = TransferRegistry([t1, t2])
+
+    assert list(r.bucket(TransferStatus.READY)) == [t1]
+    assert list(r.bucket(TransferStatus.SENT)) == [t2]
+    assert r.get('1') is t1
+
+    r.move(t1, TransferStatus.SENT)
+    assert t1.status == TransferStatus.SENT
+    assert not r.bucket(TransferStatus.READY)
+    assert list(r.bucket(TransferStatus.SENT)) == [t2, t1]
+
+    # status changed without move()
+    t2.status = TransferStatus.RESPONDED
+    r.move(t2, TransferStatus.CONFIRMING)
+    assert list(r.bucket(TransferStatus.SENT)) == [t1]
+    assert list(r.bucket(TransferStatus.CONFIRMING)) == [t2]
+
+    r.remove(t2)
+    assert len(r) == 1
+    assert r.get('2') is None
+    assert not r.bucket(TransferStatus.CONFIRMING)
+
+    # unregistered transfers only get their status updated
+    t3 = make_transfer('3')
+    r.move(t3, TransferStatus.SENT)
+    assert t3.status == TransferStatus.SENT
+    assert t3 not in r
+
+
+def test_transfer_registry_adopt():
+
+    t1, t1_copy = make_transfer('1'), make_transfer('1', TransferStatus.RESPONDED)
+    r = TransferRegistry([t1])
+
+    r.adopt(t1_copy)
+    assert len(r) == 1
+    assert r.get('1') is t1_copy
+    assert not r.bucket(TransferStatus.READY)
+    assert list(r.bucket(TransferStatus.RESPONDED)) == [t1_copy]
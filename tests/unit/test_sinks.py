@@ -0,0 +1,55 @@
+import asyncio
+import json
+import pytest
+
+from interledger.adapter.interfaces import ErrorCode
+from interledger.sinks import MemorySink, JsonlSink, CallbackSink, QueueSink
+
+
+def test_memory_sink_ring_buffer():
+
+    sink = MemorySink(2)
+    for i in range(3):
+        sink.emit({'id': str(i)})
+
+    assert len(sink) == 2
+    assert sink.count == 3
+    assert [r['id'] for r in sink] == ['1', '2']
+
+    with pytest.raises(ValueError):
+        MemorySink(0)
+
+
+def test_jsonl_sink(tmp_path):
+
+    path = tmp_path / "results.jsonl"
+    sink = JsonlSink(str(path))
+    sink.emit({'id': '1', 'committed': True, 'commit_tx_hash': b'\x12\x34'})
+    sink.emit({'id': '2', 'committed': False, 'abort_error_code': ErrorCode.TIMEOUT})
+    sink.close()
+    sink.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines[0] == {'id': '1', 'committed': True, 'commit_tx_hash': '0x1234'}
+    assert lines[1] == {'id': '2', 'committed': False, 'abort_error_code': 'TIMEOUT'}
+
+
+@pytest.mark.asyncio
+async def test_callback_and_queue_sinks():
+
+    received = []
+
+    async def subscriber(record):
+        received.append(record)
+
+    sink = CallbackSink(subscriber)
+    sink.emit({'id': '1'})
+    await asyncio.sleep(0)
+    assert received == [{'id': '1'}]
+
+    queue = asyncio.Queue(1)
+    sink = QueueSink(queue)
+    sink.emit({'id': '1'})
+    sink.emit({'id': '2'})
+    assert sink.dropped == 1
+    assert queue.get_nowait() == {'id': '2'}
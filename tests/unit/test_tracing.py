@@ -0,0 +1,58 @@
+import asyncio
+import json
+import pytest
+
+from interledger.tracing import Tracer, ChromeTraceExporter
+
+
+class ListTracer(Tracer):
+    enabled = True
+
+    def __init__(self):
+        self.spans = []
+
+    def record(self, name, start, end, **attrs):
+        self.spans.append((name, end - start, attrs))
+
+
+def test_tracer_noop():
+
+    tracer = Tracer()
+    # the same span is reused, nothing is recorded
+    assert tracer.span('send_data', id='1') is tracer.span('commit_sending', id='2')
+    with tracer.span('send_data', id='1'):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_tracer_span_and_watch():
+
+    tracer = ListTracer()
+    with tracer.span('listen_for_events'):
+        await asyncio.sleep(0.01)
+    future = tracer.watch('send_data', asyncio.ensure_future(asyncio.sleep(0.01)), id='1', nonce='2')
+    await future
+
+    assert [(name, attrs) for name, _, attrs in tracer.spans] == \
+        [('listen_for_events', {}), ('send_data', {'id': '1', 'nonce': '2'})]
+    assert all(duration >= 0.005 for _, duration, _ in tracer.spans)
+
+
+def test_chrome_trace_exporter(tmp_path):
+
+    path = str(tmp_path / "trace.json")
+    tracer = ChromeTraceExporter(path, max_spans=2)
+    tracer.record('dropped', 0.5, 1.0)
+    tracer.record('listen_for_events', 1.0, 1.5)
+    tracer.record('SENT', 1.0, 2.0, id='7', nonce='42')
+    tracer.close()
+
+    with open(path) as f:
+        events = json.load(f)['traceEvents']
+    assert [(e['name'], e['ph']) for e in events] == \
+        [('process_name', 'M'), ('listen_for_events', 'X'), ('SENT', 'b'), ('SENT', 'e')]
+    assert events[1]['dur'] == 0.5e6
+    # the spans of a transfer share the track of its id
+    assert events[2]['id'] == events[3]['id'] == '7'
+    assert (events[2]['ts'], events[3]['ts']) == (1e6, 2e6)
+    assert events[2]['args'] == {'id': '7', 'nonce': '42'}
@@ -0,0 +1,82 @@
+from copy import deepcopy
+import pytest
+
+from interledger.transfer import Transfer, TransferToMulti, TransferStatus, TransferResult
+
+
+def test_transfer_payload():
+
+    t = Transfer()
+    assert not t.payload
+
+    t.payload = {'id': '1', 'data': b"dummy"}
+    t.payload['nonce'] = '42'
+
+    assert t.id == '1'
+    assert t.nonce == '42'
+    assert t.data == b"dummy"
+    assert t.payload == {'id': '1', 'nonce': '42', 'data': b"dummy"}
+    assert t.payload.get('other') is None
+    with pytest.raises(KeyError):
+        t.payload['other']
+
+    # keys other than id, nonce and data are kept too
+    t.payload['other'] = 'x'
+    assert t.payload['other'] == 'x'
+    assert len(t.payload) == 4
+
+    t.payload = t.payload
+    assert len(t.payload) == 4
+
+    t.payload = {}
+    assert t.id is None
+    assert dict(t.payload) == {}
+
+
+def test_transfer_result():
+
+    t = Transfer()
+    assert t.result == {}
+
+    t.result = {'status': True, 'tx_hash': '0x1'}
+    t.result['commit_status'] = True
+    t.result['exception'] = 'x'
+
+    assert t.result['status']
+    assert t.result == {'status': True, 'tx_hash': '0x1', 'commit_status': True, 'exception': 'x'}
+    assert 'abort_status' not in t.result
+
+    # results returned by the responders are not always dicts
+    t.result = 42
+    assert t.result == 42
+
+
+def test_transfer_result_explicit_none():
+
+    result = TransferResult({'status': False, 'tx_hash': None})
+    assert result['tx_hash'] is None
+    assert 'tx_hash' in result and 'error_code' not in result
+    assert dict(result) == {'status': False, 'tx_hash': None}
+
+    del result['tx_hash']
+    assert 'tx_hash' not in result
+    assert deepcopy(result) == {'status': False}
+
+
+def test_transfer_slots_deepcopy():
+
+    t = TransferToMulti()
+    t.payload = {'id': '1', 'nonce': '2', 'data': b"dummy"}
+    t.result = {'status': False}
+    t.status = TransferStatus.SENT
+    t.inquiry_decision = True
+
+    with pytest.raises(AttributeError):
+        t.undefined = True
+
+    c = deepcopy(t)
+    assert c is not t
+    assert c.payload == t.payload
+    assert c.result == t.result and c.result is not t.result
+    assert c.status == TransferStatus.SENT
+    assert c.inquiry_decision
@@ -0,0 +1,99 @@
+import pytest
+
+from interledger.adapter.interfaces import ErrorCode
+from interledger.wal import WriteAheadLog, decode_result
+
+
+def test_wal_group_commit(tmp_path):
+
+    wal = WriteAheadLog(str(tmp_path / "wal"), group_size=3, group_window=60)
+    wal.append({'nonce': '1', 'status': 'READY', 'id': 'a', 'data': 'x'})
+    wal.append({'nonce': '1', 'status': 'SENT'})
+    assert wal.syncs == 0
+
+    # the group is written with a single sync once it is full
+    wal.append({'nonce': '2', 'status': 'READY', 'id': 'b', 'data': 'y'})
+    assert wal.syncs == 1
+    wal.close()
+
+
+def test_wal_read_and_compact(tmp_path):
+
+    path = str(tmp_path / "wal")
+    wal = WriteAheadLog(path, group_size=100, group_window=60)
+    wal.append({'nonce': '1', 'status': 'READY', 'id': 'a', 'data': 'x'})
+    wal.append({'nonce': '2', 'status': 'READY', 'id': 'b', 'data': 'y'})
+    wal.append({'nonce': '1', 'status': 'SENT'})
+    wal.append({'nonce': '1', 'status': 'SUBMITTED', 'send_tx_hash': b'\x01\x02'})
+    wal.append({'nonce': '2', 'status': 'SENT'})
+    wal.append({'nonce': '2', 'status': 'RESPONDED', 'result': {'status': False, 'error_code': ErrorCode.TIMEOUT}})
+    wal.append({'nonce': '2', 'status': 'FINALIZED'})
+    wal.close()
+
+    wal = WriteAheadLog(path)
+    states = wal.read()
+    assert states == {'1': {'status': 'SENT', 'id': 'a', 'data': 'x', 'send_tx_hash': '0x0102'}}
+
+    # the finalized transfers are dropped from the log
+    wal.compact(states)
+    with open(path) as f:
+        assert len(f.readlines()) == 1
+    assert wal.read() == states
+    wal.close()
+
+
+def test_wal_torn_write(tmp_path):
+
+    path = str(tmp_path / "wal")
+    wal = WriteAheadLog(path)
+    wal.append({'nonce': '1', 'status': 'READY', 'id': 'a', 'data': 'x'})
+    wal.close()
+    with open(path, 'a') as f:
+        f.write('{"nonce": "1", "stat')
+
+    assert WriteAheadLog(path).read() == {'1': {'status': 'READY', 'id': 'a', 'data': 'x'}}
+
+
+def test_wal_malformed_records(tmp_path):
+
+    path = str(tmp_path / "wal")
+    with open(path, 'w') as f:
+        f.write('{"status": "READY", "id": "a"}\n[1, 2]\n{"nonce": "1", "status": "READY", "id": "b", "data": "x"}\n')
+
+    assert WriteAheadLog(path).read() == {'1': {'status': 'READY', 'id': 'b', 'data': 'x'}}
+
+
+def test_wal_compact_every(tmp_path):
+
+    path = str(tmp_path / "wal")
+    wal = WriteAheadLog(path, group_size=1, compact_every=3)
+    for nonce in '1234':
+        wal.append({'nonce': nonce, 'status': 'READY', 'id': nonce, 'data': 'x'})
+    for nonce in '123':
+        wal.append({'nonce': nonce, 'status': 'FINALIZED'})
+
+    # the third finalized transfer triggers a compaction, only the transfer in flight is left
+    with open(path) as f:
+        assert len(f.readlines()) == 1
+    assert wal.finalized == 0
+
+    wal.append({'nonce': '4', 'status': 'SENT'})
+    assert wal.read() == {'4': {'status': 'SENT', 'id': '4', 'data': 'x'}}
+    wal.close()
+
+
+def test_wal_decode_result():
+
+    result = decode_result({'status': False, 'error_code': 'TIMEOUT', 'abort_error_code': 'TRANSACTION_FAILURE'})
+    assert result['error_code'] == ErrorCode.TIMEOUT
+    assert result['abort_error_code'] == ErrorCode.TRANSACTION_FAILURE
+
+
+def test_wal_invalid(tmp_path):
+
+    with pytest.raises(ValueError):
+        WriteAheadLog(str(tmp_path / "wal"), group_size=0)
+    with pytest.raises(ValueError):
+        WriteAheadLog(str(tmp_path / "wal"), group_window=-1)
+    with pytest.raises(ValueError):
+        WriteAheadLog(str(tmp_path / "wal"), compact_every=0)